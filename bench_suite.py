@@ -0,0 +1,307 @@
+"""
+bench_suite.py
+
+Hot path benchmarks (feed, indicator, rules, risk).
+
+Kya measure hota hai (har benchmark ke liye):
+- ns_per_op      → median of `repeat` runs (time.perf_counter_ns)
+- blocks_per_op  → sys.getallocatedblocks() delta / op (jo memory retain hui)
+- peak_kb        → tracemalloc peak ek run ke dauraan
+
+Synthetic ticks seeded random walk se bante hain (1 tick/sec exchange time),
+isliye har run same data par chalta hai → numbers reproducible.
+
+Usage:
+    python bench_suite.py                    # run + baseline se compare
+    python bench_suite.py --save-baseline    # current numbers baseline bana do
+    python bench_suite.py --threshold 0.25   # 25% se slow → regression (exit 1)
+
+Baseline file: bench_baseline.json (machine-specific, deploy box par hi banao)
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, time as dtime
+from typing import Callable, Dict, List, Optional
+
+from data_feed_handler import DataFeedHandler, calculate_rsi
+from market_calendar import IST, SessionCalendar
+from risk_manager import RiskManager
+from rules_engine import RulesEngine, RuleConfig
+from tick_sanitizer import TickSanitizer
+
+
+BASELINE_PATH = "bench_baseline.json"
+SESSION_OPEN = int(datetime(2025, 12, 8, 9, 15, tzinfo=IST).timestamp())
+
+# 1 tick/sec ke 200 candles ek session (375 min) me nahi aate → bench ke
+# liye poore din ka session (close par clamp nahi hota)
+BENCH_CALENDAR = SessionCalendar(open=dtime(0, 0), close=dtime(23, 59, 59))
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Synthetic data
+# ---------------------------------------------------------------------
+
+def synthetic_ticks(n: int, seed: int = 7, start_price: float = 25900.0,
+                    start_ts: int = SESSION_OPEN) -> List[Dict]:
+    """Seeded random walk: 1 tick/sec, volume + OI ke saath."""
+    rng = random.Random(seed)
+    price = start_price
+    oi = 1_000_000
+    ticks = []
+    for i in range(n):
+        price += rng.gauss(0, 2.0)
+        oi += rng.randint(-500, 500)
+        ticks.append({
+            "last_traded_price": round(price, 2),
+            "volume": rng.randint(50, 500),
+            "oi": oi,
+            "exchange_timestamp": start_ts + i,
+            "timestamp": start_ts + i,
+        })
+    return ticks
+
+
+def warm_handler(timeframe_minutes: int = 5, n_ticks: int = 200 * 300) -> DataFeedHandler:
+    """200 candles tak bhara hua DataFeedHandler (context build ke liye)."""
+    dh = DataFeedHandler(timeframe_minutes, calendar=BENCH_CALENDAR)
+    for t in synthetic_ticks(n_ticks):
+        dh.on_tick(t)
+    # NOTE: handler abhi pe_oi fill nahi karta → bench ke liye seed karo
+    dh.pe_oi = list(dh.ce_oi)
+    return dh
+
+
+def noisy_ticks(n: int, seed: int = 7) -> List[Dict]:
+    """
+    synthetic_ticks + sanitizer ke bad-tick cases (fixed mix, reproducible):
+    har 50th duplicate, 97th reordered, 307th stale, 211th outlier,
+    503rd missing price.
+    """
+    ticks = synthetic_ticks(n, seed)
+    out = []
+    for i, t in enumerate(ticks):
+        t["token"] = "NIFTY"
+        out.append(t)
+        if i == 0:
+            continue
+        if i % 50 == 0:
+            out.append(dict(t))
+        if i % 97 == 0:
+            out.append(dict(t, exchange_timestamp=t["exchange_timestamp"] - 1))
+        if i % 307 == 0:
+            out.append(dict(t, exchange_timestamp=t["exchange_timestamp"] - 10))
+        if i % 211 == 0:
+            out.append(dict(t, last_traded_price=t["last_traded_price"] * 1.2))
+        if i % 503 == 0:
+            out.append(dict(t, last_traded_price=0.0))
+    return out
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Measurement
+# ---------------------------------------------------------------------
+
+def measure(fn: Optional[Callable[[int], None]], ops: int, repeat: int = 5,
+            setup: Optional[Callable[[], Callable[[int], None]]] = None) -> Dict:
+    """
+    fn(i) ko `ops` baar chalao, `repeat` baar.
+    GC band rakha jaata hai taaki random pauses numbers na bigaadein.
+
+    setup → stateful benchmarks (handler / sanitizer) ke liye: har repeat
+    se pehle (timing ke bahar) naya state + fn(i) banata hai. Warna
+    doosre repeat se same timestamps purane state par chalte hain
+    (koi candle close nahi, sab ticks stale) aur median galat path napta hai.
+    """
+    timings = []
+    blocks = 0
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                fn = setup()
+            blocks0 = sys.getallocatedblocks()
+            t0 = time.perf_counter_ns()
+            for i in range(ops):
+                fn(i)
+            timings.append((time.perf_counter_ns() - t0) / ops)
+            blocks += sys.getallocatedblocks() - blocks0
+        blocks /= ops * repeat
+    finally:
+        gc.enable()
+
+    if setup is not None:
+        fn = setup()
+    tracemalloc.start()
+    for i in range(ops):
+        fn(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "ns_per_op": timings[len(timings) // 2],
+        "min_ns_per_op": timings[0],
+        "blocks_per_op": round(blocks, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "ops": ops,
+    }
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Benchmarks
+# ---------------------------------------------------------------------
+
+def bench_calculate_rsi() -> Dict:
+    prices = [t["last_traded_price"] for t in synthetic_ticks(200)]
+    return measure(lambda i: calculate_rsi(prices, 14), ops=20000)
+
+
+def bench_process_tick_into_candle() -> Dict:
+    """Candle update + har 300 ticks par close / start (fresh handler per repeat)."""
+    ticks = synthetic_ticks(50000)
+    stamps = [t["exchange_timestamp"] for t in ticks]
+    prices = [t["last_traded_price"] for t in ticks]
+    vols = [t["volume"] for t in ticks]
+    n = len(ticks)
+
+    def setup():
+        process = DataFeedHandler(5, calendar=BENCH_CALENDAR)._process_tick_into_candle
+        return lambda i: process(prices[i], vols[i], stamps[i])
+
+    return measure(None, ops=n, repeat=3, setup=setup)
+
+
+def bench_on_tick() -> Dict:
+    """Pura tick path: parse + candle (closes ke saath) + OI + RSI price list."""
+    ticks = synthetic_ticks(50000)
+    n = len(ticks)
+
+    def setup():
+        on_tick = DataFeedHandler(5, calendar=BENCH_CALENDAR).on_tick
+        return lambda i: on_tick(ticks[i])
+
+    return measure(None, ops=n, repeat=3, setup=setup)
+
+
+def bench_tick_sanitizer() -> Dict:
+    """Saaf ticks + duplicate / reordered / stale / outlier / missing mix."""
+    ticks = noisy_ticks(50000)
+    n = len(ticks)
+
+    def setup():
+        check = TickSanitizer().check
+        return lambda i: check(ticks[i])
+
+    return measure(None, ops=n, repeat=3, setup=setup)
+
+
+def bench_build_market_context() -> Dict:
+    dh = warm_handler()
+    return measure(lambda i: dh.build_market_context("NIFTY"), ops=5000)
+
+
+def bench_rules_evaluate() -> Dict:
+    dh = warm_handler()
+    ctx = dh.build_market_context("NIFTY")
+    engine = RulesEngine(RuleConfig())
+    # Trend clear ho taaki A-SET bhi evaluate ho (worst case path).
+    # Candle objects handler ke hain → copies badlo, originals nahi
+    base = ctx.candles[-1].c
+    trend = [replace(c, c=base + k * 5, l=base + k * 5 - 3, h=base + k * 5 + 3)
+             for k, c in enumerate(ctx.candles[-4:])]
+    ctx.candles = ctx.candles[:-4] + trend
+    return measure(lambda i: engine.evaluate(ctx), ops=5000)
+
+
+def bench_update_trailing_sl() -> Dict:
+    rm = RiskManager()
+    rm.create_position("NIFTY25900CE", "CE", 100.0, 50)
+    ltps = [100.0 + (i % 200) for i in range(1000)]
+    return measure(lambda i: rm.update_trailing_sl(ltps[i % 1000]), ops=20000)
+
+
+BENCHMARKS = {
+    "calculate_rsi": bench_calculate_rsi,
+    "process_tick_into_candle": bench_process_tick_into_candle,
+    "data_feed_on_tick": bench_on_tick,
+    "tick_sanitizer": bench_tick_sanitizer,
+    "build_market_context": bench_build_market_context,
+    "rules_evaluate": bench_rules_evaluate,
+    "risk_update_trailing_sl": bench_update_trailing_sl,
+}
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — Baseline compare
+# ---------------------------------------------------------------------
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Jo benchmark baseline se `threshold` zyada slow hai unke naam."""
+    regressions = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        ratio = r["ns_per_op"] / b["ns_per_op"] if b["ns_per_op"] else 1.0
+        r["vs_baseline"] = round(ratio, 3)
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Hot path benchmark suite")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--threshold", type=float, default=0.20,
+                    help="allowed slowdown vs baseline (0.20 = 20%%)")
+    ap.add_argument("--only", nargs="*", help="sirf ye benchmarks chalao")
+    args = ap.parse_args(argv)
+
+    # Hot path logs benchmark ko na bigaadein
+    import logging
+    logging.disable(logging.INFO)
+
+    names = args.only or list(BENCHMARKS)
+    results = {name: BENCHMARKS[name]() for name in names}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+
+    print(f"{'benchmark':<28}{'ns/op':>12}{'blocks/op':>11}{'peak KB':>10}{'vs base':>9}")
+    for name, r in results.items():
+        vs = f"x{r['vs_baseline']:.2f}" if "vs_baseline" in r else "-"
+        print(f"{name:<28}{r['ns_per_op']:>12,.0f}{r['blocks_per_op']:>11}"
+              f"{r['peak_kb']:>10}{vs:>9}")
+
+    if args.save_baseline:
+        baseline.update({k: {kk: v for kk, v in r.items() if kk != "vs_baseline"}
+                         for k, r in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved → {args.baseline}")
+        return 0
+
+    if regressions:
+        print("REGRESSION:", ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
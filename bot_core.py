@@ -5,17 +5,44 @@
 
 from __future__ import annotations
 from typing import Dict, Optional
-import time
-import json
-import pyotp
-from websocket import WebSocketApp
+from datetime import datetime, time as dtime
+import logging
+import threading
 
-# ===== YOUR EXISTING FILES (UNCHANGED) =====
+# ===== STRATEGY (rules / candles / risk) =====
 from rules_engine import RulesEngine, RuleConfig, MarketContext
 from data_feed_handler import DataFeedHandler
 from risk_manager import RiskManager, RiskManagerConfig, PositionState
-from order_manager import OrderManager
-from strike_logic import get_option_symbol
+from strike_logic import StrikeResolver
+from market_calendar import DAY, IST_OFFSET, SessionCalendar, ist_date, ist_now
+
+# ===== ORDERS (scheduler / paper venue / crash-safe state) =====
+from order_scheduler import OrderScheduler
+from paper_trade import PaperOrderManager
+from state_journal import JournalConfig, StateJournal
+
+# ===== MARKET DATA (WS → sanitize → candles / option chain) =====
+from ws_decoder import TickDecoder
+from ws_supervisor import ConnectionSupervisor, LocalCandleStub, SupervisorConfig, fetch_gap
+from tick_sanitizer import TickSanitizer
+from tick_pipeline import TickPipeline, PipelineConfig
+from candle_timer import CandleTimer
+from candle_store import CandleStore
+from warm_start import previous_trading_days, session_start, warm_start
+from option_chain import ChainConfig, OptionChain
+from greeks import GreeksEngine
+
+# ===== INFRA (login session / logging / latency / metrics) =====
+from session_manager import Session, SessionManager
+from bot_logger import setup_logging
+from latency_tracer import LatencyTracer
+from metrics import (MetricsRegistry, latency_collector, pipeline_collector,
+                     sanitizer_collector, start_http_server)
+
+# NOTE: broker / UI libs (pyotp, SmartApi, websocket, rich) yaha import nahi
+# hote — jaha use hote hain wahi lazily load hote hain (fast cold start).
+
+log = logging.getLogger(__name__)
 
 
 # ============================================================
@@ -30,6 +57,32 @@ class BotConfig:
         self.lot_size = 50
         self.max_lots_per_trade = 1
         self.paper_trade = True
+        # True → WS thread sirf enqueue karega, baaki kaam asyncio pipeline me
+        self.async_pipeline = True
+        # Prometheus /metrics port (None → endpoint band)
+        self.metrics_port = 9108
+        # Warm start: history JSON (LocalCandleStub format) ya None → broker API
+        self.warm_start_file = None
+        # Angel OpenAPIScripMaster.json (symbol → token) — None → tokens nahi
+        self.scrip_master_file = None
+        # Entry strike |delta| target (greeks.py); None → ATM (strike_logic)
+        self.target_delta = 0.5
+        # NSE holidays / special sessions JSON (market_calendar.py); None → sirf weekends
+        self.calendar_file = None
+        # Closed candles ka persistent store (candle_store.py); None → band
+        self.candle_store_dir = "data/candles"
+        # Candle boundary ke itne seconds baad wall-clock timer candle band kare
+        # (agle tick ka wait nahi); None → sirf tick-driven close
+        self.candle_close_grace = 0.25
+        # "Daksh" / "Sanjay" (RuleConfig.engine_mode)
+        self.engine_mode = "Sanjay"
+        # Journal / snapshot folder — ek machine par kai bots (tick_bus.py)
+        # chalein to har instance ka alag
+        self.state_dir = "state"
+        # True → trailing SL venue par resting STOPLOSS order (har SL change
+        # order_scheduler.submit_sl_modify se, coalesced); SL hit par wahi SELL
+        # karta hai. False → bot khud LTP dekh kar exit bhejta hai
+        self.broker_sl = False
 
 
 # ============================================================
@@ -38,52 +91,261 @@ class BotConfig:
 
 class OptionBot:
 
-    def __init__(self, api, config: BotConfig):
+    def __init__(self, api, config: BotConfig, order_manager=None):
+        """
+        order_manager → override (multiproc.py: orders ring buffer se
+        execution process ko jaate hain); None → paper / live OrderManager
+        """
         self.api = api
         self.cfg = config
 
-        self.rules_engine = RulesEngine(RuleConfig())
-        self.data_handler = DataFeedHandler(self.cfg.timeframe_minutes)
-        self.risk_manager = RiskManager(RiskManagerConfig())
-        self.order_manager = OrderManager(api)
-
-        self.position: Optional[PositionState] = None
-        print("[BOT] READY")
+        self.rules_engine = RulesEngine(RuleConfig(engine_mode=self.cfg.engine_mode))
+
+        # Session calendar: holidays / special sessions (candles + expiry dono)
+        self.calendar = (SessionCalendar.from_file(self.cfg.calendar_file)
+                         if self.cfg.calendar_file else SessionCalendar())
+
+        # Expiry + strike step + token: din me ek baar, entry par sirf dict lookup
+        self.strikes = StrikeResolver(self.cfg.index_symbol,
+                                      holidays=self.calendar.holidays)
+        if self.cfg.scrip_master_file:
+            self.strikes.tokens.load_scrip_master(self.cfg.scrip_master_file)
+        # Duplicate / out-of-order / bad print ticks candles tak nahi pahunchte
+        self.sanitizer = TickSanitizer()
+        self.data_handler = DataFeedHandler(self.cfg.timeframe_minutes,
+                                            calendar=self.calendar,
+                                            close_grace=self.cfg.candle_close_grace or 0.0)
+
+        # Crash-safe risk state: restart par daily PnL + open position wapas
+        self.journal = StateJournal(JournalConfig(base_dir=self.cfg.state_dir))
+        self.risk_manager = RiskManager(RiskManagerConfig(), journal=self.journal)
+        self.journal.recover(self.risk_manager)
+
+        # paper_trade=True → simulated venue, broker ko order nahi jayega
+        if order_manager is not None:
+            self.order_manager = order_manager
+        elif self.cfg.paper_trade:
+            self.order_manager = PaperOrderManager()
+        else:
+            from order_manager import OrderManager   # SmartApi sirf live mode me
+            self.order_manager = OrderManager(api)
+
+        # Broker rate-limit + priority (EXIT > SL MODIFY > ENTRY)
+        self.order_scheduler = OrderScheduler(self.order_manager)
+
+        self.position: Optional[PositionState] = self.risk_manager.position
+        # cfg.broker_sl: current position ke resting SL order ka id
+        self.sl_order_id: Optional[str] = None
+        self._sl_orders = 0
+
+        # Tick → order latency (per-stage histograms)
+        self.tracer = LatencyTracer()
+
+        # Option chain pehle index tick par banta hai (ATM chahiye)
+        self.chain: Optional[OptionChain] = None
+        # IV / Greeks background thread me (chain ke saath start hota hai)
+        self.greeks: Optional[GreeksEngine] = None
+        # (symbols) → subscribe / unsubscribe callbacks (MAIN me supervisor set karta hai)
+        self.on_chain_symbols = None
+        self.on_chain_unsubscribe = None
+        # Exchange-time IST day number → naya din / expiry par StrikeResolver.roll
+        self._session_day: Optional[int] = None
+
+        self._init_metrics()
+        log.info("[BOT] READY")
+
+    def _init_metrics(self):
+        """Hot path par sirf .inc() / .set(); baaki values scrape time par."""
+        m = self.metrics = MetricsRegistry()
+        dh = self.data_handler
+        sch = self.order_scheduler
+
+        self.m_ticks = m.counter("bot_ticks_total", "Index ticks processed")
+        self.m_last_tick = m.gauge("bot_last_tick_timestamp_seconds",
+                                   "Epoch of last processed tick")
+        self.m_evaluate = m.counter("bot_evaluate_total", "RulesEngine.evaluate calls")
+        self.m_decisions = m.counter("bot_decisions_total",
+                                     "Evaluate results by confidence tag",
+                                     ["confidence"])
+        self.m_entries = m.counter("bot_entries_total", "Positions opened")
+        self.m_exits = m.counter("bot_exits_total", "Positions closed", ["reason"])
+
+        m.counter_func("bot_candles_closed_total", "Candles closed",
+                       lambda: dh.candles_closed)
+        m.counter_func("bot_orders_sent_total", "Orders dispatched to broker",
+                       lambda: sch.sent)
+        sch.latency = m.histogram("bot_order_latency_seconds",
+                                  "Broker order call latency (place / exit / SL modify)",
+                                  ["kind"])
+        m.counter_func("bot_sl_modifies_coalesced_total", "SL modifies merged in queue",
+                       lambda: sch.coalesced)
+        m.gauge_func("bot_order_queue_depth", "Orders waiting for rate limit",
+                     sch.pending)
+        m.gauge_func("bot_daily_realized_pnl", "Realized PnL today",
+                     lambda: self.risk_manager.daily_realized)
+        m.gauge_func("bot_position_open", "1 if a position is open",
+                     lambda: 1 if self.position and self.position.is_open else 0)
+        m.gauge_func("bot_chain_pcr", "Option chain put-call ratio",
+                     lambda: self.chain.pcr() if self.chain else 0.0)
+        m.gauge_func("bot_chain_max_pain", "Option chain max pain strike",
+                     lambda: (self.chain.max_pain() or 0) if self.chain else 0)
+        self.m_option_dropped = m.counter("bot_option_ticks_dropped_total",
+                                          "Non-index ticks outside the chain window")
+        m.counter_func("bot_late_ticks_total", "Ticks for candles already closed by the timer",
+                       lambda: dh.late_ticks)
+        m.add_collector(sanitizer_collector(self.sanitizer))
+        m.add_collector(latency_collector(self.tracer))
 
     def on_tick(self, tick: Dict):
+        context = self.update_feed(tick)
+        if context:
+            self.on_context(context)
+        self.tracer.end()
+
+    def update_feed(self, tick: Dict, checked: bool = False) -> Optional[MarketContext]:
+        """
+        Tick → candle update → MarketContext (None agar data kam hai).
+        checked=True → sanitizer pehle hi chal chuka (pipeline decode stage)
+        """
+        if not checked and not self.sanitizer.check(tick):
+            return None
+        trace = self.tracer.current
+
+        symbol = tick.get("symbol")
+        if symbol != self.cfg.index_symbol:
+            # Option tick → chain arrays + paper venue, strategy nahi chalti.
+            # Window ke bahar / anjaan NFO symbol → drop (index candles me kabhi
+            # nahi); sirf open position ka symbol window ke bahar bhi chalta hai
+            chain = self.chain
+            if chain is None or not chain.on_tick(tick):
+                pos = self.position
+                if not (pos and pos.is_open and pos.symbol == symbol):
+                    self.m_option_dropped.inc()
+                    return None
+            self.on_option_tick(symbol, tick["last_traded_price"],
+                                tick.get("exchange_timestamp"))
+            return None
+
+        ts = int(tick["exchange_timestamp"])
+        if (ts + IST_OFFSET) // DAY != self._session_day:
+            self._new_session(ts)
+
         self.data_handler.ws_callback(tick)
+        trace.mark("candle")
+        self._track_chain(tick["last_traded_price"])
+        self.m_ticks.inc()
+        self.m_last_tick.set(tick.get("timestamp") or 0)
 
         context = self.data_handler.build_market_context(
             symbol=self.cfg.index_symbol
         )
-        if not context:
+        trace.mark("context")
+        return context
+
+    def _new_session(self, ts: int):
+        """
+        Naya IST din (bot raat bhar chala / replay) → expiry roll. Expiry badli
+        to purani chain ke contracts hi alag hain → chain + greeks dobara
+        banenge (agle _track_chain me), purane symbols unsubscribe.
+        """
+        self._session_day = (ts + IST_OFFSET) // DAY
+        day = ist_date(ts)
+        if day == self.strikes.today:
             return
+        expiry = self.strikes.expiry
+        self.strikes.roll(day)
+        if self.chain is not None and self.strikes.expiry != expiry:
+            self._retire_symbols(self.chain.symbols())
+            self.greeks.stop()
+            self.chain = None
+            self.greeks = None
+
+    def _track_chain(self, spot: float):
+        """Chain banao / ATM shift par window move karo + naye symbols subscribe."""
+        if self.chain is None:
+            # Window ke symbols + tokens pehle se cache (entry par api_lookup nahi)
+            self.strikes.prewarm(spot)
+            self.chain = OptionChain(self.cfg.index_symbol, spot,
+                                     ChainConfig(strike_step=self.strikes.step),
+                                     symbol_fn=self.strikes.symbol)
+            self.data_handler.attach_chain(self.chain)
+            prices = self.data_handler.underlying_prices
+            self.greeks = GreeksEngine(
+                self.chain, lambda: prices[-1] if prices else 0.0,
+                datetime.combine(self.strikes.expiry, dtime(15, 30)))
+            self.greeks.start()
+        elif self.chain.track_spot(spot):
+            self.strikes.prewarm(spot)
+            self._retire_symbols(self.chain.retired)
+        else:
+            return
+        if self.on_chain_symbols is not None:
+            self.on_chain_symbols(self.chain.symbols())
 
+    def _retire_symbols(self, symbols):
+        """Window ke bahar gaye strikes unsubscribe (open position wala chhod ke)."""
+        if self.on_chain_unsubscribe is None:
+            return
+        held = self.position.symbol if self.position and self.position.is_open else None
+        gone = [s for s in symbols if s != held]
+        if gone:
+            self.on_chain_unsubscribe(gone)
+
+    def on_candle_close(self):
+        """Wall-clock timer ne candle band ki → agle tick ka wait kiye bina evaluate."""
+        self.tracer.begin()
+        context = self.data_handler.build_market_context(symbol=self.cfg.index_symbol)
+        if context:
+            self.on_context(context)
+        self.tracer.end()
+
+    def on_context(self, context: MarketContext):
+        """Open position manage karo ya nayi entry check karo."""
         if self.position and self.position.is_open:
             self._manage_position(context)
         else:
             self._check_entry(context)
 
+    def on_option_tick(self, symbol: str, ltp: float, ts: Optional[float] = None):
+        """Option LTP stream (live ya replay) → paper venue matching."""
+        if self.cfg.paper_trade:
+            self.order_manager.on_price(symbol, ltp, ts)
+
+    def _option_ltp(self, symbol: str) -> float:
+        if self.cfg.paper_trade:
+            ltp = self.order_manager.get_option_ltp(symbol)
+            if ltp:
+                return ltp
+        return self.api.get_option_ltp(symbol)
+
     def _check_entry(self, context: MarketContext):
         if not self.risk_manager.can_take_trade():
             return
 
+        trace = self.tracer.current
+
         decision = self.rules_engine.evaluate(context)
+        trace.mark("evaluate")
+        self.m_evaluate.inc()
+        self.m_decisions.labels(decision.confidence_tag).inc()
         if not decision.should_enter:
             return
 
         direction = decision.direction
         index_price = context.candles[-1].c
 
-        option_symbol = get_option_symbol(
-            direction=direction,
-            underlying_price=index_price,
-            index_name=self.cfg.index_symbol
-        )
+        strike = None
+        if self.greeks is not None and self.cfg.target_delta:
+            strike = self.greeks.strike_for_delta(direction, self.cfg.target_delta)
+        if strike is None:
+            option_symbol, token = self.strikes.resolve(direction, index_price)
+        else:
+            option_symbol, token = self.strikes.lookup(strike, direction)
 
-        option_ltp = self.api.get_option_ltp(option_symbol)
+        option_ltp = self._option_ltp(option_symbol)
+        trace.mark("strike")
 
-        print(f"[ENTRY] {direction} {option_symbol} @ {option_ltp}")
+        log.info("[ENTRY] %s %s @ %s", direction, option_symbol, option_ltp)
 
         self.position = self.risk_manager.create_position(
             symbol=option_symbol,
@@ -91,16 +353,49 @@ class OptionBot:
             entry_price=option_ltp,
             qty=self.cfg.lot_size * self.cfg.max_lots_per_trade
         )
+        trace.mark("risk")
+        self.m_entries.inc()
+        callback = None
+        if self.cfg.broker_sl:
+            self._sl_orders += 1
+            self.sl_order_id = f"SL{self._sl_orders}"
+            # SL tab rakho jab BUY broker tak chala gaya (priority me SL pehle jaata)
+            callback = self._place_sl(self.position, self.sl_order_id, token)
+        self.order_scheduler.submit_entry(option_symbol, self.position.qty,
+                                          callback=callback, trace=trace, token=token)
+
+    def _place_sl(self, pos: PositionState, sl_id: str, token: Optional[str]):
+        def _on_entry(job, result):
+            if result and pos.is_open:
+                self.order_scheduler.submit_sl_modify(sl_id, pos.symbol, pos.sl_price,
+                                                      pos.qty, token=token)
+        return _on_entry
 
     def _manage_position(self, context: MarketContext):
-        option_ltp = self.api.get_option_ltp(self.position.symbol)
+        option_ltp = self._option_ltp(self.position.symbol)
+        # Token entry ke time TokenBook me cache ho chuka (restart → scrip master)
+        token = self.strikes.tokens.token(self.position.symbol)
 
+        old_sl = self.position.sl_price
         self.risk_manager.update_trailing_sl(option_ltp)
+        if self.sl_order_id and self.position.sl_price != old_sl:
+            # Kai step ek saath → queue me sirf latest trigger price bachega
+            self.order_scheduler.submit_sl_modify(self.sl_order_id, self.position.symbol,
+                                                  self.position.sl_price,
+                                                  self.position.qty, token=token)
         exit_signal = self.risk_manager.check_exit(option_ltp)
 
         if exit_signal:
+            sl_id, self.sl_order_id = self.sl_order_id, None
+            # SL_HIT + resting SL → venue khud SELL karta hai, doosra exit nahi
+            if sl_id is None or exit_signal != "SL_HIT":
+                if sl_id is not None:
+                    self.order_scheduler.submit_cancel(sl_id)
+                self.order_scheduler.submit_exit(self.position.symbol, self.position.qty,
+                                                 trace=self.tracer.current, token=token)
             pnl = self.risk_manager.close_position(option_ltp)
-            print(f"[EXIT] {exit_signal} | PnL={pnl}")
+            log.info("[EXIT] %s | PnL=%s", exit_signal, pnl)
+            self.m_exits.labels(exit_signal).inc()
             self.position = None
 
 
@@ -117,23 +412,47 @@ class MStockClient:
         self.totp_secret = totp_secret
         self.access_token = None
 
-    def login(self):
+        # Disk cached session → restart par TOTP login skip (REST + WS shared)
+        self.sessions = SessionManager(self._login, account=f"{api_key}:{client_id}")
+        self.sessions.on_refresh(self._set_session)
+
+    def _set_session(self, session: Session):
+        self.access_token = session.access_token
+
+    def _login(self) -> Session:
+        import pyotp   # lazy: sirf login ke time chahiye
+
         totp = pyotp.TOTP(self.totp_secret).now()
-        print("[mStock] AUTO-TOTP:", totp)
+        log.info("[mStock] AUTO-TOTP: %s", totp)
 
         # 🔴 REAL LOGIN API CALL HOGA (Tumhare docs ke hisaab se)
         # response = ...
-        # self.access_token = response["access_token"]
+        # return Session(access_token=response["access_token"], ...)
 
+        log.info("[mStock] Login OK")
+        return Session(access_token="eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9....")
 
-        self.access_token = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...."
-        print("[mStock] Login OK")
+    def login(self):
+        """Cached session valid ho to reuse, warna login; phir background refresh."""
+        self.sessions.get()
+        self.sessions.start_refresher()
+
+    def ws_url(self) -> str:
+        """Har (re)connect par current token — refresh ke baad naya wala."""
+        return (f"{MSTOCK_WS_BASE}?API_KEY={self.api_key}"
+                f"&ACCESS_TOKEN={self.sessions.get().access_token}")
 
     def get_option_ltp(self, option_symbol: str) -> float:
         # 🔴 REAL REST OPTION LTP API HOGA
         # abhi placeholder
         return 0.0
 
+    def fetch_candles(self, symbol: str, start: datetime, end: datetime,
+                      timeframe_minutes: int) -> list:
+        # 🔴 REAL HISTORICAL CANDLE API HOGA (reconnect gap backfill ke liye)
+        # abhi placeholder
+        return []
+
 
 # ============================================================
 # 4️⃣ 🔐 FILL YOUR DETAILS HERE (ONLY PLACE)
@@ -150,54 +469,53 @@ TOTP_SECRET      = "PORENNG2PEYBSCO5GUL26KVBE73XNULB"
 # 5️⃣ MARKET DATA WEBSOCKET URL
 # ============================================================
 
-MSTOCK_WS_URL = (
-    "wss://ws.mstock.trade"
-    f"?API_KEY={MSTOCK_API_KEY}"
-    f"&ACCESS_TOKEN=eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...."
-)
+# ACCESS_TOKEN session se aata hai → MStockClient.ws_url()
+MSTOCK_WS_BASE = "wss://ws.mstock.trade"
 
 
 
 # ============================================================
-# 6️⃣ WS CALLBACKS (ONLY INDEX DATA)
+# 6️⃣ WS CALLBACKS (ONLY INDEX DATA) — connection ws_supervisor.py sambhalta hai
 # ============================================================
 
-def ws_on_open(ws):
-    print("🟢 WS CONNECTED")
-
-    subscribe_msg = {
-        "action": "subscribe",
-        "mode": "LTP",
-        "instruments": [
-            {
-                "exchange": "NSE",
-                "symbol": bot.cfg.index_symbol
-            }
-        ]
-    }
+# MAIN me set hota hai (BotConfig.async_pipeline)
+pipeline: Optional[TickPipeline] = None
 
-    ws.send(json.dumps(subscribe_msg))
-    print(f"📡 Subscribed to {bot.cfg.index_symbol}")
+# Fast-path decoder (orjson agar installed, non-price frames skip)
+decoder = TickDecoder()
 
+# Sync mode: WS thread aur candle timer thread data_handler ko isi lock se share karte hain
+tick_lock = threading.Lock()
 
 def ws_on_message(ws, message):
-    data = json.loads(message)
+    if pipeline is not None:
+        # Socket thread par sirf enqueue — strategy kaam pipeline karega
+        pipeline.feed(message)
+        return
 
-    if "ltp" in data:
-        tick = {
-            "last_traded_price": float(data["ltp"]),
-            "timestamp": int(time.time()),
-            "exchange_timestamp": int(time.time())
-        }
-        bot.on_tick(tick)
+    with tick_lock:
+        bot.tracer.begin()
+        tick = decoder(message)
+        bot.tracer.current.mark("decode")
 
+        if tick is not None:
+            bot.on_tick(tick)
 
-def ws_on_error(ws, error):
-    print("❌ WS ERROR:", error)
 
+def on_reconnect(gap_start: datetime):
+    """Reconnect ke baad gap ke candles historical API se backfill."""
+    dh = bot.data_handler
+    symbol = bot.cfg.index_symbol
 
-def ws_on_close(ws, close_status_code, close_msg):
-    print(f"🔴 WS CLOSED | code={close_status_code} msg={close_msg}")
+    if pipeline is not None:
+        # REST fetch executor me (reconnect burst ke time loop block na ho),
+        # merge aggregate stage ke saath same event loop par
+        pipeline.offload(lambda: fetch_gap(dh, api, symbol, gap_start),
+                         lambda res: dh.backfill_candles(*res))
+    else:
+        res = fetch_gap(dh, api, symbol, gap_start)
+        with tick_lock:
+            dh.backfill_candles(*res)
 
 
 
@@ -207,6 +525,9 @@ def ws_on_close(ws, close_status_code, close_msg):
 
 if __name__ == "__main__":
 
+    # Sabse pehle: queue-based logging (trading thread par koi file I/O nahi)
+    setup_logging()
+
     cfg = BotConfig()                 # NIFTY / BANKNIFTY yahin change
     api = MStockClient(
         api_key=MSTOCK_API_KEY,
@@ -218,15 +539,66 @@ if __name__ == "__main__":
     api.login()
 
     bot = OptionBot(api, cfg)
-
-    print("🚀 BOT STARTED")
-
-    ws = WebSocketApp(
-        MSTOCK_WS_URL,
-        on_open=ws_on_open,
+    bot.tracer.start_reporter(interval=60)
+
+    # Closed candles disk par bhi (restart / backtest / dashboard ke liye)
+    store = CandleStore(cfg.candle_store_dir) if cfg.candle_store_dir else None
+
+    # Pichhle sessions ke candles → pehle tick se hi saare rules live.
+    # Store me pichhle trading day tak ka data ho to API call nahi.
+    if cfg.warm_start_file:
+        history = LocalCandleStub(path=cfg.warm_start_file)
+    elif store is not None and store.is_fresh(
+            cfg.index_symbol, cfg.timeframe_minutes,
+            session_start(previous_trading_days(ist_now(), 1, bot.calendar)[0])):
+        history = store
+    else:
+        history = api
+    warm_start(bot.data_handler, history, cfg.index_symbol)
+    if store is not None:
+        bot.data_handler.attach_store(
+            store.series(cfg.index_symbol, cfg.timeframe_minutes))
+
+    pipeline = None
+    if cfg.async_pipeline:
+        # Pipeline ka execute stage hi order scheduler pump karta hai
+        # Pipeline ticks queue me rakhta hai → har tick ka apna dict chahiye
+        decoder = TickDecoder(copy=True)
+        pipeline = TickPipeline(bot, decoder, PipelineConfig(
+            conflate_bucket_seconds=cfg.timeframe_minutes * 60,
+            candle_timer=cfg.candle_close_grace is not None))
+        pipeline.start()
+    else:
+        bot.order_scheduler.start()
+        if cfg.candle_close_grace is not None:
+            CandleTimer(bot.data_handler, bot.on_candle_close, tick_lock).start()
+
+    log.info("🚀 BOT STARTED")
+
+    supervisor = ConnectionSupervisor(
+        url_factory=api.ws_url,
         on_message=ws_on_message,
-        on_error=ws_on_error,
-        on_close=ws_on_close
+        on_reconnect=on_reconnect,
+        config=SupervisorConfig(calendar=bot.calendar),
     )
-
-    ws.run_forever()
+    supervisor.add_subscription("NSE", cfg.index_symbol)
+    # Chain symbols NFO par FULL mode me (subscription_mode) — LTP frame me OI nahi
+    bot.on_chain_symbols = lambda symbols: [
+        supervisor.add_subscription("NFO", s) for s in symbols]
+    bot.on_chain_unsubscribe = lambda symbols: [
+        supervisor.remove_subscription("NFO", s) for s in symbols]
+
+    if cfg.metrics_port:
+        bot.metrics.counter_func("bot_ws_reconnects_total", "WebSocket reconnects",
+                                 lambda: supervisor.reconnects)
+        bot.metrics.gauge_func("bot_ws_connected", "1 if WebSocket is connected",
+                               lambda: 1 if supervisor.connected else 0)
+        if pipeline is not None:
+            bot.metrics.add_collector(pipeline_collector(pipeline))
+        start_http_server(bot.metrics, cfg.metrics_port)
+
+    try:
+        supervisor.run_forever()
+    finally:
+        if store is not None:
+            store.close()
@@ -0,0 +1,147 @@
+"""
+bot_logger.py
+
+Non-blocking structured logging.
+
+Pehle risk_manager / order_manager / data_feed_handler / bot_core sab
+print() se synchronously stdout par likhte the — per-tick loops ke andar bhi.
+
+Ab:
+- Har module `log = logging.getLogger(__name__)` use karta hai
+- Root logger par sirf ek QueueHandler hai → trading thread par
+  record queue me jaata hai, koi file/console I/O nahi
+- QueueListener (background thread) console + dated file me likhta hai:
+      logs/YYYY-MM-DD/bot.log   (din badalte hi naya folder)
+- Messages lazy format hote hain: log.info("SL=%s", sl) — level off hai
+  toh string banti hi nahi
+- Per-module levels: setup_logging(levels={"data_feed_handler": "WARNING"})
+
+Format existing SmartApi logs jaisa hi rakha hai:
+    [I 251210 09:15:02 risk_manager:182] Trail SL step 20 → SL=100.0
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import date
+from typing import Dict, Optional
+
+
+LOG_FORMAT = "[%(levelname).1s %(asctime)s %(module)s:%(lineno)d] %(message)s"
+DATE_FORMAT = "%y%m%d %H:%M:%S"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Dated file handler (logs/YYYY-MM-DD/<file>)
+# ---------------------------------------------------------------------
+
+class DatedFileHandler(logging.Handler):
+    """
+    Din ke hisaab se folder rotate karta hai.
+    Sirf listener thread se call hota hai, isliye date check ka cost
+    trading thread par nahi padta.
+    """
+
+    def __init__(self, base_dir: str = "logs", filename: str = "bot.log",
+                 encoding: str = "utf-8"):
+        super().__init__()
+        self.base_dir = base_dir
+        self.filename = filename
+        self.encoding = encoding
+        self._day: Optional[date] = None
+        self._stream = None
+
+    def _roll(self, today: date):
+        if self._stream is not None:
+            self._stream.close()
+        folder = os.path.join(self.base_dir, today.isoformat())
+        os.makedirs(folder, exist_ok=True)
+        self._stream = open(os.path.join(folder, self.filename), "a",
+                            encoding=self.encoding)
+        self._day = today
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            today = date.fromtimestamp(record.created)
+            if today != self._day:
+                self._roll(today)
+            self._stream.write(self.format(record) + "\n")
+            self._stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        super().close()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Stdlib QueueHandler.prepare() message ko caller thread par hi format
+    kar deta hai. Hum record as-is queue me daalte hain — "%s" merge
+    bhi listener thread par hota hai.
+
+    NOTE: log args ko baad me mutate mat karo (same process hai, copy nahi hoti).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Setup (bot start par ek baar)
+# ---------------------------------------------------------------------
+
+def setup_logging(level: str = "INFO",
+                  levels: Optional[Dict[str, str]] = None,
+                  base_dir: str = "logs",
+                  filename: str = "bot.log",
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """
+    level  → default root level
+    levels → per-module override, e.g. {"data_feed_handler": "WARNING"}
+
+    Returns: QueueListener (stop_logging() exit par khud call hota hai)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    fmt = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+
+    sinks = [DatedFileHandler(base_dir, filename)]
+    if console:
+        sinks.append(logging.StreamHandler())
+    for h in sinks:
+        h.setFormatter(fmt)
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [_DeferredQueueHandler(q)]
+    root.setLevel(level)
+
+    for name, lvl in (levels or {}).items():
+        logging.getLogger(name).setLevel(lvl)
+
+    _listener = logging.handlers.QueueListener(q, *sinks, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Queue me pade records flush karke listener band karo."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
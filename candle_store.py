@@ -0,0 +1,377 @@
+"""
+candle_store.py
+
+Persistent candle store — har symbol / timeframe ki ek columnar file,
+mmap se padhi / likhi jaati hai.
+
+Pehle:
+    Candles sirf DataFeedHandler.candles (max 200) me — process band,
+    history gayab. Backtest / warm start / dashboard ko har baar API.
+
+Ab:
+- data/candles/NIFTY/5m.cols → ek file, andar har column ek contiguous
+  block (ts int64 epoch, o / h / l / c / v / ce_oi / pe_oi float64).
+  Candle.ts (naive IST wall clock) ↔ epoch market_calendar ke IST
+  helpers se — host TZ kuch bhi ho, file same
+- Candle close par append: sirf 8 slots me likhna + count publish
+  (count sabse baad → reader ko adhoori row nahi dikhti)
+- Range query: ts column par bisect (memoryview, O(log n)), result
+  zero-copy memoryview slices — saal bhar ke bars bhi memory me load
+  nahi hote, OS pages sirf jo padhe wahi laata hai
+- to_numpy(): numpy installed ho to np.frombuffer (zero-copy) views
+- Capacity full → double size ki nayi file + os.replace; purane readers
+  ka mmap valid rehta hai, refresh() par naya file map hota hai
+
+Single writer per file (live bot). Readers (dashboard, backtest) kitne bhi.
+
+CLI:
+    python candle_store.py info
+    python candle_store.py import history.json --tf 5
+    python candle_store.py query NIFTY --tf 5 --start 2025-12-01 --end 2025-12-02
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import logging
+import math
+import mmap
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from market_calendar import ist_datetime, ist_epoch
+from rules_engine import Candle
+
+log = logging.getLogger(__name__)
+
+MAGIC = int.from_bytes(b"CNDLCOL1", "little")
+VERSION = 1
+COLUMNS = ("ts", "o", "h", "l", "c", "v", "ce_oi", "pe_oi")
+_FMT = {"ts": "q"}                  # baaki sab "d"
+
+# Header: 8 × u64 → [magic, version, ncols, capacity, count, 0, 0, 0]
+_HEADER = 64
+_CAPACITY = 3
+_COUNT = 4
+
+NAN = math.nan
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — File layout helpers
+# ---------------------------------------------------------------------
+
+def _file_size(capacity: int) -> int:
+    return _HEADER + len(COLUMNS) * capacity * 8
+
+
+def _create(path: str, capacity: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w+b") as f:
+        f.truncate(_file_size(capacity))
+        mm = mmap.mmap(f.fileno(), 0)
+        with memoryview(mm) as mv, mv[:_HEADER].cast("Q") as hdr:
+            hdr[0], hdr[1], hdr[2], hdr[_CAPACITY], hdr[_COUNT] = (
+                MAGIC, VERSION, len(COLUMNS), capacity, 0)
+        mm.close()
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — CandleSeries (ek symbol / timeframe)
+# ---------------------------------------------------------------------
+
+class CandleSeries:
+
+    def __init__(self, path: str, writable: bool = False,
+                 initial_capacity: int = 4096):
+        """
+        writable=True → file na ho to banegi (initial_capacity rows)
+        writable=False → read-only mmap (file na ho to khaali series)
+        """
+        self.path = path
+        self.writable = writable
+        self._mm: Optional[mmap.mmap] = None
+        self._cols: List[memoryview] = []
+        self._ino = None
+        self.capacity = 0
+        if writable and not os.path.exists(path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            _create(path, initial_capacity)
+        self._map()
+
+    def _map(self):
+        self._drop()
+        if not os.path.exists(self.path):
+            return
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        with open(self.path, "r+b" if self.writable else "rb") as f:
+            self._ino = os.fstat(f.fileno()).st_ino
+            mm = mmap.mmap(f.fileno(), 0, access=access)
+        mv = memoryview(mm)
+        hdr = mv[:_HEADER].cast("Q")
+        if hdr[0] != MAGIC or hdr[2] != len(COLUMNS):
+            raise ValueError(f"{self.path}: not a candle store file")
+        self._mm = mm
+        self._mv = mv
+        self._hdr = hdr
+        self.capacity = cap = hdr[_CAPACITY]
+        # Full-capacity typed column views (index = row)
+        self._cols = []
+        for i, name in enumerate(COLUMNS):
+            off = _HEADER + i * cap * 8
+            self._cols.append(mv[off:off + cap * 8].cast(_FMT.get(name, "d")))
+
+    def _drop(self):
+        """Apne views chhodo. Caller ke paas range views ho to mmap unke saath zinda rahega."""
+        if self._mm is None:
+            return
+        self._cols = []
+        self._hdr = self._mv = None
+        self._mm = None
+
+    def refresh(self) -> bool:
+        """Reader: writer ne file grow / replace ki ho to naya map. True agar remap hua."""
+        try:
+            ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+        if ino == self._ino:
+            return False
+        self._map()
+        return True
+
+    def __len__(self) -> int:
+        return self._hdr[_COUNT] if self._mm is not None else 0
+
+    def last_ts(self) -> Optional[int]:
+        n = len(self)
+        return self._cols[0][n - 1] if n else None
+
+    # -----------------------------------------------------------------
+    # STEP 3 — Append (writer, candle close par)
+    # -----------------------------------------------------------------
+
+    def append(self, ts: int, o: float, h: float, l: float, c: float, v: float,
+               ce_oi: float = NAN, pe_oi: float = NAN) -> bool:
+        """
+        Ek row. ts last se purana → ignore (False); barabar → wahi row
+        overwrite (backfill / revised candle).
+        """
+        n = self._hdr[_COUNT]
+        cols = self._cols
+        if n:
+            last = cols[0][n - 1]
+            if ts < last:
+                return False
+            if ts == last:
+                n -= 1
+                for col, val in zip(cols, (ts, o, h, l, c, v, ce_oi, pe_oi)):
+                    col[n] = val
+                return True
+        if n == self.capacity:
+            self._grow()
+            cols = self._cols
+        for col, val in zip(cols, (ts, o, h, l, c, v, ce_oi, pe_oi)):
+            col[n] = val
+        self._hdr[_COUNT] = n + 1                     # publish (8-byte store)
+        return True
+
+    def append_candle(self, candle: Candle, ce_oi: float = NAN,
+                      pe_oi: float = NAN) -> bool:
+        return self.append(ist_epoch(candle.ts), candle.o, candle.h, candle.l,
+                           candle.c, candle.v, ce_oi, pe_oi)
+
+    def _grow(self):
+        """Double capacity: nayi file me columns copy, phir atomic replace."""
+        n = self._hdr[_COUNT]
+        cap = self.capacity * 2
+        tmp = self.path + ".grow"
+        with open(tmp, "w+b") as f:
+            f.truncate(_file_size(cap))
+            mm = mmap.mmap(f.fileno(), 0)
+            with memoryview(mm) as mv:
+                mv[:_HEADER] = self._mv[:_HEADER]
+                for i in range(len(COLUMNS)):
+                    src = _HEADER + i * self.capacity * 8
+                    dst = _HEADER + i * cap * 8
+                    mv[dst:dst + n * 8] = self._mv[src:src + n * 8]
+                with mv[:_HEADER].cast("Q") as hdr:
+                    hdr[_CAPACITY] = cap
+            mm.flush()
+            mm.close()
+        os.replace(tmp, self.path)
+        self._map()
+        log.info("Candle store %s grown to %s rows", self.path, cap)
+
+    def flush(self):
+        if self._mm is not None and self.writable:
+            self._mm.flush()
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Range queries (zero-copy)
+    # -----------------------------------------------------------------
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[int, int]:
+        """[start, end) epoch seconds → row slice (i, j). Binary search."""
+        n = len(self)
+        if not n:
+            return 0, 0
+        ts = self._cols[0][:n]
+        i = 0 if start is None else bisect.bisect_left(ts, start)
+        j = n if end is None else bisect.bisect_left(ts, end, i)
+        ts.release()
+        return i, j
+
+    def view(self, start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, memoryview]:
+        """Column name → memoryview slice (copy nahi). Kaam ke baad release() karein."""
+        i, j = self.range(start, end)
+        return {name: col[i:j] for name, col in zip(COLUMNS, self._cols)}
+
+    def to_numpy(self, start: Optional[int] = None, end: Optional[int] = None):
+        """Column name → numpy array view (zero-copy). NumPy optional dependency."""
+        import numpy as np
+        i, j = self.range(start, end)
+        cap = self.capacity
+        out = {}
+        for k, name in enumerate(COLUMNS):
+            dtype = np.int64 if name == "ts" else np.float64
+            out[name] = np.frombuffer(self._mm, dtype=dtype, count=j - i,
+                                      offset=_HEADER + (k * cap + i) * 8)
+        return out
+
+    def candles(self, start: Optional[int] = None,
+                end: Optional[int] = None) -> List[Candle]:
+        i, j = self.range(start, end)
+        if i == j:
+            return []
+        ts, o, h, l, c, v = self._cols[:6]
+        return [Candle(ts=ist_datetime(ts[k]), o=o[k], h=h[k], l=l[k], c=c[k], v=v[k])
+                for k in range(i, j)]
+
+    def oi(self, start: Optional[int] = None,
+           end: Optional[int] = None) -> Tuple[List[float], List[float]]:
+        """(ce_oi, pe_oi) — jin rows me OI record hua (nan skip)."""
+        i, j = self.range(start, end)
+        ce, pe = self._cols[6], self._cols[7]
+        rows = [(ce[k], pe[k]) for k in range(i, j) if ce[k] == ce[k]]
+        return [int(r[0]) for r in rows], [int(r[1]) for r in rows]
+
+    def close(self):
+        if self.writable:
+            self.flush()
+        mm = self._mm
+        self._drop()
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass                    # caller ke views abhi zinda hain
+
+
+# ---------------------------------------------------------------------
+# STEP 5 — CandleStore (symbol / timeframe → series)
+# ---------------------------------------------------------------------
+
+class CandleStore:
+    """
+    base_dir/<SYMBOL>/<tf>m.cols
+
+    warm_start.py ke liye CandleSource interface bhi deta hai
+    (fetch_candles / fetch_oi), LocalCandleStub jaisa.
+    """
+
+    def __init__(self, base_dir: str = "data/candles", writable: bool = True):
+        self.base_dir = base_dir
+        self.writable = writable
+        self._series: Dict[Tuple[str, int], CandleSeries] = {}
+
+    def path(self, symbol: str, timeframe_minutes: int) -> str:
+        return os.path.join(self.base_dir, symbol, f"{timeframe_minutes}m.cols")
+
+    def series(self, symbol: str, timeframe_minutes: int) -> CandleSeries:
+        key = (symbol, timeframe_minutes)
+        s = self._series.get(key)
+        if s is None:
+            s = self._series[key] = CandleSeries(self.path(symbol, timeframe_minutes),
+                                                 writable=self.writable)
+        elif not self.writable:
+            s.refresh()
+        return s
+
+    def fetch_candles(self, symbol: str, start: datetime, end: datetime,
+                      timeframe_minutes: int) -> List[Candle]:
+        return self.series(symbol, timeframe_minutes).candles(
+            ist_epoch(start), ist_epoch(end))
+
+    def fetch_oi(self, symbol: str, start: datetime, end: datetime,
+                 timeframe_minutes: int) -> Tuple[List[int], List[int]]:
+        return self.series(symbol, timeframe_minutes).oi(
+            ist_epoch(start), ist_epoch(end))
+
+    def is_fresh(self, symbol: str, timeframe_minutes: int, since: datetime) -> bool:
+        """Store me `since` ke baad ka koi candle hai? (warm start source choose karne ke liye)"""
+        last = self.series(symbol, timeframe_minutes).last_ts()
+        return last is not None and last >= ist_epoch(since)
+
+    def listing(self) -> List[Tuple[str, int, int]]:
+        """(symbol, tf, rows) — disk par jo bhi series hain."""
+        out = []
+        if not os.path.isdir(self.base_dir):
+            return out
+        for sym in sorted(os.listdir(self.base_dir)):
+            d = os.path.join(self.base_dir, sym)
+            for fn in sorted(os.listdir(d)):
+                if fn.endswith("m.cols"):
+                    tf = int(fn[:-len("m.cols")])
+                    out.append((sym, tf, len(self.series(sym, tf))))
+        return out
+
+    def close(self):
+        for s in self._series.values():
+            s.close()
+        self._series.clear()
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Candle store (mmap columnar)")
+    ap.add_argument("--dir", default="data/candles")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info")
+    imp = sub.add_parser("import", help="LocalCandleStub JSON → store")
+    imp.add_argument("file")
+    imp.add_argument("--tf", type=int, default=5)
+    q = sub.add_parser("query")
+    q.add_argument("symbol")
+    q.add_argument("--tf", type=int, default=5)
+    q.add_argument("--start", default=None)
+    q.add_argument("--end", default=None)
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        for sym, tf, rows in CandleStore(args.dir, writable=False).listing():
+            print(f"{sym:<12} {tf:>3}m {rows:>10,} rows")
+    elif args.cmd == "import":
+        from ws_supervisor import LocalCandleStub
+        stub = LocalCandleStub(path=args.file)
+        store = CandleStore(args.dir)
+        for sym, candles in stub.candles.items():
+            oi = {r[0]: (r[1], r[2]) for r in stub.oi.get(sym, [])}
+            s = store.series(sym, args.tf)
+            added = sum(s.append_candle(c, *oi.get(c.ts, (NAN, NAN)))
+                        for c in sorted(candles, key=lambda x: x.ts))
+            print(f"{sym}: {added} candles → {s.path} ({len(s)} rows)")
+        store.close()
+    else:
+        s = CandleStore(args.dir, writable=False).series(args.symbol, args.tf)
+        start = ist_epoch(datetime.fromisoformat(args.start)) if args.start else None
+        end = ist_epoch(datetime.fromisoformat(args.end)) if args.end else None
+        for c in s.candles(start, end):
+            print(f"{c.ts}  O:{c.o} H:{c.h} L:{c.l} C:{c.c} V:{c.v}")
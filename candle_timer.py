@@ -0,0 +1,77 @@
+"""
+candle_timer.py
+
+Wall-clock candle close timer (sync mode ke liye).
+
+Pehle:
+    Candle tabhi band hoti thi jab agle period ka pehla tick aata —
+    thin market me 09:20 wala signal 09:20:07 ya aur der se.
+
+Ab:
+- Background thread running candle ke deadline (boundary + grace) tak
+  sota hai, phir tick path wale lock ke andar
+  DataFeedHandler.close_if_due() + on_close() chalata hai
+- Grace (DataFeedHandler.close_grace) exchange timestamps ki der ke liye —
+  boundary se pehle ke late ticks abhi bhi purani candle me jaate hain
+- Beech me tick ne candle band kar di → naya deadline, timer kuch nahi karta
+
+Async pipeline mode me ye kaam TickPipeline ka candle timer stage karta
+hai (same event loop, lock nahi). Poll loops (multiproc / tick_bus
+strategy) har iteration par seedha data_handler.close_if_due(time.time())
+call karte hain (sim replay me band).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class CandleTimer:
+
+    def __init__(self, data_handler, on_close: Callable[[], None],
+                 lock: threading.Lock, max_sleep: float = 1.0):
+        """
+        on_close → candle band hone ke baad (lock ke andar), e.g. OptionBot.on_candle_close
+        lock     → wahi lock jo tick processing leti hai
+        """
+        self.dh = data_handler
+        self.on_close = on_close
+        self.lock = lock
+        self.max_sleep = max_sleep
+        self.fired = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _loop(self):
+        dh = self.dh
+        while not self._stop.is_set():
+            deadline = dh.close_deadline()
+            now = time.time()
+            if deadline is None or now < deadline:
+                wait = self.max_sleep if deadline is None else min(deadline - now,
+                                                                   self.max_sleep)
+                self._stop.wait(wait)
+                continue
+            with self.lock:
+                if not dh.close_if_due(time.time()):
+                    continue
+                self.fired += 1
+                try:
+                    self.on_close()
+                except Exception as e:
+                    log.exception("Candle close handler failed: %s", e)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="candle-timer",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
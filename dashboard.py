@@ -1,5 +1,8 @@
 # dashboard.py
 
+import threading
+import time
+
 from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
@@ -7,9 +10,25 @@ from rich.text import Text
 from datetime import datetime
 
 
-class BotDashboard:
+# Kaunsa key kis panel me dikhta hai (diff-based render ke liye)
+PANEL_KEYS = {
+    "status": ["status"],
+    "signal": ["signal", "direction", "A_set", "B_set", "reason"],
+    "trade": ["trade_status", "symbol", "entry", "ltp", "sl", "target", "pnl"],
+    "daily": ["exit_reason", "daily_pnl"],
+}
+KEY_PANEL = {k: p for p, keys in PANEL_KEYS.items() for k in keys}
+
 
-    def __init__(self):
+class BotDashboard:
+    """
+    Bot sirf update() se snapshot dict me value likhta hai (koi lock nahi,
+    koi rendering nahi). Alag render thread fixed FPS par sirf badle hue
+    panels dobara banata hai — isliye dashboard ka cost tick rate se
+    independent hai.
+    """
+
+    def __init__(self, fps: float = 4.0):
         self.data = {
             "status": "WAITING",
             "signal": "-",
@@ -30,70 +49,131 @@ class BotDashboard:
             "daily_pnl": "0",
         }
 
-        self.live = Live(self.render(), refresh_per_second=4)
+        self.fps = fps
+
+        # Har panel ka version: bot bump karta hai, render thread compare karta hai
+        self._versions = {p: 0 for p in PANEL_KEYS}
+        self._rendered = {p: -1 for p in PANEL_KEYS}
+        self._panels = {}
+
+        self._running = False
+        self._thread = None
+        self.frames = 0
+
+        self.live = Live(self.render(), auto_refresh=False)
 
     def start(self):
-        """Dashboard start karega terminal me."""
+        """Dashboard start karega terminal me (render thread ke saath)."""
         self.live.start()
+        self._running = True
+        self._thread = threading.Thread(target=self._render_loop,
+                                        name="dashboard-render", daemon=True)
+        self._thread.start()
 
     def stop(self):
         """Dashboard stop karega."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
         self.live.stop()
 
     def update(self, key, value):
-        """Bot update karega variables ko."""
+        """
+        Bot update karega variables ko.
+        Hot path safe: sirf dict write + version bump, rendering nahi.
+        """
         self.data[key] = value
-        self.live.update(self.render())
+        panel = KEY_PANEL.get(key)
+        if panel is not None:
+            self._versions[panel] += 1
+
+    def update_many(self, **values):
+        """Ek saath kai keys update (ek tick me kai values badle toh)."""
+        for key, value in values.items():
+            self.update(key, value)
+
+    # ---------------------------------------------------------
+    # Render thread
+    # ---------------------------------------------------------
+
+    def _render_loop(self):
+        interval = 1.0 / self.fps
+        while self._running:
+            started = time.monotonic()
+            if self._refresh_changed():
+                self.live.update(self._layout(), refresh=True)
+                self.frames += 1
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _refresh_changed(self) -> bool:
+        """Jin panels ka version badla unhe hi rebuild karo."""
+        changed = False
+        for panel, version in list(self._versions.items()):
+            if version != self._rendered[panel]:
+                self._panels[panel] = self._build_panel(panel)
+                self._rendered[panel] = version
+                changed = True
+        return changed
+
+    def _layout(self):
+        # FINAL LAYOUT: 4 Panels stacked
+        layout = Table.grid(padding=1)
+        layout.add_row(self._panels["status"])
+        layout.add_row(self._panels["signal"])
+        layout.add_row(self._panels["trade"])
+        layout.add_row(self._panels["daily"])
+        return layout
 
     def render(self):
         """Full dashboard layout yaha create hota hai."""
-
-        # 🟦 TOP PANEL — BOT STATUS
-        status_panel = Panel(
-            Text(f"BOT STATUS: {self.data['status']}", style="bold green"),
-            title="SYSTEM"
-        )
-
-        # 🟧 SIGNAL PANEL
-        signal_table = Table(title="SIGNAL INFO")
-        signal_table.add_column("Item")
-        signal_table.add_column("Value")
-
-        signal_table.add_row("Signal", str(self.data["signal"]))
-        signal_table.add_row("Direction", str(self.data["direction"]))
-        signal_table.add_row("A-SET", str(self.data["A_set"]))
-        signal_table.add_row("B-SET", str(self.data["B_set"]))
-        signal_table.add_row("Reason", str(self.data["reason"]))
-
-        signal_panel = Panel(signal_table)
-
-        # 🟩 TRADE PANEL
-        trade_table = Table(title="TRADE INFO")
-        trade_table.add_column("Item")
-        trade_table.add_column("Value")
-
-        trade_table.add_row("Status", str(self.data["trade_status"]))
-        trade_table.add_row("Symbol", str(self.data["symbol"]))
-        trade_table.add_row("Entry", str(self.data["entry"]))
-        trade_table.add_row("LTP", str(self.data["ltp"]))
-        trade_table.add_row("SL", str(self.data["sl"]))
-        trade_table.add_row("Target", str(self.data["target"]))
-        trade_table.add_row("PnL", str(self.data["pnl"]))
-
-        trade_panel = Panel(trade_table)
+        for panel in PANEL_KEYS:
+            self._panels[panel] = self._build_panel(panel)
+        return self._layout()
+
+    def _build_panel(self, name):
+        data = dict(self.data)   # render ke beech bot likhe toh bhi consistent
+
+        if name == "status":
+            # 🟦 TOP PANEL — BOT STATUS
+            return Panel(
+                Text(f"BOT STATUS: {data['status']}", style="bold green"),
+                title="SYSTEM"
+            )
+
+        if name == "signal":
+            # 🟧 SIGNAL PANEL
+            signal_table = Table(title="SIGNAL INFO")
+            signal_table.add_column("Item")
+            signal_table.add_column("Value")
+
+            signal_table.add_row("Signal", str(data["signal"]))
+            signal_table.add_row("Direction", str(data["direction"]))
+            signal_table.add_row("A-SET", str(data["A_set"]))
+            signal_table.add_row("B-SET", str(data["B_set"]))
+            signal_table.add_row("Reason", str(data["reason"]))
+
+            return Panel(signal_table)
+
+        if name == "trade":
+            # 🟩 TRADE PANEL
+            trade_table = Table(title="TRADE INFO")
+            trade_table.add_column("Item")
+            trade_table.add_column("Value")
+
+            trade_table.add_row("Status", str(data["trade_status"]))
+            trade_table.add_row("Symbol", str(data["symbol"]))
+            trade_table.add_row("Entry", str(data["entry"]))
+            trade_table.add_row("LTP", str(data["ltp"]))
+            trade_table.add_row("SL", str(data["sl"]))
+            trade_table.add_row("Target", str(data["target"]))
+            trade_table.add_row("PnL", str(data["pnl"]))
+
+            return Panel(trade_table)
 
         # 🟥 DAILY PANEL
-        daily_panel = Panel(
-            f"Exit: {self.data['exit_reason']}\n"
-            f"Daily PnL: {self.data['daily_pnl']}",
+        return Panel(
+            f"Exit: {data['exit_reason']}\n"
+            f"Daily PnL: {data['daily_pnl']}",
             title="DAILY STATS"
         )
-
-        # FINAL LAYOUT: 4 Panels stacked
-        layout = Table.grid(padding=1)
-        layout.add_row(status_panel)
-        layout.add_row(signal_panel)
-        layout.add_row(trade_panel)
-        layout.add_row(daily_panel)
-
-        return layout
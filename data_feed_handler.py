@@ -15,12 +15,16 @@ Kaam:
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Literal
 
 from rules_engine import Candle, MarketContext   # import models from rules_engine.py
 from rules_engine import RuleConfig               # for future integration
+from market_calendar import CandleClock, SessionCalendar, ist_datetime, ist_epoch, ist_now
+
+log = logging.getLogger(__name__)
 
 
 # -------------------------------------------------------------------------
@@ -77,29 +81,51 @@ class DataFeedHandler:
 
     def __init__(self,
                  timeframe_minutes: int = 5,
-                 max_candles: int = 200):
+                 max_candles: int = 200,
+                 calendar: Optional[SessionCalendar] = None,
+                 close_grace: float = 0.0):
         """
         Init par hum define karte hain:
 
         timeframe_minutes → candle TF (e.g. 3 / 5 / 15)
         max_candles → kitne candles memory me rakhni hain
+        calendar → session open / close + holidays (market_calendar.py);
+                   candles 09:15 IST grid par align hote hain
+        close_grace → wall-clock close timer (close_if_due) boundary ke
+                   itne seconds baad candle band karta hai (late exchange
+                   timestamps ke liye)
         """
 
         self.timeframe_minutes = timeframe_minutes
         self.max_candles = max_candles
+        self.clock = CandleClock(timeframe_minutes * 60, calendar)
 
         # Candle list (latest candle last)
         self.candles: List[Candle] = []
 
-        # OI series store:
-        self.ce_oi: List[int] = []
-        self.pe_oi: List[int] = []
+        # OI series store (None → us candle ka OI pata nahi, e.g. backfill):
+        self.ce_oi: List[Optional[int]] = []
+        self.pe_oi: List[Optional[int]] = []
 
         # Underlying price list (RSI ke liye)
         self.underlying_prices: List[float] = []
 
-        # Current candle start time
+        # Current candle start time (datetime candle start par ek baar banta hai;
+        # tick path sirf epoch ints compare karta hai)
         self.current_candle_start: Optional[datetime] = None
+        self._bucket_start = 0
+        self._bucket_end = 0            # 0 → koi candle running nahi
+
+        # Timer-driven close (STEP 14): band candle ke baad aaye purane ticks drop
+        self.close_grace = close_grace
+        self._closed_until = 0
+        self.timer_closes = 0
+        self.late_ticks = 0
+
+        # Last tick ka exchange time (MarketContext.now isi se)
+        self._last_ts = 0
+        self._now_ts = 0
+        self._now: Optional[datetime] = None
 
         # Current candle builder values:
         self.curr_open = None
@@ -108,7 +134,19 @@ class DataFeedHandler:
         self.curr_close = None
         self.curr_volume = 0
 
-        print("[DataFeedHandler] Initialized with timeframe:", timeframe_minutes)
+        # Counters (metrics.py scrape ke time padhta hai)
+        self.ticks_processed = 0
+        self.candles_closed = 0
+
+        # Option chain (option_chain.py) — attach ho to CE/PE OI series
+        # har candle close par chain ke totals se aati hai
+        self.chain = None
+
+        # Candle store (candle_store.py) — attach ho to har closed candle
+        # disk par bhi append hota hai (max_candles se purani history wahan)
+        self.store = None
+
+        log.info("Initialized with timeframe: %s", timeframe_minutes)
 
 # -------------------------------------------------------------------------
 # STEP 3 — Tick Handler (WebSocket tick yaha aayega)
@@ -126,6 +164,9 @@ class DataFeedHandler:
             ...
         }
 
+        Conflated tick (tick_conflator.py) me extra fields hote hain:
+            "open" / "high" / "low" → merge hue ticks ka first / max / min
+
         Hum yaha 3 kaam karte hain:
         1) Candle update
         2) OI update (CE + PE)
@@ -137,63 +178,107 @@ class DataFeedHandler:
             volume = tick.get("volume") or 0          # tick volume
             oi = tick.get("oi") or 0                  # CE/PE OI
 
-            ts_raw = tick.get("exchange_timestamp")
-            ts = datetime.fromtimestamp(ts_raw)
+            first = tick.get("open")                  # conflated tick only
+            high = tick.get("high")
+            low = tick.get("low")
+
+            ts = int(tick.get("exchange_timestamp"))   # epoch seconds
 
         except Exception as e:
-            print("[DataFeedHandler] Tick parse error:", e)
+            log.warning("Tick parse error: %s", e)
             return
 
         # ---------- PROCESSING -------------
-        self._process_tick_into_candle(ltp, volume, ts)
-        self._update_oi(oi)
+        self.ticks_processed += 1
+        if not self._process_tick_into_candle(ltp, volume, ts, first, high, low):
+            return                              # band / pichhli candle ka late tick
+        if self.chain is None:
+            self._update_oi(oi)
         self._update_price_for_rsi(ltp)
 
-        # Debug print:
-        # print("Tick processed:", ltp, "time:", ts)
+        # Debug log (DEBUG level off ho toh free):
+        # log.debug("Tick processed: %s time: %s", ltp, ts)
 
 
 # -------------------------------------------------------------------------
 # STEP 4 — Convert Tick into Candle (OHLCV)
 # -------------------------------------------------------------------------
 
-    def _process_tick_into_candle(self, price: float, volume: float, ts: datetime):
+    def _process_tick_into_candle(self, price: float, volume: float, ts: int,
+                                  first: Optional[float] = None,
+                                  high: Optional[float] = None,
+                                  low: Optional[float] = None) -> bool:
         """
         Har tick ko appropriate candle ke andar daalna hai.
 
+        first/high/low → conflated tick ke extremes (normal tick me None,
+        tab price hi use hota hai)
+
         Candle TF = self.timeframe_minutes
+        ts = exchange epoch seconds (int)
 
         Candle building logic:
+        - Candle boundaries CandleClock se (09:15 IST grid, session calendar)
         - Agar koi candle running nahi → new candle start karo
         - Agar tick current candle ke time range me hai → update OHLCV
+          (sirf int compare — datetime nahi banta)
         - Agar tick next candle ke time range me shift ho gaya →
              → purani candle close karo
              → nayi candle start karo
-        """
-
-        # 1) Agar koi candle start hi nahi hui hai:
-        if self.current_candle_start is None:
-            self.current_candle_start = ts
-            self.curr_open = price
-            self.curr_high = price
-            self.curr_low = price
-            self.curr_close = price
-            self.curr_volume = volume
-            return
+        - Agar tick running candle se pehle ke bucket ka hai (reorder window
+          ke andar late aaya) → drop + late_ticks (pichhli candle band ho
+          chuki, running candle ka close / low kharab nahi hona chahiye)
 
-        # Candle ka end time calculate
-        candle_end = self.current_candle_start + timedelta(minutes=self.timeframe_minutes)
-
-        # 2) Yadi tick abhi bhi isi candle ke time range me hai:
-        if ts < candle_end:
-            self.curr_close = price
-            self.curr_high = max(self.curr_high, price)
-            self.curr_low = min(self.curr_low, price)
-            self.curr_volume += volume
-            return
+        Returns: False agar tick late tha aur drop hua
+        """
 
-        # 3) Yadi tick nayi candle ka hai:
-        #    Pehle purani candle save karo
+        if first is None:
+            first = price
+        if high is None:
+            high = price
+        if low is None:
+            low = price
+
+        if ts < self._bucket_start:
+            # Pichhli (band) candle ka tick — current bar me fold nahi hota
+            self.late_ticks += 1
+            return False
+
+        # Market time kabhi peeche nahi jaata (MarketContext.now)
+        if ts > self._last_ts:
+            self._last_ts = ts
+
+        if ts >= self._bucket_end:
+            start, end = self.clock.bucket(ts)
+
+            # 1) Agar koi candle start hi nahi hui hai:
+            if not self._bucket_end:
+                if start < self._closed_until:
+                    # Timer us candle ko pehle hi band kar chuka (grace ke baad aaya)
+                    self.late_ticks += 1
+                    return False
+                self._start_candle(start, end, first, high, low, price, volume)
+                return True
+
+            # 2) Yadi tick nayi candle ka hai → purani close, nayi start.
+            #    (Session close ke baad ka tick clamp hokar wahi bucket deta
+            #    hai → neeche current candle me hi update)
+            if start != self._bucket_start:
+                self._close_candle()
+                self._start_candle(start, end, first, high, low, price, volume)
+                return True
+
+        # 3) Tick isi candle ke time range me hai (common case, sirf int compare):
+        self.curr_close = price
+        if high > self.curr_high:
+            self.curr_high = high
+        if low < self.curr_low:
+            self.curr_low = low
+        self.curr_volume += volume
+        return True
+
+    def _close_candle(self):
+        """Running candle → candles list (+ chain sample, store append)."""
         closed_candle = Candle(
             ts=self.current_candle_start,
             o=self.curr_open,
@@ -204,21 +289,28 @@ class DataFeedHandler:
         )
 
         self.candles.append(closed_candle)
+        self.candles_closed += 1
+        if self.chain is not None:
+            self._sample_chain()
+        if self.store is not None:
+            self._persist(closed_candle)
 
         # Candles memory overflow control
         if len(self.candles) > self.max_candles:
             self.candles.pop(0)
 
-        # Ab new candle start
-        self.current_candle_start = ts
-        self.curr_open = price
-        self.curr_high = price
-        self.curr_low = price
+    def _start_candle(self, start: int, end: int, first: float, high: float,
+                      low: float, price: float, volume: float):
+        self._bucket_start = start
+        self._bucket_end = end
+        self.current_candle_start = ist_datetime(start)
+        self.curr_open = first
+        self.curr_high = high
+        self.curr_low = low
         self.curr_close = price
         self.curr_volume = volume
 
 
-
 # -------------------------------------------------------------------------
 # STEP 5 — OI Tracking (CE/PE OI series update)
 # -------------------------------------------------------------------------
@@ -251,6 +343,38 @@ class DataFeedHandler:
 
 
 
+    def attach_chain(self, chain):
+        """OptionChain attach karo — ab OI series per candle chain se."""
+        self.chain = chain
+
+    def _sample_chain(self):
+        """Candle close par chain totals → ce_oi / pe_oi series."""
+        chain = self.chain
+        chain.sample()
+        self._append_oi(chain.ce_oi_series[-1], chain.pe_oi_series[-1])
+
+    def _append_oi(self, ce: Optional[int], pe: Optional[int]):
+        """Ek candle ka CE / PE OI (None → us candle ka OI pata nahi)."""
+        self.ce_oi.append(ce)
+        self.pe_oi.append(pe)
+        if len(self.ce_oi) > 200:
+            del self.ce_oi[0]
+        if len(self.pe_oi) > 200:
+            del self.pe_oi[0]
+
+
+    def attach_store(self, series):
+        """CandleSeries (candle_store.py) attach karo — closed candles persist honge."""
+        self.store = series
+
+    def _persist(self, candle: Candle):
+        """Closed candle → store (chain ho to us candle ka CE/PE OI bhi)."""
+        if self.chain is not None and self.ce_oi and self.ce_oi[-1] is not None:
+            self.store.append_candle(candle, self.ce_oi[-1], self.pe_oi[-1])
+        else:
+            self.store.append_candle(candle)
+
+
 # -------------------------------------------------------------------------
 # STEP 6 — Underlying price tracking (RSI ke liye)
 # -------------------------------------------------------------------------
@@ -296,8 +420,16 @@ class DataFeedHandler:
         # ⚠️ RSI calculation
         rsi_value = calculate_rsi(self.underlying_prices, period=14)
 
-        # 📌 Current time (market timestamp)
-        now_time = datetime.now()
+        # 📌 Current time (market timestamp) — last tick ka exchange time;
+        # datetime sirf second badalne par banta hai, har tick par nahi
+        ts = self._last_ts
+        if not ts:
+            now_time = ist_now()
+        elif ts == self._now_ts:
+            now_time = self._now
+        else:
+            now_time = self._now = ist_datetime(ts)
+            self._now_ts = ts
 
         # 📌 MarketContext object build
         context = MarketContext(
@@ -310,6 +442,13 @@ class DataFeedHandler:
             timeframe_minutes=self.timeframe_minutes
         )
 
+        chain = self.chain
+        if chain is not None:
+            context.pcr = chain.pcr_series.copy()
+            context.oi_support = chain.oi_support()
+            context.oi_resistance = chain.oi_resistance()
+            context.max_pain = chain.max_pain()
+
         return context
 
 
@@ -368,3 +507,159 @@ class DataFeedHandler:
             decision = rules_engine.evaluate(ctx)
         """
         return self.build_market_context(symbol)
+
+
+# -------------------------------------------------------------------------
+# STEP 12 — Gap backfill (reconnect ke baad historical candles)
+# -------------------------------------------------------------------------
+
+    def backfill_candles(self, candles: List[Candle], now: Optional[datetime] = None,
+                         ce_oi: Optional[List[int]] = None,
+                         pe_oi: Optional[List[int]] = None) -> int:
+        """
+        WebSocket gap ke missing candles yaha merge hote hain
+        (ws_supervisor.py reconnect ke baad call karta hai).
+
+        ce_oi / pe_oi → historical OI (candles ke saath same order / length,
+        source.fetch_oi se); nahi mila toh None.
+
+        - Last closed candle se purane candles ignore
+        - Complete candles (ts + TF <= now) → seedha candles list me
+          (chain ho to OI series me bhi ek entry, series aligned rahe:
+          historical OI ya None — chain ka *abhi* wala OI purani candle
+          ka nahi hai, woh fake flat OI ban jaata)
+        - Last incomplete candle (agar API ne diya) → running candle ban jaati hai,
+          baaki ticks isi me update honge
+        - Gap se pehle ki adhoori running candle:
+            historical me wahi candle hai / replacement seed hua → discard
+            historical me sirf baad ki candles hain → pehle close (order sahi)
+            API ne kuch nahi diya → jaisi hai waisi rehti hai
+
+        Returns: kitne candles add hue
+        """
+        now = now or ist_now()
+        tf = timedelta(minutes=self.timeframe_minutes)
+        last_ts = self.candles[-1].ts if self.candles else None
+        running = self.current_candle_start if self._bucket_end else None
+
+        hist = sorted(range(len(candles)), key=lambda i: candles[i].ts)
+        if not (ce_oi and pe_oi and len(ce_oi) == len(pe_oi) == len(candles)):
+            ce_oi = pe_oi = None                 # align nahi → OI nahi
+
+        added = 0
+        for i in hist:
+            c = candles[i]
+            if last_ts is not None and c.ts <= last_ts:
+                continue
+
+            if running is not None and c.ts >= running:
+                if c.ts > running:
+                    self._close_candle()
+                    self._closed_until = self._bucket_end
+                self.current_candle_start = None
+                self._bucket_end = 0
+                running = None
+
+            if c.ts + tf > now:
+                # Abhi chal rahi candle → builder seed karo
+                start, end = self.clock.bucket(ist_epoch(c.ts))
+                self._start_candle(start, end, c.o, c.h, c.l, c.c, c.v)
+                break
+
+            self.candles.append(c)
+            self._update_price_for_rsi(c.c)
+            ce = pe = None
+            if ce_oi is not None:
+                ce, pe = ce_oi[i], pe_oi[i]
+            if self.chain is not None:
+                self._append_oi(ce, pe)
+            if self.store is not None:
+                if ce is None:
+                    self.store.append_candle(c)
+                else:
+                    self.store.append_candle(c, ce, pe)
+            last_ts = c.ts
+            added += 1
+
+        if added:
+            # Backfilled candles ke late ticks nayi (purani) candle na kholein
+            end = self.clock.bucket(ist_epoch(last_ts))[1]
+            if end > self._closed_until:
+                self._closed_until = end
+
+        if len(self.candles) > self.max_candles:
+            del self.candles[:len(self.candles) - self.max_candles]
+
+        log.info("Backfilled %s candles", added)
+        return added
+
+
+# -------------------------------------------------------------------------
+# STEP 13 — Warm start (startup par pichhle sessions ke candles + OI)
+# -------------------------------------------------------------------------
+
+    def warm_start(self, candles: List[Candle],
+                   ce_oi: Optional[List[int]] = None,
+                   pe_oi: Optional[List[int]] = None) -> int:
+        """
+        Startup par historical candles / OI ek hi call me buffers me daalo
+        (warm_start.py se). Per-tick path nahi chalta — seedha slice assign,
+        taaki 9:15 ke pehle tick se hi saare rules (21-22 candle wale bhi)
+        evaluate ho sakein.
+
+        - Candles ts order me, sirf aakhri max_candles rakhe jaate hain
+        - RSI price list candle closes se seed hoti hai
+        - Live data pehle se ho to usse purane candles hi aage lagte hain
+
+        Returns: kitne candles load hue
+        """
+        first_live = self.candles[0].ts if self.candles else None
+        hist = sorted(candles, key=lambda x: x.ts)
+        if first_live is not None:
+            hist = [c for c in hist if c.ts < first_live]
+
+        self.candles[:0] = hist
+        del self.candles[:-self.max_candles]
+
+        self.underlying_prices[:0] = [c.c for c in hist]
+        del self.underlying_prices[:-200]
+
+        if ce_oi:
+            self.ce_oi[:0] = ce_oi
+            del self.ce_oi[:-200]
+        if pe_oi:
+            self.pe_oi[:0] = pe_oi
+            del self.pe_oi[:-200]
+
+        log.info("Warm start: %s candles, %s CE OI, %s PE OI",
+                 len(hist), len(ce_oi or ()), len(pe_oi or ()))
+        return len(hist)
+
+
+# -------------------------------------------------------------------------
+# STEP 14 — Wall-clock candle close (tick ka wait nahi)
+# -------------------------------------------------------------------------
+
+    def close_deadline(self) -> Optional[float]:
+        """Running candle kab band honi chahiye (epoch, grace ke saath). None → koi candle nahi."""
+        return self._bucket_end + self.close_grace if self._bucket_end else None
+
+    def close_if_due(self, now: float) -> bool:
+        """
+        Boundary + grace guzar gaya aur agle period ka tick abhi nahi aaya →
+        running candle yahi band karo (timer / poll loop se call hota hai,
+        tick processing ke saath serialize karke).
+
+        Returns: True agar candle band hui (caller context evaluate kare)
+        """
+        end = self._bucket_end
+        if not end or now < end + self.close_grace:
+            return False
+        self._close_candle()
+        self._closed_until = end
+        self._bucket_end = 0
+        # Market time kam se kam boundary tak pahunch gaya (MarketContext.now)
+        if self._last_ts < end:
+            self._last_ts = end
+        self.timer_closes += 1
+        return True
@@ -1,5 +1,4 @@
-from SmartApi import SmartConnect
-import pyotp
+from session_manager import smartapi_session
 
 # py get_token.py
 
@@ -7,11 +6,9 @@ API_KEY = "TUnreERc "
 CLIENT_CODE = "S1520958"
 PIN = "1709"
 TOTP_SECRET = "FU33K44BL2PHQTFUQ4WBPBXB6U======"   # QR scan se mila hua secret key yaha aayega
-smart = SmartConnect(api_key=API_KEY)
-totp = pyotp.TOTP(TOTP_SECRET).now()
-
-data = smart.generateSession(CLIENT_CODE, PIN, totp)
-feedToken = data['data']['feedToken']
+# Cached session (state/) valid ho to TOTP login nahi hota
+smart, sessions = smartapi_session(API_KEY, CLIENT_CODE, PIN, TOTP_SECRET)
+feedToken = sessions.session.feed_token
 
 # Fetch NIFTY spot token
 instruments = smart.searchScrip("NSE", "NIFTY")
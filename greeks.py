@@ -0,0 +1,278 @@
+"""
+greeks.py
+
+Batched Black-Scholes IV + Greeks — poori option chain ek saath.
+
+Pehle:
+    choose_call_put_strike → ATM ya ATM ± step, "trend" string ke basis par.
+
+Ab:
+- Chain (option_chain.py) ke har strike ka CE/PE LTP → implied vol
+  (safeguarded Newton: vega step, bracket ke bahar gaya ya vega ~0 → bisection;
+  pichhle refresh ka IV initial guess, isliye 2-3 iterations me converge)
+- Sab strikes ke delta / gamma / theta (per day) / vega (per 1 vol point)
+- Background thread `refresh_seconds` cadence par chalta hai aur ek immutable
+  GreeksSnapshot publish karta hai → tick path par zero kaam,
+  strike selection sirf snapshot padhta hai
+- strike_for_delta("CE", 0.35) → target delta ke sabse paas wala strike
+
+NOTE: NumPy tree me nahi hai, isliye "vectorized" = ek pass me poori chain
+(flat loops, math module), per-strike alag call nahi.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from option_chain import CE, PE
+
+log = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365.0 * 24 * 3600
+_SQRT2 = math.sqrt(2.0)
+_INV_SQRT2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class GreeksConfig:
+    """
+    refresh_seconds = kitni der me IV / Greeks dobara nikaalein
+    rate            = risk-free rate (annual)
+    iv_lo / iv_hi   = IV search bracket
+    tol / max_iter  = solver price tolerance / max iterations
+    """
+
+    refresh_seconds: float = 5.0
+    rate: float = 0.065
+    iv_lo: float = 0.005
+    iv_hi: float = 5.0
+    tol: float = 1e-4
+    max_iter: int = 50
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Batched pricing / IV
+# ---------------------------------------------------------------------
+
+def _ncdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / _SQRT2))
+
+
+def _npdf(x: float) -> float:
+    return _INV_SQRT2PI * math.exp(-0.5 * x * x)
+
+
+def _price_vega(spot: float, k: float, t: float, vol: float, rate: float,
+                is_call: bool) -> Tuple[float, float]:
+    sq_t = math.sqrt(t)
+    sq = vol * sq_t
+    d1 = (math.log(spot / k) + (rate + 0.5 * vol * vol) * t) / sq
+    d2 = d1 - sq
+    disc = k * math.exp(-rate * t)
+    call = spot * _ncdf(d1) - disc * _ncdf(d2)
+    price = call if is_call else call - spot + disc
+    return price, spot * _npdf(d1) * sq_t
+
+
+def implied_vols(spot: float, strikes: Sequence[float], prices: Sequence[float],
+                 t: float, is_call: bool, cfg: GreeksConfig,
+                 guess: Optional[Sequence[float]] = None) -> List[float]:
+    """
+    Poori chain ka IV ek call me. Price <= intrinsic / 0 → nan.
+    Har iteration sirf un strikes par chalti hai jo abhi converge nahi hue.
+    """
+    n = len(strikes)
+    rate = cfg.rate
+    out = [math.nan] * n
+    lo = [cfg.iv_lo] * n
+    hi = [cfg.iv_hi] * n
+    vol = [0.0] * n
+    active = []
+
+    disc = math.exp(-rate * t)
+    for i in range(n):
+        p, k = prices[i], strikes[i]
+        intrinsic = max(spot - k * disc, 0.0) if is_call else max(k * disc - spot, 0.0)
+        if p <= 0.0 or p <= intrinsic + 1e-9 or t <= 0.0:
+            continue
+        g = guess[i] if guess is not None else math.nan
+        vol[i] = g if cfg.iv_lo < g < cfg.iv_hi else 0.2
+        active.append(i)
+
+    for _ in range(cfg.max_iter):
+        if not active:
+            break
+        still = []
+        for i in active:
+            v = vol[i]
+            price, vega = _price_vega(spot, strikes[i], t, v, rate, is_call)
+            diff = price - prices[i]
+            if abs(diff) < cfg.tol:
+                out[i] = v
+                continue
+            # Price vol me increasing hai → bracket tighten
+            if diff > 0:
+                hi[i] = v
+            else:
+                lo[i] = v
+            nxt = v - diff / vega if vega > 1e-12 else -1.0
+            if not (lo[i] < nxt < hi[i]):
+                nxt = 0.5 * (lo[i] + hi[i])
+            vol[i] = nxt
+            if hi[i] - lo[i] < 1e-7:
+                out[i] = nxt
+                continue
+            still.append(i)
+        active = still
+    return out
+
+
+def greeks_batch(spot: float, strikes: Sequence[float], vols: Sequence[float],
+                 t: float, is_call: bool, rate: float) -> Tuple[List[float], ...]:
+    """(delta, gamma, theta/day, vega/1 vol pt) lists. IV nan → nan."""
+    n = len(strikes)
+    nan = math.nan
+    delta, gamma, theta, vega = [nan] * n, [nan] * n, [nan] * n, [nan] * n
+    sq_t = math.sqrt(t) if t > 0 else 0.0
+    for i in range(n):
+        v = vols[i]
+        if not v == v or sq_t == 0.0:          # nan check
+            continue
+        k = strikes[i]
+        sq = v * sq_t
+        d1 = (math.log(spot / k) + (rate + 0.5 * v * v) * t) / sq
+        d2 = d1 - sq
+        pdf = _npdf(d1)
+        kdisc = k * math.exp(-rate * t)
+        decay = -spot * pdf * v / (2.0 * sq_t)
+        if is_call:
+            delta[i] = _ncdf(d1)
+            theta[i] = (decay - rate * kdisc * _ncdf(d2)) / 365.0
+        else:
+            delta[i] = _ncdf(d1) - 1.0
+            theta[i] = (decay + rate * kdisc * _ncdf(-d2)) / 365.0
+        gamma[i] = pdf / (spot * sq)
+        vega[i] = spot * pdf * sq_t / 100.0
+    return delta, gamma, theta, vega
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Snapshot (immutable, threads ke beech share)
+# ---------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class GreeksSnapshot:
+    spot: float
+    t_years: float
+    strikes: Tuple[int, ...]
+    iv: Tuple[Tuple[float, ...], Tuple[float, ...]]        # [CE, PE]
+    delta: Tuple[Tuple[float, ...], Tuple[float, ...]]
+    gamma: Tuple[Tuple[float, ...], Tuple[float, ...]]
+    theta: Tuple[Tuple[float, ...], Tuple[float, ...]]
+    vega: Tuple[Tuple[float, ...], Tuple[float, ...]]
+    computed_at: float
+    elapsed_us: float
+
+    def strike_for_delta(self, side: str, target: float) -> Optional[int]:
+        """|delta| target ke sabse paas wala strike (valid IV wale hi)."""
+        deltas = self.delta[CE if side == "CE" else PE]
+        best, best_err = None, math.inf
+        for k, d in zip(self.strikes, deltas):
+            if d != d:
+                continue
+            err = abs(abs(d) - target)
+            if err < best_err:
+                best, best_err = k, err
+        return best
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — GreeksEngine (background refresh)
+# ---------------------------------------------------------------------
+
+class GreeksEngine:
+
+    def __init__(self, chain, spot_fn: Callable[[], float], expiry: datetime,
+                 config: Optional[GreeksConfig] = None):
+        """
+        chain   → OptionChain (ltp arrays yahi se padhte hain)
+        spot_fn → current index price
+        expiry  → expiry datetime (15:30)
+        """
+        self.chain = chain
+        self.spot_fn = spot_fn
+        self.expiry = expiry
+        self.cfg = config or GreeksConfig()
+        self.snapshot: Optional[GreeksSnapshot] = None
+        self.refreshes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, now: Optional[datetime] = None) -> Optional[GreeksSnapshot]:
+        t0 = time.perf_counter()
+        chain = self.chain
+        spot = self.spot_fn()
+        # Ek hi ref (OptionChain.grid) — recenter beech me ho jaye to bhi
+        # strikes aur ltp same window ke
+        strikes, ltp = chain.grid
+        if not spot:
+            return None
+
+        now = now or datetime.now()
+        t = max((self.expiry - now).total_seconds(), 60.0) / SECONDS_PER_YEAR
+        prev = self.snapshot
+        same_grid = prev is not None and prev.strikes == tuple(strikes)
+
+        ks = [float(k) for k in strikes]
+        cfg = self.cfg
+        out = {"iv": [], "delta": [], "gamma": [], "theta": [], "vega": []}
+        for side, is_call in ((CE, True), (PE, False)):
+            guess = prev.iv[side] if same_grid else None
+            iv = implied_vols(spot, ks, list(ltp[side]), t, is_call, cfg, guess)
+            d, g, th, v = greeks_batch(spot, ks, iv, t, is_call, cfg.rate)
+            for key, vals in (("iv", iv), ("delta", d), ("gamma", g),
+                              ("theta", th), ("vega", v)):
+                out[key].append(tuple(vals))
+
+        snap = GreeksSnapshot(
+            spot=spot, t_years=t, strikes=tuple(strikes),
+            iv=tuple(out["iv"]), delta=tuple(out["delta"]), gamma=tuple(out["gamma"]),
+            theta=tuple(out["theta"]), vega=tuple(out["vega"]),
+            computed_at=time.time(),
+            elapsed_us=(time.perf_counter() - t0) * 1e6,
+        )
+        self.snapshot = snap          # atomic ref swap
+        self.refreshes += 1
+        return snap
+
+    def strike_for_delta(self, side: str, target: float) -> Optional[int]:
+        snap = self.snapshot
+        return snap.strike_for_delta(side, target) if snap is not None else None
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    log.exception("Greeks refresh failed: %s", e)
+                self._stop.wait(self.cfg.refresh_seconds)
+
+        self._thread = threading.Thread(target=_loop, name="greeks", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,228 @@
+"""
+latency_tracer.py
+
+Tick-to-order latency tracing.
+
+Har WebSocket message ke saath ek Trace start hota hai (monotonic clock,
+time.perf_counter_ns). Pipeline ka har stage apna mark() lagata hai:
+
+    receive → decode → candle → context → evaluate → strike → risk
+            → submit → ack
+
+mark(stage) pichhle mark se ab tak ka time us stage ke histogram me
+daal deta hai. Isse pata chalta hai ki open aur expiry day par
+milliseconds kahan ja rahe hain.
+
+Histograms fixed log-scale buckets use karte hain (record O(log n),
+memory constant), aur p50/p90/p99/max report dete hain.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Stage names (pipeline order me)
+# ---------------------------------------------------------------------
+
+STAGES = [
+    "decode",
+    "candle",
+    "context",
+    "evaluate",
+    "strike",
+    "risk",
+    "submit",
+    "ack",
+]
+
+# End-to-end totals
+TOTAL_TICK = "tick_total"          # receive → on_tick khatam
+TOTAL_ORDER = "tick_to_ack"        # receive → broker ack
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Log-scale histogram
+# ---------------------------------------------------------------------
+
+def _make_bounds(lo_ns: int = 1_000, hi_ns: int = 10_000_000_000,
+                 factor: float = 1.2) -> List[int]:
+    """1µs se 10s tak geometric bucket boundaries (~20% resolution)."""
+    bounds = []
+    b = float(lo_ns)
+    while b < hi_ns:
+        bounds.append(int(b))
+        b *= factor
+    bounds.append(hi_ns)
+    return bounds
+
+
+_BOUNDS = _make_bounds()
+
+
+class LatencyHistogram:
+    """
+    Fixed buckets ka histogram (nanoseconds).
+    percentile() bucket ki upper boundary return karta hai.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int):
+        self.counts[bisect.bisect_left(_BOUNDS, ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, pct: float) -> int:
+        if self.count == 0:
+            return 0
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(_BOUNDS[i], self.max) if i < len(_BOUNDS) else self.max
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Trace (ek tick ki journey)
+# ---------------------------------------------------------------------
+
+class Trace:
+    """
+    t0   = receive time (perf_counter_ns)
+    last = pichhla mark
+    """
+
+    __slots__ = ("tracer", "t0", "last")
+
+    def __init__(self, tracer: "LatencyTracer", t0: int):
+        self.tracer = tracer
+        self.t0 = t0
+        self.last = t0
+
+    def mark(self, stage: str):
+        now = time.perf_counter_ns()
+        self.tracer.hists[stage].record(now - self.last)
+        self.last = now
+
+    def done(self, total: str = TOTAL_TICK):
+        """receive se ab tak ka end-to-end time record karo."""
+        self.tracer.hists[total].record(time.perf_counter_ns() - self.t0)
+
+
+class _NullTrace:
+    """Jab tracing off ho ya trace start na hua ho → kuch nahi karta."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+    def done(self, total: str = TOTAL_TICK):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — LatencyTracer
+# ---------------------------------------------------------------------
+
+class LatencyTracer:
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hists: Dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in STAGES + [TOTAL_TICK, TOTAL_ORDER]
+        }
+        # Abhi jo tick process ho raha hai uska trace (single feed thread)
+        self.current = NULL_TRACE
+        self._reporter: Optional[threading.Thread] = None
+
+    def begin(self, t0: Optional[int] = None):
+        """ws_on_message ke start me call karo (receive stamp)."""
+        if not self.enabled:
+            self.current = NULL_TRACE
+            return NULL_TRACE
+        self.current = Trace(self, t0 if t0 is not None else time.perf_counter_ns())
+        return self.current
+
+    def end(self):
+        """Tick processing khatam — total record + current clear."""
+        self.current.done(TOTAL_TICK)
+        self.current = NULL_TRACE
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Reports
+    # -----------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage stats (microseconds) — dashboard / metrics ke liye."""
+        out = {}
+        for name, h in self.hists.items():
+            out[name] = {
+                "count": h.count,
+                "sum_us": h.total / 1000.0,
+                "mean_us": h.mean() / 1000.0,
+                "p50_us": h.percentile(50) / 1000.0,
+                "p90_us": h.percentile(90) / 1000.0,
+                "p99_us": h.percentile(99) / 1000.0,
+                "max_us": h.max / 1000.0,
+            }
+        return out
+
+    def report(self) -> str:
+        lines = [f"{'stage':<12}{'count':>9}{'p50µs':>11}{'p90µs':>11}"
+                 f"{'p99µs':>11}{'maxµs':>11}"]
+        for name, s in self.snapshot().items():
+            if s["count"] == 0:
+                continue
+            lines.append(f"{name:<12}{s['count']:>9}{s['p50_us']:>11.1f}"
+                         f"{s['p90_us']:>11.1f}{s['p99_us']:>11.1f}"
+                         f"{s['max_us']:>11.1f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        for h in self.hists.values():
+            h.reset()
+
+    def start_reporter(self, interval: float = 60.0):
+        """Background thread har `interval` sec par report log karega."""
+        if self._reporter is not None:
+            return
+
+        def _loop():
+            while True:
+                time.sleep(interval)
+                log.info("Latency report\n%s", self.report())
+
+        self._reporter = threading.Thread(target=_loop, name="latency-reporter",
+                                          daemon=True)
+        self._reporter.start()
@@ -1,5 +1,4 @@
-from SmartApi import SmartConnect
-import pyotp
+from session_manager import smartapi_session
 # py ltp_test.py
 # ok
 API_KEY = "TUnreERc"
@@ -7,10 +6,8 @@ CLIENT_CODE = "S1520958"
 MPIN = "1709"
 TOTP_SECRET = "FU33K44BL2PHQTFUQ4WBPBXB6U======"
 
-totp = pyotp.TOTP(TOTP_SECRET).now()
-
-obj = SmartConnect(api_key=API_KEY)
-session = obj.generateSession(CLIENT_CODE, MPIN, totp)
+# Cached session (state/) valid ho to TOTP login nahi hota
+obj, sessions = smartapi_session(API_KEY, CLIENT_CODE, MPIN, TOTP_SECRET)
 
 print("Login Success!")
 
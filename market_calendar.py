@@ -0,0 +1,197 @@
+"""
+market_calendar.py
+
+NSE session calendar + integer-epoch candle bucketing.
+
+Pehle:
+    DataFeedHandler pehle tick ke timestamp se candle shuru karta tha
+    (09:16:07 pe pehla tick → candle 09:16:07-09:21:07, exchange ke
+    09:15 / 09:20 candles se match nahi) aur har tick par
+    datetime.fromtimestamp + timedelta compare karta tha.
+
+Ab:
+- Candle bucket = session_open + ((ts - session_open) // tf) * tf
+  — sirf int arithmetic, 09:15 IST se aligned
+- Session open / close epoch din me ek baar nikalte hain (CandleClock
+  day cache); hot path par koi datetime object nahi banta
+- Calendar: weekends + holidays band, special sessions (Muhurat trading,
+  Saturday budget session) ka apna open / close
+- Pre-open ticks (09:00-09:15) pehle candle me, close ke baad wale
+  (closing session) aakhri candle me clamp hote hain
+- Calendar me session na ho (holiday / weekend ka sim / test data) →
+  bina clamp ke 09:15 grid par align
+
+Time zone: exchange IST (+05:30, no DST) par chalta hai, isliye bucketing
+fixed IST offset se hoti hai — host ka TZ kuch bhi ho, boundaries sahi.
+
+Holidays file (JSON, optional):
+    {"holidays": ["2025-12-25", ...],
+     "special_sessions": {"2025-10-21": ["13:45", "14:45"]}}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+IST_OFFSET = 19800                  # seconds
+DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+SESSION_OPEN = dtime(9, 15)
+SESSION_CLOSE = dtime(15, 30)
+
+
+def _secs(t: dtime) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def day_epoch(d: date) -> int:
+    """IST midnight ka epoch."""
+    return (d.toordinal() - _EPOCH_ORDINAL) * DAY - IST_OFFSET
+
+
+def ist_date(ts: int) -> date:
+    """Epoch → IST calendar date."""
+    return date.fromordinal((ts + IST_OFFSET) // DAY + _EPOCH_ORDINAL)
+
+
+def ist_datetime(ts: float) -> datetime:
+    """Epoch → naive IST wall-clock datetime (Candle.ts convention, host TZ se independent)."""
+    return datetime.fromtimestamp(ts, IST).replace(tzinfo=None)
+
+
+def ist_now() -> datetime:
+    """Abhi ka naive IST wall clock (candle ts se compare karne ke liye, datetime.now() nahi)."""
+    return ist_datetime(time.time())
+
+
+def ist_epoch(dt: datetime) -> int:
+    """datetime → epoch; naive datetime IST wall clock maana jaata hai."""
+    return int((dt if dt.tzinfo else dt.replace(tzinfo=IST)).timestamp())
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — SessionCalendar
+# ---------------------------------------------------------------------
+
+@dataclass
+class SessionCalendar:
+    """
+    holidays         = exchange band (weekday hone par bhi)
+    special_sessions = date → (open, close) — holiday / weekend par bhi chalega
+    open / close     = normal session
+    """
+
+    holidays: frozenset = frozenset()
+    special_sessions: Dict[date, Tuple[dtime, dtime]] = field(default_factory=dict)
+    open: dtime = SESSION_OPEN
+    close: dtime = SESSION_CLOSE
+
+    @classmethod
+    def from_file(cls, path: str) -> "SessionCalendar":
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        holidays = frozenset(date.fromisoformat(d) for d in raw.get("holidays", ()))
+        special = {date.fromisoformat(d): (dtime.fromisoformat(o), dtime.fromisoformat(c))
+                   for d, (o, c) in raw.get("special_sessions", {}).items()}
+        log.info("Calendar: %s holidays, %s special sessions", len(holidays), len(special))
+        return cls(holidays=holidays, special_sessions=special)
+
+    def session(self, d: date) -> Optional[Tuple[dtime, dtime]]:
+        """(open, close) ya None (market band)."""
+        special = self.special_sessions.get(d)
+        if special is not None:
+            return special
+        if d.weekday() >= 5 or d in self.holidays:
+            return None
+        return self.open, self.close
+
+    def is_trading_day(self, d: date) -> bool:
+        return self.session(d) is not None
+
+    def session_bounds(self, d: date) -> Optional[Tuple[int, int]]:
+        """(open_epoch, close_epoch) ya None."""
+        s = self.session(d)
+        if s is None:
+            return None
+        base = day_epoch(d)
+        return base + _secs(s[0]), base + _secs(s[1])
+
+    def previous_trading_days(self, d: date, n: int) -> List[date]:
+        """d se pehle ke n trading days (latest pehle)."""
+        days = []
+        while len(days) < n:
+            d -= timedelta(days=1)
+            if self.is_trading_day(d):
+                days.append(d)
+        return days
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — CandleClock (hot path: int arithmetic only)
+# ---------------------------------------------------------------------
+
+class CandleClock:
+
+    def __init__(self, tf_seconds: int, calendar: Optional[SessionCalendar] = None):
+        self.tf = tf_seconds
+        self.calendar = calendar or SessionCalendar()
+        # Day cache (IST day number → session epochs)
+        self._day = None
+        self._open = 0
+        self._close = 0
+        self._session = False
+
+    def _load_day(self, day: int):
+        d = date.fromordinal(day + _EPOCH_ORDINAL)
+        bounds = self.calendar.session_bounds(d)
+        self._day = day
+        if bounds is None:
+            self._session = False
+            self._open = day_epoch(d) + _secs(self.calendar.open)
+            self._close = self._open + DAY
+        else:
+            self._session = True
+            self._open, self._close = bounds
+
+    def bucket(self, ts: int) -> Tuple[int, int]:
+        """Epoch → (candle_start, candle_end). Aakhri candle session close par katti hai."""
+        day = (ts + IST_OFFSET) // DAY
+        if day != self._day:
+            self._load_day(day)
+        op = self._open
+        if self._session:
+            if ts < op:
+                ts = op
+            elif ts >= self._close:
+                ts = self._close - 1
+            start = op + (ts - op) // self.tf * self.tf
+            end = start + self.tf
+            return start, end if end < self._close else self._close
+        start = op + (ts - op) // self.tf * self.tf
+        return start, start + self.tf
+
+    def in_session(self, ts: int) -> bool:
+        day = (ts + IST_OFFSET) // DAY
+        if day != self._day:
+            self._load_day(day)
+        return self._session and self._open <= ts < self._close
+
+
+if __name__ == "__main__":
+    clock = CandleClock(300)
+    base = day_epoch(date(2025, 12, 8))
+    for hhmmss in ("09:07:30", "09:15:00", "09:16:07", "09:19:59", "09:20:00", "15:29:59",
+                   "15:40:00"):
+        t = dtime.fromisoformat(hhmmss)
+        s, e = clock.bucket(base + _secs(t))
+        fmt = lambda x: datetime.fromtimestamp(x, IST).strftime("%H:%M")
+        print(f"{hhmmss} → {fmt(s)}-{fmt(e)}")
@@ -0,0 +1,302 @@
+"""
+market_simulator.py
+
+Seeded synthetic market + option chain generator (offline load testing).
+
+Kya banta hai:
+- Index: GBM + Poisson jumps (1 sec granularity se bhi chhote steps)
+- Options: har strike (ATM ± N steps) ka CE/PE Black-Scholes se model price,
+  index ke saath hi move karta hai
+- OI: har strike CE/PE ka random walk (price move ke against thoda bias —
+  short covering / writing jaisa behaviour)
+
+Regimes:
+- Open auction burst : pehle `open_burst_minutes` me tick rate aur vol dono zyada
+- Expiry day         : time-to-expiry ~0 → gamma heavy option moves + higher vol
+
+Output:
+- ticks()        → generator of tick dicts (DataFeedHandler / bot format)
+- feed_handler() → index ticks seedha DataFeedHandler me
+- write_jsonl()  → tick journal (1 JSON tick per line) — replay ke liye
+
+Same seed → same ticks (reproducible load tests).
+
+Usage:
+    python market_simulator.py            # throughput check
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from market_calendar import IST
+from strike_logic import StrikeResolver
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Simulator Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class SimConfig:
+    """
+    spot / annual_vol / drift  → index GBM params
+    jumps_per_day / jump_*     → Poisson jump process (log-return)
+    strike_step / strikes_each_side → option chain width
+    days_to_expiry / rate      → option pricing
+    ticks_per_sec              → normal index tick rate
+    option_every               → har kitne index ticks par chain tick kare
+    """
+
+    seed: int = 42
+    index_symbol: str = "NIFTY"
+    spot: float = 25900.0
+    annual_vol: float = 0.14
+    drift: float = 0.0
+    jumps_per_day: float = 2.0
+    jump_mean: float = 0.0
+    jump_std: float = 0.004
+
+    strike_step: int = 50
+    strikes_each_side: int = 10
+    days_to_expiry: float = 3.0
+    rate: float = 0.065
+    iv_smile: float = 0.15          # OTM strikes ka extra IV (per 10% moneyness)
+
+    oi_base: int = 2_000_000
+    oi_step_std: float = 2000.0
+
+    ticks_per_sec: float = 4.0
+    option_every: int = 1
+    session_open: datetime = datetime(2025, 12, 8, 9, 15)
+
+    open_burst_minutes: float = 5.0
+    open_burst_rate_mult: float = 10.0
+    open_burst_vol_mult: float = 3.0
+
+    expiry_day: bool = False
+    expiry_vol_mult: float = 1.5
+
+
+SECONDS_PER_YEAR = 365.0 * 24 * 3600
+TRADING_SECONDS_PER_DAY = 375 * 60
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Black-Scholes (scalar, fast math only)
+# ---------------------------------------------------------------------
+
+_SQRT2 = math.sqrt(2.0)
+
+
+def _ncdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / _SQRT2))
+
+
+def bs_price(spot: float, strike: float, t_years: float, vol: float,
+             rate: float, is_call: bool) -> float:
+    """Black-Scholes European price. t_years <= 0 → intrinsic."""
+    if t_years <= 0 or vol <= 0:
+        return max(spot - strike, 0.0) if is_call else max(strike - spot, 0.0)
+    sq = vol * math.sqrt(t_years)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * vol * vol) * t_years) / sq
+    d2 = d1 - sq
+    disc = strike * math.exp(-rate * t_years)
+    call = spot * _ncdf(d1) - disc * _ncdf(d2)
+    if is_call:
+        return call
+    return call - spot + disc
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — MarketSimulator
+# ---------------------------------------------------------------------
+
+class MarketSimulator:
+
+    def __init__(self, config: Optional[SimConfig] = None):
+        self.cfg = config or SimConfig()
+        self.rng = random.Random(self.cfg.seed)
+
+        c = self.cfg
+        self.spot = c.spot
+        atm = int(round(c.spot / c.strike_step) * c.strike_step)
+        self.strikes: List[int] = [atm + k * c.strike_step
+                                   for k in range(-c.strikes_each_side,
+                                                  c.strikes_each_side + 1)]
+        self.ce_oi: Dict[int, float] = {k: float(c.oi_base) for k in self.strikes}
+        self.pe_oi: Dict[int, float] = {k: float(c.oi_base) for k in self.strikes}
+
+        # Broker style symbols (expiry code ke saath) — bot ka StrikeResolver
+        # sim ke exchange din par wahi naam banata hai, isliye chain routing /
+        # write_jsonl replay / multiproc / tick_bus sab same symbols dekhte hain
+        resolver = StrikeResolver(c.index_symbol, today=c.session_open.date())
+        self.ce_symbols = {k: resolver.symbol(k, "CE") for k in self.strikes}
+        self.pe_symbols = {k: resolver.symbol(k, "PE") for k in self.strikes}
+
+        # session_open IST wall clock hai (host TZ kuch bhi ho)
+        open_ = c.session_open
+        self.t0 = (open_ if open_.tzinfo else open_.replace(tzinfo=IST)).timestamp()
+        self.elapsed = 0.0         # seconds since session open
+        self.ticks_emitted = 0
+
+    # -----------------------------------------------------------------
+    # Regime helpers
+    # -----------------------------------------------------------------
+
+    def _in_open_burst(self) -> bool:
+        return self.elapsed < self.cfg.open_burst_minutes * 60
+
+    def _rate(self) -> float:
+        r = self.cfg.ticks_per_sec
+        return r * self.cfg.open_burst_rate_mult if self._in_open_burst() else r
+
+    def _vol(self) -> float:
+        v = self.cfg.annual_vol
+        if self._in_open_burst():
+            v *= self.cfg.open_burst_vol_mult
+        if self.cfg.expiry_day:
+            v *= self.cfg.expiry_vol_mult
+        return v
+
+    def _t_years(self) -> float:
+        c = self.cfg
+        if c.expiry_day:
+            # Expiry ke din 15:30 tak ka bacha hua time
+            remaining = max(TRADING_SECONDS_PER_DAY - self.elapsed, 60.0)
+            return remaining / SECONDS_PER_YEAR
+        return max(c.days_to_expiry * 86400 - self.elapsed, 60.0) / SECONDS_PER_YEAR
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Tick generation
+    # -----------------------------------------------------------------
+
+    def _step_index(self, dt: float) -> float:
+        """GBM + jump ek step (dt seconds). Returns log-return."""
+        c = self.cfg
+        vol = self._vol()
+        dt_y = dt / (TRADING_SECONDS_PER_DAY * 252)
+        ret = (c.drift - 0.5 * vol * vol) * dt_y + vol * math.sqrt(dt_y) * self.rng.gauss(0, 1)
+
+        jump_p = c.jumps_per_day * dt / TRADING_SECONDS_PER_DAY
+        if self.rng.random() < jump_p:
+            ret += self.rng.gauss(c.jump_mean, c.jump_std)
+
+        self.spot *= math.exp(ret)
+        return ret
+
+    def _chain_ticks(self, ts: int, ret: float) -> Iterator[Dict]:
+        c = self.cfg
+        spot = self.spot
+        t = self._t_years()
+        base_vol = self._vol()
+        rng = self.rng
+        step = c.oi_step_std
+        # Price up → CE writers cover (CE OI down), PE writers add (PE OI up)
+        bias = -ret * 5e5
+
+        for k in self.strikes:
+            m = abs(math.log(k / spot))
+            vol = base_vol * (1.0 + c.iv_smile * m * 10.0)
+
+            ce_oi = max(self.ce_oi[k] + rng.gauss(bias, step), 0.0)
+            pe_oi = max(self.pe_oi[k] + rng.gauss(-bias, step), 0.0)
+            self.ce_oi[k] = ce_oi
+            self.pe_oi[k] = pe_oi
+
+            ce = bs_price(spot, k, t, vol, c.rate, True)
+            pe = ce - spot + k * math.exp(-c.rate * t)      # put-call parity
+
+            yield {"symbol": self.ce_symbols[k], "token": self.ce_symbols[k],
+                   "strike": k, "option_type": "CE",
+                   "last_traded_price": round(max(ce, 0.05), 2),
+                   "oi": int(ce_oi), "volume": rng.randint(25, 1500),
+                   "exchange_timestamp": ts}
+            yield {"symbol": self.pe_symbols[k], "token": self.pe_symbols[k],
+                   "strike": k, "option_type": "PE",
+                   "last_traded_price": round(max(pe, 0.05), 2),
+                   "oi": int(pe_oi), "volume": rng.randint(25, 1500),
+                   "exchange_timestamp": ts}
+
+    def atm_strike(self) -> int:
+        step = self.cfg.strike_step
+        return int(round(self.spot / step) * step)
+
+    def ticks(self, seconds: float, with_options: bool = True) -> Iterator[Dict]:
+        """
+        `seconds` market time ke ticks yield karta hai (index + optional chain).
+        Index tick me "oi" = ATM CE OI aur "pe_oi" = ATM PE OI hota hai.
+        """
+        c = self.cfg
+        end = self.elapsed + seconds
+        symbol = c.index_symbol
+        n = 0
+        while self.elapsed < end:
+            dt = self.rng.expovariate(self._rate())
+            self.elapsed += dt
+            ret = self._step_index(dt)
+            ts = int(self.t0 + self.elapsed)
+
+            atm = self.atm_strike()
+            yield {"symbol": symbol, "token": symbol,
+                   "last_traded_price": round(self.spot, 2),
+                   "volume": self.rng.randint(100, 5000),
+                   "oi": int(self.ce_oi.get(atm, 0)),
+                   "pe_oi": int(self.pe_oi.get(atm, 0)),
+                   "exchange_timestamp": ts, "timestamp": ts}
+            self.ticks_emitted += 1
+
+            n += 1
+            if with_options and n % c.option_every == 0:
+                for t in self._chain_ticks(ts, ret):
+                    self.ticks_emitted += 1
+                    yield t
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Sinks
+    # -----------------------------------------------------------------
+
+    def feed_handler(self, data_handler, seconds: float) -> int:
+        """Index ticks DataFeedHandler me daalo. Returns: kitne ticks."""
+        n = 0
+        for tick in self.ticks(seconds, with_options=False):
+            data_handler.on_tick(tick)
+            n += 1
+        return n
+
+    def write_jsonl(self, path: str, seconds: float, with_options: bool = True) -> int:
+        """Tick journal (JSON lines) likho — replay / paper backtest ke liye."""
+        n = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for tick in self.ticks(seconds, with_options):
+                f.write(json.dumps(tick, separators=(",", ":")))
+                f.write("\n")
+                n += 1
+        return n
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """write_jsonl ka ulta — replay ke liye ticks wapas padho."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+# ---------------------------------------------------------------------
+# Local Test (throughput)
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    for label, cfg in (("normal", SimConfig()),
+                       ("expiry", SimConfig(expiry_day=True, seed=7))):
+        sim = MarketSimulator(cfg)
+        t0 = time.perf_counter()
+        n = sum(1 for _ in sim.ticks(seconds=15 * 60))
+        dt = time.perf_counter() - t0
+        print(f"{label:<7} {n:>10,} ticks in {dt:.2f}s → "
+              f"{n / dt * 60:,.0f} ticks/min | spot={sim.spot:.2f}")
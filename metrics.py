@@ -0,0 +1,314 @@
+"""
+metrics.py
+
+In-process metrics registry + Prometheus text endpoint.
+
+Production me live view chahiye: ticks/sec, candles closed, evaluate calls,
+decisions by confidence tag, order latency, reconnect count, queue depth.
+
+Design:
+- Counter / Gauge / Histogram — hot path par sirf ek attribute update
+  (koi lock nahi; GIL ke andar int/float update kaafi hai, aur ek metric
+  ka writer ek hi thread hota hai)
+- CounterFunc / GaugeFunc — value scrape ke time kisi object se padho
+  (e.g. supervisor.reconnects, len(queue)) → hot path par zero cost
+- Collector — koi bhi callable jo extra Prometheus lines de
+  (latency tracer, pipeline queues)
+- start_http_server() → 127.0.0.1:<port>/metrics (Prometheus text format)
+
+Alert example (Prometheus):
+    time() - bot_last_tick_timestamp_seconds > 30   → feed stalled
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    inner = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + inner + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Metric types
+# ---------------------------------------------------------------------
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values) -> "_Metric":
+        """Label wala child (pehli baar banta hai, phir cache)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.help)
+
+    def _series(self) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if self.labelnames:
+            for key, child in list(self._children.items()):
+                lines.extend(child._series_with(self.labelnames, key))
+        else:
+            lines.extend(self._series())
+        return lines
+
+    def _series_with(self, names, values) -> List[str]:
+        return self._series(_fmt_labels(names, values))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.value = 0
+
+    def inc(self, n: float = 1):
+        self.value += n
+
+    def _series(self, labels: str = "") -> List[str]:
+        return [f"{self.name}{labels} {_fmt_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.value = 0.0
+
+    def set(self, v: float):
+        self.value = v
+
+    def inc(self, n: float = 1):
+        self.value += n
+
+    def dec(self, n: float = 1):
+        self.value -= n
+
+    def _series(self, labels: str = "") -> List[str]:
+        return [f"{self.name}{labels} {_fmt_value(self.value)}"]
+
+
+class GaugeFunc(_Metric):
+    """Value scrape ke time fn() se aati hai."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.fn = fn
+
+    def _series(self, labels: str = "") -> List[str]:
+        try:
+            v = self.fn()
+        except Exception:
+            return []
+        return [f"{self.name}{labels} {_fmt_value(v)}"]
+
+
+class CounterFunc(GaugeFunc):
+    kind = "counter"
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(_Metric):
+    """Prometheus histogram (seconds). observe() = bisect + 3 adds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def _series(self, labels: str = "") -> List[str]:
+        base = labels[1:-1] + "," if labels else ""
+        out = []
+        cum = 0
+        for le, c in zip(self.buckets + (float("inf"),), self.counts):
+            cum += c
+            out.append(f'{self.name}_bucket{{{base}le="{_fmt_value(le)}"}} {cum}')
+        out.append(f"{self.name}_sum{labels} {_fmt_value(self.sum)}")
+        out.append(f"{self.name}_count{labels} {self.count}")
+        return out
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Registry
+# ---------------------------------------------------------------------
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def _add(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_func(self, name, help_text, fn) -> GaugeFunc:
+        return self._add(GaugeFunc(name, help_text, fn))
+
+    def counter_func(self, name, help_text, fn) -> CounterFunc:
+        return self._add(CounterFunc(name, help_text, fn))
+
+    def add_collector(self, fn: Callable[[], List[str]]):
+        """fn() → Prometheus text lines (scrape ke time call hota hai)."""
+        self._collectors.append(fn)
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for m in list(self._metrics.values()):
+            lines.extend(m.expose())
+        for fn in self._collectors:
+            try:
+                lines.extend(fn())
+            except Exception as e:
+                log.warning("Collector failed: %s", e)
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Ready-made collectors
+# ---------------------------------------------------------------------
+
+def latency_collector(tracer) -> Callable[[], List[str]]:
+    """LatencyTracer ke per-stage percentiles → bot_stage_latency_seconds."""
+    def _collect():
+        name = "bot_stage_latency_seconds"
+        lines = [f"# HELP {name} Per-stage tick-to-order latency quantiles",
+                 f"# TYPE {name} summary"]
+        for stage, s in tracer.snapshot().items():
+            if not s["count"]:
+                continue
+            for q, key in (("0.5", "p50_us"), ("0.9", "p90_us"), ("0.99", "p99_us")):
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} '
+                             f"{s[key] / 1e6!r}")
+            lines.append(f'{name}_sum{{stage="{stage}"}} {s["sum_us"] / 1e6!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {s["count"]}')
+        return lines
+    return _collect
+
+
+def pipeline_collector(pipeline) -> Callable[[], List[str]]:
+    """TickPipeline queue depth / drops → bot_queue_* gauges."""
+    def _collect():
+        lines = ["# TYPE bot_queue_depth gauge", "# TYPE bot_queue_max_depth gauge",
+                 "# TYPE bot_queue_dropped_total counter",
+                 "# TYPE bot_queue_conflated_total counter"]
+        for qname, s in pipeline.stats().items():
+            if not isinstance(s, dict) or not s:
+                continue
+            lines.append(f'bot_queue_depth{{queue="{qname}"}} {s["depth"]}')
+            lines.append(f'bot_queue_max_depth{{queue="{qname}"}} {s["max_depth"]}')
+            lines.append(f'bot_queue_dropped_total{{queue="{qname}"}} {s.get("dropped", 0)}')
+            lines.append(f'bot_queue_conflated_total{{queue="{qname}"}} {s.get("conflated", 0)}')
+        return lines
+    return _collect
+
+
+def sanitizer_collector(sanitizer) -> Callable[[], List[str]]:
+    """TickSanitizer counters → bot_ticks_rejected_total{reason} + reorder / rebase."""
+    def _collect():
+        s = sanitizer.stats()
+        lines = ["# TYPE bot_ticks_rejected_total counter",
+                 "# TYPE bot_ticks_reordered_total counter",
+                 "# TYPE bot_ticks_rebased_total counter"]
+        for reason, n in s["rejected"].items():
+            lines.append(f'bot_ticks_rejected_total{{reason="{reason}"}} {n}')
+        lines.append(f"bot_ticks_reordered_total {s['reordered']}")
+        lines.append(f"bot_ticks_rebased_total {s['rebased']}")
+        return lines
+    return _collect
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — HTTP endpoint
+# ---------------------------------------------------------------------
+
+def start_http_server(registry: MetricsRegistry, port: int = 9108,
+                      host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Daemon thread me /metrics serve karta hai."""
+    # Lazy: http.server (+ email/html parsers) import sirf jab endpoint on ho
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            # Har scrape ko log mat karo
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    t = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    t.start()
+    log.info("Metrics endpoint on http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,429 @@
+"""
+multiproc.py
+
+Optional deployment mode: feed / strategy / execution alag processes me.
+
+    ┌────────┐  ticks   ┌──────────┐  orders   ┌───────────┐
+    │  feed  │ ───────▶ │ strategy │ ────────▶ │ execution │
+    │  (WS)  │ ◀─────── │ (rules)  │ ◀──────── │ (REST)    │
+    └────────┘ control  └──────────┘   acks    └───────────┘
+
+- Har arrow ek SPSC ring (shm_ring.py, shared memory, fixed-layout records)
+- Feed process: WebSocket + decode → TICK_RECORD push (strategy slow ho to
+  ring full → tick drop + count, socket kabhi block nahi hota)
+- Strategy process: OptionBot (candles, chain, rules, risk); orders
+  RingOrderManager se ORDER ring me (non-blocking)
+- Execution process: OrderScheduler + OrderManager / PaperOrderManager —
+  blocked REST call sirf isi process ko rokti hai, ingestion ko nahi
+- Linux par har process apne core par pin (os.sched_setaffinity)
+
+Usage:
+    python multiproc.py               # live feed (mStock WS)
+    python multiproc.py --sim 900     # market_simulator ke 15 min (offline)
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from shm_ring import (ACK_RECORD, CONTROL_RECORD, ID_LEN, KIND_CANCEL, KIND_ENTRY,
+                      KIND_EXIT, KIND_PRICE, KIND_SL_MODIFY, KIND_STOP, KIND_SUBSCRIBE,
+                      KIND_UNSUBSCRIBE, ORDER_RECORD, TICK_RECORD, SpscRing, TickReader,
+                      pack_opt, pack_seq, pack_str, unpack_str)
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class MultiProcConfig:
+    """
+    *_capacity = ring slots (power of 2)
+    cpus       = role → CPU core (None → OS decide kare)
+    """
+
+    tick_capacity: int = 1 << 16
+    order_capacity: int = 1 << 10
+    ack_capacity: int = 1 << 10
+    control_capacity: int = 1 << 8
+    cpus: Dict[str, Optional[int]] = field(
+        default_factory=lambda: {"feed": 0, "strategy": 1, "execution": 2})
+
+
+def _pin(role: str, cpu: Optional[int]):
+    if cpu is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        if cpu < os.cpu_count():
+            os.sched_setaffinity(0, {cpu})
+    except OSError as e:
+        log.warning("%s: CPU pin failed: %s", role, e)
+
+
+def _setup(role: str, cpu: Optional[int]):
+    from bot_logger import setup_logging
+    setup_logging(filename=f"{role}.log")
+    _pin(role, cpu)
+    log.info("%s process started (pid=%s)", role, os.getpid())
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Feed process
+# ---------------------------------------------------------------------
+
+def _tick_pusher(ring: SpscRing):
+    """
+    tick dict → TICK_RECORD. Ring full → drop (socket block nahi).
+    Symbol field se lamba → drop + too_long count (pehli baar warning).
+    """
+    state = {"seq": 0, "dropped": 0, "too_long": 0}
+    push = ring.push
+    warned = set()
+
+    def _push(tick: Dict, recv_ns: int) -> bool:
+        # Drop hone par bhi seq aage badhta hai → strategy ko gap dikhega
+        state["seq"] += 1
+        try:
+            sym = pack_str(tick.get("symbol"))
+        except ValueError as e:
+            state["dropped"] += 1
+            state["too_long"] += 1
+            if tick.get("symbol") not in warned:
+                warned.add(tick.get("symbol"))
+                log.warning("Tick dropped: %s", e)
+            return False
+        ok = push(sym, tick["last_traded_price"],
+                  pack_opt(tick.get("volume")), pack_opt(tick.get("oi")),
+                  int(tick.get("exchange_timestamp") or 0), pack_seq(tick.get("seq")),
+                  recv_ns, state["seq"])
+        if not ok:
+            state["dropped"] += 1
+        return ok
+
+    return _push, state
+
+
+def feed_main(specs: Dict[str, Tuple[str, int]], cfg: MultiProcConfig,
+              sim_seconds: Optional[float] = None):
+    _setup("feed", cfg.cpus.get("feed"))
+    ticks = SpscRing(TICK_RECORD, specs["ticks"][1], specs["ticks"][0], create=False)
+    control = SpscRing(CONTROL_RECORD, specs["control"][1], specs["control"][0],
+                       create=False)
+    push, state = _tick_pusher(ticks)
+
+    if sim_seconds is not None:
+        from market_simulator import MarketSimulator
+        sim = MarketSimulator()
+        for tick in sim.ticks(sim_seconds):
+            # Sim me drop nahi: strategy ke saath pace karo
+            while ticks.depth() >= ticks.capacity:
+                time.sleep(0.0005)
+            push(tick, time.perf_counter_ns())
+        ticks.push_wait(b"", 0.0, 0.0, 0.0, 0, -1, 0, 0)   # seq=0 → end of feed
+        log.info("Sim feed done: %s ticks", state["seq"])
+        ticks.close()
+        control.close()
+        return
+
+    import threading
+    from bot_core import (CLIENT_ID, MSTOCK_API_KEY, PASSWORD, TOTP_SECRET,
+                          BotConfig, MStockClient)
+    from market_calendar import SessionCalendar
+    from ws_decoder import TickDecoder
+    from ws_supervisor import ConnectionSupervisor, SupervisorConfig
+
+    bot_cfg = BotConfig()
+    api = MStockClient(MSTOCK_API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
+    api.login()
+    decoder = TickDecoder()
+
+    def on_message(ws, message):
+        recv_ns = time.perf_counter_ns()
+        tick = decoder(message)
+        if tick is not None:
+            push(tick, recv_ns)
+
+    calendar = (SessionCalendar.from_file(bot_cfg.calendar_file)
+                if bot_cfg.calendar_file else SessionCalendar())
+    supervisor = ConnectionSupervisor(url_factory=api.ws_url, on_message=on_message,
+                                      config=SupervisorConfig(calendar=calendar))
+    supervisor.add_subscription("NSE", bot_cfg.index_symbol)
+
+    def _control_loop():
+        # Strategy se subscribe requests (option chain symbols)
+        while True:
+            kind, exchange, symbol = control.pop_wait()
+            if kind == KIND_STOP:
+                supervisor.stop()
+                return
+            if kind == KIND_SUBSCRIBE:
+                supervisor.add_subscription(unpack_str(exchange), unpack_str(symbol))
+            elif kind == KIND_UNSUBSCRIBE:
+                supervisor.remove_subscription(unpack_str(exchange), unpack_str(symbol))
+
+    threading.Thread(target=_control_loop, name="feed-control", daemon=True).start()
+    supervisor.run_forever()
+    log.info("Feed stopped: %s ticks, %s dropped (%s symbol too long)",
+             state["seq"], state["dropped"], state["too_long"])
+    ticks.close()
+    control.close()
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Strategy side order manager (ring producer)
+# ---------------------------------------------------------------------
+
+class RingOrderManager:
+    """
+    OrderManager jaisa interface, par har call sirf ORDER_RECORD push hai.
+    Local id ("R<n>") turant return; broker id ACK ring se aata hai.
+    """
+
+    def __init__(self, orders: SpscRing):
+        self.orders = orders
+        self._n = 0
+        self.ltp: Dict[str, float] = {}
+        self.broker_ids: Dict[str, str] = {}
+        self.status: Dict[str, str] = {}
+
+    def _send(self, kind: int, symbol: str, qty: int = 0, price: float = 0.0,
+              ref_id: str = "") -> str:
+        self._n += 1
+        local_id = f"R{self._n}"
+        self.orders.push_wait(kind, pack_str(symbol), pack_str(local_id, ID_LEN),
+                              pack_str(ref_id, ID_LEN), qty, price, time.perf_counter_ns())
+        self.status[local_id] = "SENT"
+        return local_id
+
+    # ENTRY / EXIT me ref_id field khaali hota hai → symboltoken wahi jaata hai
+    def place_buy_order(self, symbol: str, qty: int,
+                        token: Optional[str] = None) -> Optional[str]:
+        return self._send(KIND_ENTRY, symbol, qty, ref_id=token or "")
+
+    def place_exit_order(self, symbol: str, qty: int,
+                         token: Optional[str] = None) -> Optional[str]:
+        return self._send(KIND_EXIT, symbol, qty, ref_id=token or "")
+
+    def modify_sl_order(self, order_id: str, symbol: str, new_sl: float, qty: int,
+                        token: Optional[str] = None):
+        # ref_id = order id; token execution process entry ke time yaad rakhta hai
+        return self._send(KIND_SL_MODIFY, symbol, qty, new_sl, order_id)
+
+    def cancel_order(self, order_id: str) -> bool:
+        self._send(KIND_CANCEL, "", ref_id=order_id)
+        return True
+
+    def get_order_status(self, order_id: str):
+        return self.status.get(order_id)
+
+    def get_option_ltp(self, symbol: str) -> float:
+        return self.ltp.get(symbol, 0.0)
+
+    def on_price(self, symbol: str, ltp: float, ts: Optional[float] = None) -> int:
+        """Paper venue execution process me hai → price wahan bhi bhejo."""
+        self.ltp[symbol] = ltp
+        self.orders.push(KIND_PRICE, pack_str(symbol), b"", b"", 0, ltp, int(ts or 0))
+        return 0
+
+    def on_ack(self, rec: tuple):
+        kind, symbol, local_id, broker_id, ok, ns = rec
+        lid = unpack_str(local_id)
+        self.status[lid] = "ACK" if ok else "REJECTED"
+        if ok:
+            self.broker_ids[lid] = unpack_str(broker_id)
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — Strategy process
+# ---------------------------------------------------------------------
+
+def strategy_loop(bot, reader: TickReader, candle_timer: bool = True,
+                  idle: Optional[Callable[[], None]] = None):
+    """
+    Strategy poll loop (yahan aur tick_bus.strategy_main dono me):
+        tick → tracer.begin → bot.on_tick → close_if_due → scheduler pump → idle()
+    Feed band (seq=0) → return.
+
+    candle_timer → wall-clock candle close poll (sim replay me band: purane ts)
+    """
+    pump = bot.order_scheduler.pump
+    # Thin market: candle agle tick ka wait kiye bina boundary + grace par band
+    close_if_due = (bot.data_handler.close_if_due
+                    if candle_timer and bot.cfg.candle_close_grace is not None else None)
+    while not reader.closed:
+        tick = reader.pop(timeout=0.05)
+        if tick is not None:
+            bot.tracer.begin(reader.last_recv_ns)
+            bot.on_tick(tick)
+        if close_if_due is not None and close_if_due(time.time()):
+            bot.on_candle_close()
+        pump()
+        if idle is not None:
+            idle()
+
+
+def _drain_acks(acks: SpscRing, om: RingOrderManager):
+    ack = acks.pop()
+    while ack is not None:
+        om.on_ack(ack)
+        ack = acks.pop()
+
+
+def strategy_main(specs: Dict[str, Tuple[str, int]], cfg: MultiProcConfig,
+                  candle_timer: bool = True):
+    """candle_timer → wall-clock candle close poll (sim replay me band: purane ts)"""
+    _setup("strategy", cfg.cpus.get("strategy"))
+    from bot_core import (CLIENT_ID, MSTOCK_API_KEY, PASSWORD, TOTP_SECRET,
+                          BotConfig, MStockClient, OptionBot)
+    from warm_start import warm_start
+
+    ticks = SpscRing(TICK_RECORD, specs["ticks"][1], specs["ticks"][0], create=False)
+    orders = SpscRing(ORDER_RECORD, specs["orders"][1], specs["orders"][0], create=False)
+    acks = SpscRing(ACK_RECORD, specs["acks"][1], specs["acks"][0], create=False)
+    control = SpscRing(CONTROL_RECORD, specs["control"][1], specs["control"][0],
+                       create=False)
+
+    om = RingOrderManager(orders)
+    api = MStockClient(MSTOCK_API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
+    bot_cfg = BotConfig()
+    bot = OptionBot(api, bot_cfg, order_manager=om)
+    warm_start(bot.data_handler, api, bot_cfg.index_symbol)
+    bot.on_chain_symbols = lambda symbols: [
+        control.push_wait(KIND_SUBSCRIBE, b"NFO", pack_str(s)) for s in symbols]
+    bot.on_chain_unsubscribe = lambda symbols: [
+        control.push_wait(KIND_UNSUBSCRIBE, b"NFO", pack_str(s)) for s in symbols]
+
+    reader = TickReader(ticks)
+    strategy_loop(bot, reader, candle_timer, idle=lambda: _drain_acks(acks, om))
+
+    orders.push_wait(KIND_STOP, b"", b"", b"", 0, 0.0, 0)
+    control.push_wait(KIND_STOP, b"", b"")
+    log.info("Strategy done: %s ticks, %s seq gaps (%s missed), orders=%s\n%s",
+             reader.received, reader.gaps, reader.missed, bot.order_scheduler.sent,
+             bot.tracer.report())
+    for r in (ticks, orders, acks, control):
+        r.close()
+
+
+# ---------------------------------------------------------------------
+# STEP 5 — Execution process
+# ---------------------------------------------------------------------
+
+def execution_main(specs: Dict[str, Tuple[str, int]], cfg: MultiProcConfig,
+                   paper: bool = True):
+    _setup("execution", cfg.cpus.get("execution"))
+    orders = SpscRing(ORDER_RECORD, specs["orders"][1], specs["orders"][0], create=False)
+    acks = SpscRing(ACK_RECORD, specs["acks"][1], specs["acks"][0], create=False)
+
+    if paper:
+        from paper_trade import PaperOrderManager
+        om = PaperOrderManager()
+    else:
+        from bot_core import CLIENT_ID, MSTOCK_API_KEY, PASSWORD, TOTP_SECRET, MStockClient
+        from order_manager import OrderManager
+        api = MStockClient(MSTOCK_API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
+        api.login()
+        om = OrderManager(api)
+
+    broker_ids: Dict[str, str] = {}     # local id → broker id
+    tokens: Dict[str, str] = {}         # symbol → symboltoken (ENTRY / EXIT se)
+    sent = 0
+    while True:
+        kind, symbol, local_id, ref_id, qty, price, ns = orders.pop_wait()
+        if kind == KIND_STOP:
+            break
+        sym = unpack_str(symbol)
+        if kind == KIND_PRICE:
+            if paper:
+                om.on_price(sym, price, ns or None)
+            continue
+
+        lid = unpack_str(local_id)
+        ref = broker_ids.get(unpack_str(ref_id), unpack_str(ref_id))
+        if kind in (KIND_ENTRY, KIND_EXIT) and ref:
+            tokens[sym] = ref
+        try:
+            if kind == KIND_ENTRY:
+                result = om.place_buy_order(sym, qty, tokens.get(sym))
+            elif kind == KIND_EXIT:
+                result = om.place_exit_order(sym, qty, tokens.get(sym))
+            elif kind == KIND_SL_MODIFY:
+                result = om.modify_sl_order(ref, sym, price, qty, tokens.get(sym))
+            else:
+                result = om.cancel_order(ref)
+        except Exception as e:
+            log.exception("Order failed: %s", e)
+            result = None
+        sent += 1
+        broker_id = result if isinstance(result, str) else ""
+        if broker_id:
+            broker_ids[lid] = broker_id
+        try:
+            bid = pack_str(broker_id, ID_LEN)
+        except ValueError as e:
+            # Mapping isi process me hai (modify / cancel chalenge); strategy ko id nahi
+            log.error("Broker id not sent in ack: %s", e)
+            bid = b""
+        acks.push_wait(kind, symbol, local_id, bid, bool(result), time.perf_counter_ns())
+
+    log.info("Execution done: %s orders", sent)
+    orders.close()
+    acks.close()
+
+
+# ---------------------------------------------------------------------
+# STEP 6 — Launcher
+# ---------------------------------------------------------------------
+
+def run(cfg: Optional[MultiProcConfig] = None, sim_seconds: Optional[float] = None,
+        paper: bool = True):
+    cfg = cfg or MultiProcConfig()
+    rings = {
+        "ticks": SpscRing(TICK_RECORD, cfg.tick_capacity),
+        "orders": SpscRing(ORDER_RECORD, cfg.order_capacity),
+        "acks": SpscRing(ACK_RECORD, cfg.ack_capacity),
+        "control": SpscRing(CONTROL_RECORD, cfg.control_capacity),
+    }
+    specs = {name: r.spec() for name, r in rings.items()}
+
+    # spawn: har child ka apna interpreter (parent ke threads / sockets nahi)
+    ctx = mp.get_context("spawn")
+    procs = [
+        ctx.Process(target=execution_main, args=(specs, cfg, paper), name="execution"),
+        ctx.Process(target=strategy_main, args=(specs, cfg, sim_seconds is None),
+                    name="strategy"),
+        ctx.Process(target=feed_main, args=(specs, cfg, sim_seconds), name="feed"),
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for r in rings.values():
+            r.close()
+            r.unlink()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Multi-process bot (feed / strategy / execution)")
+    ap.add_argument("--sim", type=float, default=None,
+                    help="live feed ki jagah market_simulator ke itne seconds")
+    ap.add_argument("--live-orders", action="store_true",
+                    help="execution process broker par order bheje (default paper)")
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    run(sim_seconds=args.sim, paper=not args.live_orders)
+    print(f"Done in {time.perf_counter() - t0:.1f}s")
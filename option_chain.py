@@ -0,0 +1,271 @@
+"""
+option_chain.py
+
+Incremental option chain — ATM ke aas-paas har strike ka CE/PE data.
+
+Pehle:
+    DataFeedHandler sirf ek placeholder OI series rakhta tha (index tick ka
+    "oi" → ce_oi), pe_oi kabhi bharta hi nahi tha.
+
+Ab:
+- Har strike (ATM ± strikes_each_side) ka LTP / OI / volume / OI change
+  typed arrays me (array('d'), strike slot se index) — per tick in-place update
+- Running totals incremental maintain hote hain (har tick O(1) / O(strikes)):
+    PCR            = Σ PE OI / Σ CE OI
+    OI support     = PE OI weighted avg strike   (puts jahan likhe hain)
+    OI resistance  = CE OI weighted avg strike   (calls jahan likhe hain)
+    Max pain       = pain[K] array, har OI delta par in-place update,
+                     read par argmin
+- sample() har candle close par summary series (CE/PE OI total, PCR)
+  append karta hai → DataFeedHandler ise MarketContext me publish karta hai
+
+Window shift: spot ATM window ke edge ke paas aaye to recenter() —
+overlap wale strikes ka data rakha jaata hai, totals dobara ban jaate hain;
+window se bahar gaye symbols `retired` me (caller unsubscribe kare).
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Chain Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class ChainConfig:
+    """
+    strike_step       = strike gap (NIFTY 50, BANKNIFTY 100)
+    strikes_each_side = ATM ke upar / neeche kitne strikes track karein
+    recenter_steps    = ATM center se itne steps door jaye to window shift
+    series_len        = summary series (per candle) ki max length
+    """
+
+    strike_step: int = 50
+    strikes_each_side: int = 10
+    recenter_steps: int = 4
+    series_len: int = 200
+
+
+CE, PE = 0, 1
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — OptionChain
+# ---------------------------------------------------------------------
+
+class OptionChain:
+
+    def __init__(self, index_symbol: str, spot: float,
+                 config: Optional[ChainConfig] = None,
+                 symbol_fn: Optional[Callable[[int, str], str]] = None):
+        """
+        symbol_fn → (strike, "CE"/"PE") → broker trading symbol
+        (strike_logic.StrikeResolver.symbol; default NIFTY25900CE style)
+        """
+        self.index_symbol = index_symbol
+        self.cfg = config or ChainConfig()
+        self.symbol_fn = symbol_fn or (lambda k, side: f"{index_symbol}{k}{side}")
+
+        # symbol → (slot, side)  (live feed routing, O(1))
+        self._symbols: Dict[str, Tuple[int, int]] = {}
+
+        # Summary series (sample() par append)
+        self.ce_oi_series: List[int] = []
+        self.pe_oi_series: List[int] = []
+        self.pcr_series: List[float] = []
+
+        self.ticks = 0
+        self.recenters = 0
+        # Last recenter me window se bahar gaye symbols (unsubscribe ke liye)
+        self.retired: List[str] = []
+        self._build(self.atm(spot))
+
+    def atm(self, spot: float) -> int:
+        step = self.cfg.strike_step
+        return int(round(spot / step) * step)
+
+    def _build(self, center: int, keep: Optional[Dict[Tuple[int, int], tuple]] = None):
+        cfg = self.cfg
+        n = 2 * cfg.strikes_each_side + 1
+        self.center = center
+        self.lo = center - cfg.strikes_each_side * cfg.strike_step
+        self.strikes: List[int] = [self.lo + i * cfg.strike_step for i in range(n)]
+
+        z = [0.0] * n
+        # [CE, PE] per field — strike slot se index
+        self.ltp = (array("d", z), array("d", z))
+        self.oi = (array("d", z), array("d", z))
+        self.oi_open = (array("d", z), array("d", z))   # pehla OI → OI change base
+        self.volume = (array("d", z), array("d", z))
+        self.pain = array("d", z)                       # pain[K] (writers ka loss)
+
+        self.total_oi = [0.0, 0.0]
+        self.weighted_oi = [0.0, 0.0]                   # Σ strike * OI
+
+        self._symbols = {}
+        for i, k in enumerate(self.strikes):
+            self._symbols[self.symbol_fn(k, "CE")] = (i, CE)
+            self._symbols[self.symbol_fn(k, "PE")] = (i, PE)
+
+        for (k, side), (ltp, oi, oi_open, vol) in (keep or {}).items():
+            i = self.slot(k)
+            if i is None:
+                continue
+            self.ltp[side][i] = ltp
+            self.oi_open[side][i] = oi_open
+            self.volume[side][i] = vol
+            self._set_oi(i, side, oi)
+
+        # (strikes, ltp) ek hi ref me, sab bharne ke baad publish — dusre thread
+        # (GreeksEngine) ko kabhi naye strikes ke saath purane LTP nahi milte
+        self.grid = (self.strikes, self.ltp)
+
+    def slot(self, strike: int) -> Optional[int]:
+        i, rem = divmod(strike - self.lo, self.cfg.strike_step)
+        if rem or i < 0 or i >= len(self.strikes):
+            return None
+        return i
+
+    def symbols(self) -> List[str]:
+        """Subscribe karne ke liye saare chain symbols."""
+        return list(self._symbols)
+
+    # -----------------------------------------------------------------
+    # STEP 3 — Incremental updates
+    # -----------------------------------------------------------------
+
+    def _set_oi(self, i: int, side: int, oi: float):
+        oi_arr = self.oi[side]
+        delta = oi - oi_arr[i]
+        if not delta:
+            return
+        oi_arr[i] = oi
+        k = self.strikes[i]
+        self.total_oi[side] += delta
+        self.weighted_oi[side] += delta * k
+
+        # Expiry at K par loss: CE writers → (K - k)+, PE writers → (k - K)+
+        pain = self.pain
+        strikes = self.strikes
+        if side == CE:
+            for j in range(i + 1, len(strikes)):
+                pain[j] += delta * (strikes[j] - k)
+        else:
+            for j in range(i):
+                pain[j] += delta * (k - strikes[j])
+
+    def update(self, strike: int, side: int, ltp: float,
+               oi: Optional[float] = None, volume: float = 0) -> bool:
+        """Ek strike ka tick. Window ke bahar → False (ignore)."""
+        i = self.slot(strike)
+        if i is None:
+            return False
+        self.ticks += 1
+        self.ltp[side][i] = ltp
+        self.volume[side][i] += volume
+        if oi is not None:
+            if not self.oi_open[side][i]:
+                self.oi_open[side][i] = oi
+            self._set_oi(i, side, oi)
+        return True
+
+    def on_tick(self, tick: Dict) -> bool:
+        """
+        Option tick (decoder / simulator format).
+        Routing: "symbol" se, warna "strike" + "option_type" fields se.
+        """
+        ref = self._symbols.get(tick.get("symbol"))
+        if ref is not None:
+            i, side = ref
+            strike = self.strikes[i]
+        else:
+            strike = tick.get("strike")
+            opt = tick.get("option_type")
+            if strike is None or opt not in ("CE", "PE"):
+                return False
+            side = CE if opt == "CE" else PE
+        return self.update(strike, side, tick.get("last_traded_price") or 0.0,
+                           tick.get("oi"), tick.get("volume") or 0)
+
+    def track_spot(self, spot: float) -> bool:
+        """Spot ATM center se door gaya → recenter. True agar shift hua."""
+        atm = self.atm(spot)
+        if abs(atm - self.center) < self.cfg.recenter_steps * self.cfg.strike_step:
+            return False
+        self.recenter(atm)
+        return True
+
+    def recenter(self, center: int):
+        keep = {}
+        for i, k in enumerate(self.strikes):
+            for side in (CE, PE):
+                keep[(k, side)] = (self.ltp[side][i], self.oi[side][i],
+                                   self.oi_open[side][i], self.volume[side][i])
+        old = self._symbols
+        self._build(center, keep)
+        self.retired = [sym for sym in old if sym not in self._symbols]
+        self.recenters += 1
+        log.info("Option chain recentered at %s", center)
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Analytics (O(1) / O(strikes) reads)
+    # -----------------------------------------------------------------
+
+    def pcr(self) -> float:
+        ce = self.total_oi[CE]
+        return self.total_oi[PE] / ce if ce else 0.0
+
+    def oi_support(self) -> Optional[float]:
+        pe = self.total_oi[PE]
+        return self.weighted_oi[PE] / pe if pe else None
+
+    def oi_resistance(self) -> Optional[float]:
+        ce = self.total_oi[CE]
+        return self.weighted_oi[CE] / ce if ce else None
+
+    def max_pain(self) -> Optional[int]:
+        if not (self.total_oi[CE] or self.total_oi[PE]):
+            return None
+        pain = self.pain
+        return self.strikes[min(range(len(pain)), key=pain.__getitem__)]
+
+    def oi_change(self, strike: int, side: int) -> float:
+        i = self.slot(strike)
+        if i is None:
+            return 0.0
+        return self.oi[side][i] - self.oi_open[side][i]
+
+    def ltp_of(self, strike: int, side: int) -> float:
+        i = self.slot(strike)
+        return self.ltp[side][i] if i is not None else 0.0
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Summary series (candle close par)
+    # -----------------------------------------------------------------
+
+    def sample(self):
+        n = self.cfg.series_len
+        for series, v in ((self.ce_oi_series, int(self.total_oi[CE])),
+                          (self.pe_oi_series, int(self.total_oi[PE])),
+                          (self.pcr_series, self.pcr())):
+            series.append(v)
+            if len(series) > n:
+                del series[0]
+
+    def summary(self) -> Dict:
+        return {
+            "center": self.center,
+            "pcr": round(self.pcr(), 3),
+            "oi_support": self.oi_support(),
+            "oi_resistance": self.oi_resistance(),
+            "max_pain": self.max_pain(),
+            "ce_oi": int(self.total_oi[CE]),
+            "pe_oi": int(self.total_oi[PE]),
+        }
@@ -13,10 +13,15 @@ NOTE:
 """
 
 from __future__ import annotations
-from SmartApi.smartConnect import SmartConnect   # Angel One SmartAPI
 from dataclasses import dataclass
-from typing import Optional, Literal
-import traceback
+from typing import TYPE_CHECKING, Optional, Literal
+import logging
+
+log = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    # Sirf type hint ke liye — runtime par SmartApi import nahi hota
+    from SmartApi.smartConnect import SmartConnect   # Angel One SmartAPI
 
 
 
@@ -62,9 +67,11 @@ class OrderManager:
     # STEP 3 — PLACE ORDER (BUY)
     # -----------------------------------------------------------------
 
-    def place_buy_order(self, symbol: str, qty: int) -> Optional[str]:
+    def place_buy_order(self, symbol: str, qty: int,
+                        token: Optional[str] = None) -> Optional[str]:
         """
         BUY order place karega (CE/PE option buy)
+        token → broker symboltoken (strike_logic.StrikeResolver se)
         Returns: order_id or None
         """
 
@@ -72,7 +79,7 @@ class OrderManager:
             params = {
                 "variety": self.cfg.variety,
                 "tradingsymbol": symbol,
-                "symboltoken": "",     # TODO: bot_core symbol mapping se fill karega
+                "symboltoken": token or "",
                 "transactiontype": "BUY",
                 "exchange": self.cfg.exchange,
                 "ordertype": self.cfg.order_type,
@@ -81,18 +88,16 @@ class OrderManager:
                 "quantity": qty,
             }
 
-            print(f"[OrderManager] BUY → {symbol}, QTY={qty}")
+            log.info("BUY → %s, QTY=%s", symbol, qty)
 
             order = self.api.placeOrder(params)
             order_id = order.get("orderid")
 
-            print(f"[OrderManager] BUY ORDER PLACED → OrderID = {order_id}")
+            log.info("BUY ORDER PLACED → OrderID = %s", order_id)
             return order_id
 
         except Exception as e:
-            print("\n[OrderManager] BUY Order Failed:")
-            print(e)
-            traceback.print_exc()
+            log.exception("BUY Order Failed: %s", e)
             return None
 
 
@@ -101,7 +106,8 @@ class OrderManager:
     # STEP 4 — EXIT ORDER (SELL)
     # -----------------------------------------------------------------
 
-    def place_exit_order(self, symbol: str, qty: int) -> Optional[str]:
+    def place_exit_order(self, symbol: str, qty: int,
+                         token: Optional[str] = None) -> Optional[str]:
         """
         SELL order place karega to exit the trade.
         """
@@ -110,7 +116,7 @@ class OrderManager:
             params = {
                 "variety": self.cfg.variety,
                 "tradingsymbol": symbol,
-                "symboltoken": "",
+                "symboltoken": token or "",
                 "transactiontype": "SELL",
                 "exchange": self.cfg.exchange,
                 "ordertype": self.cfg.order_type,
@@ -119,18 +125,16 @@ class OrderManager:
                 "quantity": qty,
             }
 
-            print(f"[OrderManager] EXIT → {symbol}, QTY={qty}")
+            log.info("EXIT → %s, QTY=%s", symbol, qty)
 
             order = self.api.placeOrder(params)
             order_id = order.get("orderid")
 
-            print(f"[OrderManager] EXIT ORDER PLACED → OrderID = {order_id}")
+            log.info("EXIT ORDER PLACED → OrderID = %s", order_id)
             return order_id
 
         except Exception as e:
-            print("\n[OrderManager] EXIT Order Failed:")
-            print(e)
-            traceback.print_exc()
+            log.exception("EXIT Order Failed: %s", e)
             return None
 
 
@@ -139,7 +143,8 @@ class OrderManager:
     # STEP 5 — MODIFY ORDER (For SL update)
     # -----------------------------------------------------------------
 
-    def modify_sl_order(self, order_id: str, symbol: str, new_sl: float, qty: int):
+    def modify_sl_order(self, order_id: str, symbol: str, new_sl: float, qty: int,
+                        token: Optional[str] = None):
         """
         Agar tum stoploss modify karna chahte ho,
         toh ye function SL modify karega.
@@ -154,7 +159,7 @@ class OrderManager:
                 "variety": self.cfg.variety,
                 "orderid": order_id,
                 "tradingsymbol": symbol,
-                "symboltoken": "",
+                "symboltoken": token or "",
                 "transactiontype": "SELL",
                 "exchange": self.cfg.exchange,
                 "ordertype": "STOPLOSS",
@@ -165,16 +170,14 @@ class OrderManager:
                 "price": new_sl,
             }
 
-            print(f"[OrderManager] SL MODIFY → {order_id}, New SL = {new_sl}")
+            log.info("SL MODIFY → %s, New SL = %s", order_id, new_sl)
 
             resp = self.api.modifyOrder(params)
-            print("[OrderManager] SL Order Modified:", resp)
+            log.info("SL Order Modified: %s", resp)
             return resp
 
         except Exception as e:
-            print("\n[OrderManager] SL Modify Failed:")
-            print(e)
-            traceback.print_exc()
+            log.exception("SL Modify Failed: %s", e)
             return None
 
 
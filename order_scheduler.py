@@ -0,0 +1,338 @@
+"""
+order_scheduler.py
+
+Broker har second me limited orders hi accept karta hai
+(Angel SmartAPI: placeOrder / modifyOrder ~20 req/sec).
+Burst me zyada calls gaye toh broker reject kar deta hai.
+
+Is file ka kaam:
+- OrderManager ke aage ek scheduler lagana
+- Har endpoint (placeOrder / modifyOrder) ka alag token bucket
+- Priority queue: EXIT / CANCEL > SL MODIFY > ENTRY
+- Same order ke multiple SL modify ko coalesce karna
+  (sirf latest trigger price broker ko jayega)
+- bot_core trailing SL badalne par submit_sl_modify (BotConfig.broker_sl),
+  position exit par resting SL ka submit_cancel
+
+NOTE:
+- OrderManager ka logic same rahega, ye sirf "kab bhejna hai" decide karta hai.
+- pump() non-blocking hai, start() background thread me pump chalata hai.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Priority levels (chhota number = pehle jayega)
+# ---------------------------------------------------------------------
+
+PRIORITY_EXIT = 0
+PRIORITY_SL_MODIFY = 1
+PRIORITY_ENTRY = 2
+
+ENDPOINT_PLACE = "placeOrder"
+ENDPOINT_MODIFY = "modifyOrder"
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Scheduler Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class SchedulerConfig:
+    """
+    Broker ki rate limit yaha set karo.
+
+    - place_rate / place_burst   = placeOrder ke liye tokens/sec aur bucket size
+    - modify_rate / modify_burst = modifyOrder ke liye tokens/sec aur bucket size
+    - idle_sleep                 = background thread kitna sleep kare jab kaam na ho
+    """
+
+    place_rate: float = 20.0
+    place_burst: int = 20
+    modify_rate: float = 20.0
+    modify_burst: int = 20
+    idle_sleep: float = 0.005
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Token Bucket
+# ---------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Classic token bucket:
+    - har second `rate` tokens refill hote hain (max `capacity`)
+    - ek call = ek token
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.last
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last = now
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """Token mila toh True, warna False (block nahi karta)."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Agle token ke liye kitne seconds rukna padega."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — Ek queued order job
+# ---------------------------------------------------------------------
+
+@dataclass
+class OrderJob:
+    """
+    kind     = "ENTRY" / "EXIT" / "SL_MODIFY" / "CANCEL"
+    endpoint = placeOrder / modifyOrder (kaunsa bucket use hoga)
+    kwargs   = OrderManager method ke arguments
+    callback = result aane par call hoga (optional)
+    trace    = latency_tracer.Trace (submit/ack stamps ke liye, optional)
+    """
+    kind: str
+    priority: int
+    endpoint: str
+    kwargs: Dict
+    callback: Optional[Callable] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: bool = False
+    trace: Optional[object] = None
+
+
+# ---------------------------------------------------------------------
+# STEP 5 — OrderScheduler
+# ---------------------------------------------------------------------
+
+class OrderScheduler:
+
+    def __init__(self, order_manager, config: Optional[SchedulerConfig] = None):
+        """
+        order_manager → OrderManager object (ya same interface wala)
+        config        → SchedulerConfig
+        """
+        self.om = order_manager
+        self.cfg = config or SchedulerConfig()
+
+        self.buckets: Dict[str, TokenBucket] = {
+            ENDPOINT_PLACE: TokenBucket(self.cfg.place_rate, self.cfg.place_burst),
+            ENDPOINT_MODIFY: TokenBucket(self.cfg.modify_rate, self.cfg.modify_burst),
+        }
+
+        self._heap: List[Tuple[int, int, OrderJob]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        # order_id → pending SL modify job (coalescing ke liye)
+        self._pending_sl: Dict[str, OrderJob] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Simple counters (debug / dashboard ke liye)
+        self.sent = 0
+        self.coalesced = 0
+
+        # Broker call latency (metrics.Histogram, label = job kind); None → off
+        self.latency = None
+
+    # -----------------------------------------------------------------
+    # STEP 6 — Submit functions (bot_core yahi call karega)
+    # -----------------------------------------------------------------
+
+    def submit_entry(self, symbol: str, qty: int,
+                     callback: Optional[Callable] = None,
+                     trace=None, token: Optional[str] = None) -> OrderJob:
+        """BUY entry queue karega (sabse kam priority). token → broker symboltoken."""
+        job = OrderJob("ENTRY", PRIORITY_ENTRY, ENDPOINT_PLACE,
+                       {"symbol": symbol, "qty": qty, "token": token}, callback,
+                       trace=trace)
+        self._push(job)
+        return job
+
+    def submit_exit(self, symbol: str, qty: int,
+                    callback: Optional[Callable] = None,
+                    trace=None, token: Optional[str] = None) -> OrderJob:
+        """SELL exit queue karega (sabse upar priority)."""
+        job = OrderJob("EXIT", PRIORITY_EXIT, ENDPOINT_PLACE,
+                       {"symbol": symbol, "qty": qty, "token": token}, callback,
+                       trace=trace)
+        self._push(job)
+        return job
+
+    def submit_sl_modify(self, order_id: str, symbol: str, new_sl: float, qty: int,
+                         callback: Optional[Callable] = None,
+                         token: Optional[str] = None) -> OrderJob:
+        """
+        SL modify queue karega.
+
+        Agar isi order_id ka SL modify pehle se queue me pada hai,
+        toh naya job nahi banega — purane job ka trigger price update hoga.
+        Queue me position same rehti hai.
+        """
+        with self._lock:
+            pending = self._pending_sl.get(order_id)
+            if pending is not None and not pending.cancelled:
+                pending.kwargs["new_sl"] = new_sl
+                pending.kwargs["qty"] = qty
+                if callback is not None:
+                    pending.callback = callback
+                self.coalesced += 1
+                return pending
+
+            job = OrderJob("SL_MODIFY", PRIORITY_SL_MODIFY, ENDPOINT_MODIFY,
+                           {"order_id": order_id, "symbol": symbol,
+                            "new_sl": new_sl, "qty": qty, "token": token}, callback)
+            self._pending_sl[order_id] = job
+            heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+        return job
+
+    def submit_cancel(self, order_id: str,
+                      callback: Optional[Callable] = None) -> OrderJob:
+        """
+        Resting order (SL) cancel queue karega — EXIT wali priority,
+        modifyOrder bucket. Isi order_id ka pending SL modify drop ho jaata hai.
+        """
+        with self._lock:
+            pending = self._pending_sl.pop(order_id, None)
+            if pending is not None:
+                pending.cancelled = True
+            job = OrderJob("CANCEL", PRIORITY_EXIT, ENDPOINT_MODIFY,
+                           {"order_id": order_id}, callback)
+            heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+        return job
+
+    def _push(self, job: OrderJob):
+        with self._lock:
+            heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+
+    def pending(self) -> int:
+        """Queue me kitne jobs pade hain."""
+        with self._lock:
+            return sum(1 for _, _, j in self._heap if not j.cancelled)
+
+    # -----------------------------------------------------------------
+    # STEP 7 — Dispatch
+    # -----------------------------------------------------------------
+
+    def pump(self) -> int:
+        """
+        Jitne jobs abhi token bucket allow kare utne bhej do.
+        Priority order follow hota hai; agar placeOrder bucket khaali hai
+        toh bhi modifyOrder wale jobs ja sakte hain.
+
+        Returns: kitne jobs dispatch hue
+        """
+        ready: List[OrderJob] = []
+        deferred: List[Tuple[int, int, OrderJob]] = []
+        now = time.monotonic()
+
+        with self._lock:
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                job = item[2]
+                if job.cancelled:
+                    continue
+                if self.buckets[job.endpoint].try_acquire(now):
+                    if job.kind == "SL_MODIFY":
+                        self._pending_sl.pop(job.kwargs["order_id"], None)
+                    ready.append(job)
+                else:
+                    deferred.append(item)
+            for item in deferred:
+                heapq.heappush(self._heap, item)
+
+        # Broker calls lock ke bahar (REST slow ho sakta hai)
+        for job in ready:
+            self._dispatch(job)
+
+        return len(ready)
+
+    def _dispatch(self, job: OrderJob):
+        kw = job.kwargs
+        if job.trace is not None:
+            job.trace.mark("submit")
+        t0 = time.perf_counter()
+        if job.kind == "ENTRY":
+            result = self.om.place_buy_order(kw["symbol"], kw["qty"], kw["token"])
+        elif job.kind == "EXIT":
+            result = self.om.place_exit_order(kw["symbol"], kw["qty"], kw["token"])
+        elif job.kind == "SL_MODIFY":
+            result = self.om.modify_sl_order(kw["order_id"], kw["symbol"],
+                                             kw["new_sl"], kw["qty"], kw["token"])
+        else:
+            result = self.om.cancel_order(kw["order_id"])
+        self.sent += 1
+        if self.latency is not None:
+            self.latency.labels(job.kind).observe(time.perf_counter() - t0)
+
+        if job.trace is not None:
+            job.trace.mark("ack")
+            job.trace.done("tick_to_ack")
+
+        if job.callback is not None:
+            try:
+                job.callback(job, result)
+            except Exception as e:
+                log.exception("Callback error: %s", e)
+
+    def next_wait(self) -> float:
+        """Agla job kab bhej sakte hain (seconds). Queue khaali → idle_sleep."""
+        with self._lock:
+            endpoints = {j.endpoint for _, _, j in self._heap if not j.cancelled}
+        if not endpoints:
+            return self.cfg.idle_sleep
+        return min(self.buckets[e].wait_time() for e in endpoints)
+
+    # -----------------------------------------------------------------
+    # STEP 8 — Background thread
+    # -----------------------------------------------------------------
+
+    def start(self):
+        """Background thread me pump loop start karega."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="order-scheduler",
+                                        daemon=True)
+        self._thread.start()
+        log.info("Started")
+
+    def stop(self):
+        """Loop band karega (pending jobs queue me hi rahenge)."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _loop(self):
+        while self._running:
+            if self.pump() == 0:
+                time.sleep(max(self.next_wait(), 0.001))
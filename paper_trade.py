@@ -0,0 +1,366 @@
+"""
+paper_trade.py
+
+Paper trading / simulated execution venue.
+
+BotConfig.paper_trade = True hone par bot_core real OrderManager ki jagah
+ye PaperOrderManager use karega. Interface same hai:
+- place_buy_order(symbol, qty)
+- place_exit_order(symbol, qty)
+- modify_sl_order(order_id, symbol, new_sl, qty)
+- get_order_status(order_id)
+
+Kaam:
+- Market orders ko live ya replay option price stream se fill karna
+- Configurable latency model (fixed + jitter)
+- Configurable slippage model (ticks + bps)
+- Fills, positions aur PnL track karna
+
+NOTE:
+- Orders on_price() ke through fill hote hain, isliye backtest me
+  replay loop bas on_price(symbol, ltp, ts) call karta rahe.
+- Hazaron orders/sec handle ho sake isliye pending orders ek heap me
+  (due time ke order me) rakhe jaate hain aur per-tick sirf heap ka
+  top check hota hai.
+- Clock hamesha epoch seconds: tick ka ts (replay / exchange time) ya
+  ts=None par time.time(). Pehle price se pehle aaye orders ki latency
+  pehle price ke time se gini jaati hai (replay ka purana ts ho ya live).
+- Thread-safe: sync mode me order scheduler thread place_* karta hai aur
+  WS thread on_price; pipeline mode me on_price event loop par aur orders
+  executor se — saari state ek lock ke peeche.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Paper Config (latency + slippage models)
+# ---------------------------------------------------------------------
+
+@dataclass
+class PaperConfig:
+    """
+    latency_ms        = order submit → exchange tak fixed delay
+                        (NOTE: bot exchange_timestamp ts deta hai jo whole
+                        seconds hai → 1s se chhoti latency asal me "agle
+                        second ka pehla tick" hai. Sub-second model ke liye
+                        on_price ts=None ke saath call karo → wall clock)
+    latency_jitter_ms = upar se random extra delay (0..jitter)
+    slippage_ticks    = har fill pe kitne tick against jayenge
+    slippage_bps      = price ka % (basis points) slippage, ticks ke upar
+    tick_size         = option tick size (NSE options = 0.05)
+    seed              = jitter ke liye random seed (replay reproducible rahe)
+    """
+
+    latency_ms: float = 50.0
+    latency_jitter_ms: float = 0.0
+    slippage_ticks: int = 1
+    slippage_bps: float = 0.0
+    tick_size: float = 0.05
+    seed: Optional[int] = None
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Order / Fill / Position records
+# ---------------------------------------------------------------------
+
+@dataclass
+class PaperOrder:
+    order_id: str
+    symbol: str
+    side: str                   # BUY / SELL
+    qty: int
+    submitted_at: float
+    due_at: float
+    order_type: str = "MARKET"  # MARKET / STOPLOSS
+    trigger_price: float = 0.0
+    status: str = "open"        # open / trigger pending / complete / cancelled
+    fill_price: float = 0.0
+    filled_at: float = 0.0
+
+
+@dataclass
+class PaperFill:
+    order_id: str
+    symbol: str
+    side: str
+    qty: int
+    price: float
+    ts: float
+
+
+@dataclass
+class PaperPosition:
+    symbol: str
+    qty: int = 0
+    avg_price: float = 0.0
+    realized: float = 0.0
+    last_price: float = 0.0
+
+    @property
+    def unrealized(self) -> float:
+        return (self.last_price - self.avg_price) * self.qty if self.qty else 0.0
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — PaperOrderManager
+# ---------------------------------------------------------------------
+
+class PaperOrderManager:
+
+    def __init__(self, config: Optional[PaperConfig] = None):
+        self.cfg = config or PaperConfig()
+        self._rng = random.Random(self.cfg.seed)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self.orders: Dict[str, PaperOrder] = {}
+        self.fills: List[PaperFill] = []
+        self.positions: Dict[str, PaperPosition] = {}
+        self.last_price: Dict[str, float] = {}
+        self.last_ts: float = 0.0
+        # Pehle on_price se pehle clock pata nahi → orders yahan, due_at
+        # sirf latency (relative); pehle price par rebase
+        self._clocked = False
+        self._early: List[PaperOrder] = []
+
+        # symbol → heap of (due_at, seq, order) for MARKET orders
+        self._pending: Dict[str, List[Tuple[float, int, PaperOrder]]] = {}
+        # symbol → {order_id: order} for STOPLOSS orders
+        self._stops: Dict[str, Dict[str, PaperOrder]] = {}
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Clock (epoch seconds: tick ka ts, warna wall clock)
+    # -----------------------------------------------------------------
+
+    def _now(self) -> float:
+        return self.last_ts if self.last_ts else time.time()
+
+    def _start_clock(self):
+        """Pehla price aaya → early orders ko is clock par rebase karo."""
+        self._clocked = True
+        now = self._now()
+        for o in self._early:
+            o.submitted_at = now
+            o.due_at += now
+        self._early.clear()
+        for symbol, heap in self._pending.items():
+            self._pending[symbol] = [(o.due_at, seq, o) for _, seq, o in heap]
+            heapq.heapify(self._pending[symbol])
+
+    def _latency(self) -> float:
+        lat = self.cfg.latency_ms
+        if self.cfg.latency_jitter_ms > 0:
+            lat += self._rng.random() * self.cfg.latency_jitter_ms
+        return lat / 1000.0
+
+    def _slipped(self, price: float, side: str) -> float:
+        slip = self.cfg.slippage_ticks * self.cfg.tick_size
+        slip += price * self.cfg.slippage_bps / 10000.0
+        px = price + slip if side == "BUY" else price - slip
+        # Tick size par round, aur price negative na ho
+        px = round(px / self.cfg.tick_size) * self.cfg.tick_size
+        return max(round(px, 2), self.cfg.tick_size)
+
+    # -----------------------------------------------------------------
+    # STEP 5 — OrderManager jaisa interface
+    # -----------------------------------------------------------------
+
+    def _submit(self, symbol: str, side: str, qty: int) -> str:
+        with self._lock:
+            now = self._now() if self._clocked else 0.0
+            order_id = f"PAPER-{next(self._ids)}"
+            order = PaperOrder(order_id, symbol, side, qty,
+                               submitted_at=now, due_at=now + self._latency())
+            self.orders[order_id] = order
+            if not self._clocked:
+                self._early.append(order)
+            heapq.heappush(self._pending.setdefault(symbol, []),
+                           (order.due_at, next(self._seq), order))
+            return order_id
+
+    def place_buy_order(self, symbol: str, qty: int,
+                        token: Optional[str] = None) -> Optional[str]:
+        """BUY market order queue karega, fill agle eligible price par."""
+        return self._submit(symbol, "BUY", qty)
+
+    def place_exit_order(self, symbol: str, qty: int,
+                         token: Optional[str] = None) -> Optional[str]:
+        """SELL market order queue karega."""
+        return self._submit(symbol, "SELL", qty)
+
+    def modify_sl_order(self, order_id: str, symbol: str, new_sl: float, qty: int,
+                        token: Optional[str] = None):
+        """
+        SL order create/modify karega.
+        LTP <= trigger hote hi ye SELL market ban jayega.
+        """
+        with self._lock:
+            book = self._stops.setdefault(symbol, {})
+            order = book.get(order_id)
+            if order is None:
+                now = self._now()
+                order = PaperOrder(order_id, symbol, "SELL", qty,
+                                   submitted_at=now, due_at=now,
+                                   order_type="STOPLOSS", status="trigger pending")
+                self.orders[order_id] = order
+                book[order_id] = order
+            order.trigger_price = new_sl
+            order.qty = qty
+        return {"status": True, "data": {"orderid": order_id}}
+
+    def cancel_order(self, order_id: str) -> bool:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order.status == "complete":
+                return False
+            order.status = "cancelled"
+            self._stops.get(order.symbol, {}).pop(order_id, None)
+            return True
+
+    def get_order_status(self, order_id: str):
+        """Angel orderBook jaisa dict return karta hai."""
+        o = self.orders.get(order_id)
+        if o is None:
+            return None
+        return {
+            "orderid": o.order_id,
+            "tradingsymbol": o.symbol,
+            "transactiontype": o.side,
+            "ordertype": o.order_type,
+            "quantity": o.qty,
+            "status": o.status,
+            "averageprice": o.fill_price,
+            "filledshares": o.qty if o.status == "complete" else 0,
+            "triggerprice": o.trigger_price,
+        }
+
+    def get_option_ltp(self, symbol: str) -> float:
+        """Simulator ke paas jo last price hai (0.0 agar abhi tak tick nahi aaya)."""
+        return self.last_price.get(symbol, 0.0)
+
+    # -----------------------------------------------------------------
+    # STEP 6 — Price stream (live ya replay) → matching
+    # -----------------------------------------------------------------
+
+    def on_price(self, symbol: str, ltp: float, ts: Optional[float] = None) -> int:
+        """
+        Har option tick par call karo.
+
+        ts → tick ka epoch seconds (replay / exchange time); None → wall clock.
+        Returns: is tick par kitne orders fill hue
+        """
+        with self._lock:
+            return self._match(symbol, ltp, ts)
+
+    def _match(self, symbol: str, ltp: float, ts: Optional[float]) -> int:
+        self.last_ts = ts if ts is not None else 0.0
+        if not self._clocked:
+            self._start_clock()
+        now = self._now()
+        self.last_price[symbol] = ltp
+
+        pos = self.positions.get(symbol)
+        if pos is not None:
+            pos.last_price = ltp
+
+        filled = 0
+
+        # 1) Stop orders trigger check
+        stops = self._stops.get(symbol)
+        if stops:
+            for oid in [oid for oid, o in stops.items() if ltp <= o.trigger_price]:
+                o = stops.pop(oid)
+                o.status = "open"
+                o.order_type = "MARKET"
+                o.due_at = now + self._latency()
+                heapq.heappush(self._pending.setdefault(symbol, []),
+                               (o.due_at, next(self._seq), o))
+
+        # 2) Jinka latency pura ho gaya unhe is price par fill karo
+        heap = self._pending.get(symbol)
+        while heap and heap[0][0] <= now:
+            o = heapq.heappop(heap)[2]
+            if o.status == "cancelled":
+                continue
+            self._fill(o, ltp, now)
+            filled += 1
+
+        return filled
+
+    def _fill(self, o: PaperOrder, ltp: float, now: float):
+        px = self._slipped(ltp, o.side)
+        o.status = "complete"
+        o.fill_price = px
+        o.filled_at = now
+        self.fills.append(PaperFill(o.order_id, o.symbol, o.side, o.qty, px, now))
+
+        pos = self.positions.get(o.symbol)
+        if pos is None:
+            pos = self.positions[o.symbol] = PaperPosition(o.symbol, last_price=ltp)
+
+        signed = o.qty if o.side == "BUY" else -o.qty
+        if pos.qty == 0 or (pos.qty > 0) == (signed > 0):
+            # Naya / same direction add → avg price update
+            total = pos.qty + signed
+            pos.avg_price = (pos.avg_price * abs(pos.qty) + px * abs(signed)) / abs(total)
+            pos.qty = total
+            return
+
+        # Opposite side → (partial) close
+        closing = min(abs(signed), abs(pos.qty))
+        direction = 1 if pos.qty > 0 else -1
+        pos.realized += (px - pos.avg_price) * closing * direction
+        pos.qty += signed
+        if pos.qty == 0:
+            pos.avg_price = 0.0
+        elif (pos.qty > 0) != (direction > 0):
+            # Flip ho gaya → bacha hua qty naye price par
+            pos.avg_price = px
+
+    # -----------------------------------------------------------------
+    # STEP 7 — PnL summary
+    # -----------------------------------------------------------------
+
+    def realized_pnl(self) -> float:
+        return sum(p.realized for p in self.positions.values())
+
+    def unrealized_pnl(self) -> float:
+        return sum(p.unrealized for p in self.positions.values())
+
+    def summary(self) -> Dict:
+        return {
+            "orders": len(self.orders),
+            "fills": len(self.fills),
+            "open_positions": sum(1 for p in self.positions.values() if p.qty),
+            "realized": round(self.realized_pnl(), 2),
+            "unrealized": round(self.unrealized_pnl(), 2),
+        }
+
+
+# ---------------------------------------------------------------------
+# Local Test
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    paper = PaperOrderManager(PaperConfig(latency_ms=0, slippage_ticks=0))
+
+    n = 100000
+    t0 = time.perf_counter()
+    for i in range(n):
+        paper.place_buy_order("NIFTY25900CE", 50)
+        paper.on_price("NIFTY25900CE", 100.0 + (i % 10), ts=1700000000 + i)
+        paper.place_exit_order("NIFTY25900CE", 50)
+        paper.on_price("NIFTY25900CE", 101.0 + (i % 10), ts=1700000000 + i)
+    dt = time.perf_counter() - t0
+
+    print("Summary:", paper.summary())
+    print(f"{2 * n / dt:,.0f} simulated orders/sec")
@@ -12,10 +12,13 @@ System:
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal, Optional
 
+log = logging.getLogger(__name__)
+
 
 # -------------------------------------------------------------------------
 # STEP 1 — Ek Single Position ka Data
@@ -71,9 +74,12 @@ class RiskManagerConfig:
 
 class RiskManager:
 
-    def __init__(self, config: Optional[RiskManagerConfig] = None):
+    def __init__(self, config: Optional[RiskManagerConfig] = None, journal=None):
         self.cfg = config or RiskManagerConfig()
 
+        # Optional StateJournal (state_journal.py) — crash recovery ke liye
+        self.journal = journal
+
         # Daily PnL tracking
         self.daily_realized = 0.0
         self.daily_unrealized = 0.0
@@ -97,11 +103,11 @@ class RiskManager:
             return False  # ek time pe ek hi trade
 
         if self.daily_realized <= -self.cfg.max_daily_loss:
-            print("Daily loss limit hit.")
+            log.warning("Daily loss limit hit.")
             return False
 
         if self.daily_realized >= self.cfg.max_daily_profit:
-            print("Daily profit target hit.")
+            log.info("Daily profit target hit.")
             return False
 
         return True
@@ -131,7 +137,10 @@ class RiskManager:
             open_time=datetime.now()
         )
 
-        print(f"[RiskManager] New Position Created → Entry={entry_price}, SL={sl}, TP={tp}")
+        if self.journal is not None:
+            self.journal.record_open(self.position)
+
+        log.info("New Position Created → Entry=%s, SL=%s, TP=%s", entry_price, sl, tp)
         return self.position
 
 
@@ -180,12 +189,17 @@ class RiskManager:
         profit = ltp - self.position.entry_price
         base = self.position.entry_price
 
+        old_sl = self.position.sl_price
+
         for step in self.cfg.trail_steps:
             if profit >= step:
                 new_sl = base + (step - 20)
                 if new_sl > self.position.sl_price:
                     self.position.sl_price = new_sl
-                    print(f"[Trail SL] Step {step} → SL updated to {new_sl}")
+                    log.info("Trail SL step %s → SL updated to %s", step, new_sl)
+
+        if self.journal is not None and self.position.sl_price != old_sl:
+            self.journal.record_sl(self.position.sl_price)
 
 
     # -----------------------------------------------------
@@ -205,7 +219,10 @@ class RiskManager:
         self.daily_realized += pnl
         self.position.is_open = False
 
-        print(f"[RiskManager] Position Closed @ {exit_price}, PnL = {pnl}")
-        print(f"[Daily Realized] = {self.daily_realized}")
+        if self.journal is not None:
+            self.journal.record_close(exit_price, pnl, self.daily_realized)
+
+        log.info("Position Closed @ %s, PnL = %s | Daily Realized = %s",
+                 exit_price, pnl, self.daily_realized)
 
         return pnl
@@ -17,7 +17,7 @@ aur output dena: CE / PE / No Trade
 
 from __future__ import annotations   # future type hints use karne ke liye
 
-from dataclasses import dataclass     # simple data structure banane ke liye
+from dataclasses import dataclass, field   # simple data structure banane ke liye
 from datetime import datetime, time
 from typing import List, Optional, Literal
 
@@ -61,12 +61,18 @@ class MarketContext:
 
     - symbol → “NIFTY”
     - candles → latest candles list (OHLCV)
-    - ce_oi  → CE ka OI series (list of ints)
+    - ce_oi  → CE ka OI series (list of ints; backfilled candle → None)
     - pe_oi  → PE ka OI series
     - rsi    → underlying ka RSI value
     - now    → current time (for time filter)
     - timeframe_minutes → candle timeframe (3min/5min etc.)
 
+    Option chain (option_chain.py) attach ho to ye bhi:
+    - pcr           → PCR series (per candle)
+    - oi_support    → PE OI weighted strike
+    - oi_resistance → CE OI weighted strike
+    - max_pain      → max pain strike
+
     NOTE:
     Ye context data_feed_handler.py generate karega.
     """
@@ -77,6 +83,10 @@ class MarketContext:
     rsi: float
     now: datetime
     timeframe_minutes: int = 5
+    pcr: List[float] = field(default_factory=list)
+    oi_support: Optional[float] = None
+    oi_resistance: Optional[float] = None
+    max_pain: Optional[int] = None
 
 
 # -------------------------------------------------------------------------
@@ -280,6 +290,8 @@ def _rule_oi_trend(ctx: MarketContext, cfg: RuleConfig,
         return False
 
     oi_recent = series[-(cfg.oi_lookback + 1):]
+    if oi_recent[0] is None or oi_recent[-1] is None:
+        return False                # backfilled candle, OI pata nahi
     oi_change = _pct_change(oi_recent[0], oi_recent[-1])
 
     # Final logic:
@@ -0,0 +1,317 @@
+"""
+session_manager.py
+
+Broker session cache (access / feed token) — har restart par TOTP login nahi.
+
+Problem:
+    MStockClient.login, get_token.py, ltp_test.py → har start par TOTP +
+    full login round trip. Morning crash ke baad ye hi sabse slow step hai,
+    aur baar-baar login karne se broker rate-limit / OTP lock bhi ho sakta hai.
+
+Ye manager:
+- Session (access_token, feed_token, refresh_token, expires_at) disk par
+  rakhta hai: state/session_<key>.json, file mode 0600, dir 0700,
+  atomic write (tmp + os.replace)
+- Restart par valid session mile to seedha reuse (koi network call nahi)
+- Background thread expiry se `refresh_margin` pehle refresh karta hai
+  (refresh_fn ho to refresh token se, warna fresh login)
+- Ek hi Session REST aur WS dono use karte hain; refresh par listeners
+  ko naya session milta hai (e.g. WS url_factory agle connect par naya token)
+
+Expiry:
+- Token JWT ho to uska "exp" claim
+- Warna agli raat `expire_hour` (broker tokens daily expire hote hain)
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Session Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class SessionConfig:
+    """
+    base_dir        = session file ka folder (state_journal ke saath)
+    refresh_margin  = expiry se kitne sec pehle refresh kare
+    min_valid       = itne sec se kam bacha ho to cached session reuse mat karo
+    expire_hour     = JWT exp na mile to agle din is ghante expire maano
+    retry_delay     = refresh fail hone par dobara try (sec); har refresh ke
+                      baad bhi kam se kam itna wait (login hammer / OTP lock nahi)
+    """
+
+    base_dir: str = "state"
+    refresh_margin: float = 30 * 60
+    min_valid: float = 5 * 60
+    expire_hour: int = 5
+    retry_delay: float = 60.0
+
+
+@dataclass
+class Session:
+    access_token: str
+    feed_token: str = ""
+    refresh_token: str = ""
+    expires_at: float = 0.0          # epoch seconds
+    created_at: float = field(default_factory=time.time)
+
+    def seconds_left(self, now: Optional[float] = None) -> float:
+        return self.expires_at - (now if now is not None else time.time())
+
+    def is_valid(self, margin: float = 0.0, now: Optional[float] = None) -> bool:
+        return bool(self.access_token) and self.seconds_left(now) > margin
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """JWT payload ka "exp" (bina signature verify kiye). Nahi mila → None."""
+    if not token:
+        return None
+    if token.startswith("Bearer "):
+        token = token[7:]
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (ValueError, TypeError):
+        return None
+    return float(exp) if exp else None
+
+
+def default_expiry(cfg: SessionConfig, now: Optional[datetime] = None) -> float:
+    """Agle `expire_hour` baje (local) ka epoch."""
+    now = now or datetime.now()
+    exp = now.replace(hour=cfg.expire_hour, minute=0, second=0, microsecond=0)
+    if exp <= now:
+        exp += timedelta(days=1)
+    return exp.timestamp()
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Secure file store
+# ---------------------------------------------------------------------
+
+class SessionStore:
+    """
+    Ek session file per account. Tokens plain JSON me hain, isliye
+    permission hi security hai: file 0600, folder 0700.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Session]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return Session(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            log.warning("Session file corrupt, ignoring: %s", e)
+            return None
+
+    def save(self, session: Session):
+        folder = os.path.dirname(self.path) or "."
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        tmp = self.path + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(session), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — SessionManager
+# ---------------------------------------------------------------------
+
+class SessionManager:
+
+    def __init__(self, login_fn: Callable[[], Session], account: str,
+                 refresh_fn: Optional[Callable[[Session], Session]] = None,
+                 config: Optional[SessionConfig] = None):
+        """
+        login_fn   → full login (TOTP) → Session
+        account    → client id / api key (file name ka hash isi se banta hai)
+        refresh_fn → (old session) → new Session, bina TOTP (optional)
+        """
+        self.login_fn = login_fn
+        self.refresh_fn = refresh_fn
+        self.cfg = config or SessionConfig()
+
+        key = hashlib.sha256(account.encode("utf-8")).hexdigest()[:16]
+        self.store = SessionStore(os.path.join(self.cfg.base_dir, f"session_{key}.json"))
+
+        self.session: Optional[Session] = None
+        self.logins = 0
+        self.refreshes = 0
+        self._listeners: List[Callable[[Session], None]] = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def on_refresh(self, fn: Callable[[Session], None]):
+        """Naya session aane par fn(session) call hoga (REST / WS clients)."""
+        self._listeners.append(fn)
+
+    def _fill_expiry(self, s: Session) -> Session:
+        if not s.expires_at:
+            s.expires_at = jwt_expiry(s.access_token) or default_expiry(self.cfg)
+        return s
+
+    def _publish(self, s: Session):
+        self.session = s
+        self.store.save(s)
+        self._notify(s)
+
+    def _notify(self, s: Session):
+        for fn in self._listeners:
+            try:
+                fn(s)
+            except Exception as e:
+                log.exception("Session listener failed: %s", e)
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Get / login / refresh
+    # -----------------------------------------------------------------
+
+    def get(self) -> Session:
+        """Valid session: memory → disk → login (isi order me)."""
+        with self._lock:
+            s = self.session
+            if s is not None and s.is_valid(self.cfg.min_valid):
+                return s
+
+            s = self.store.load()
+            if s is not None and s.is_valid(self.cfg.min_valid):
+                log.info("🔑 Cached session reused (%.0f min left)", s.seconds_left() / 60)
+                self.session = s
+                self._notify(s)
+                return s
+
+            return self.login()
+
+    def login(self) -> Session:
+        with self._lock:
+            s = self._fill_expiry(self.login_fn())
+            self.logins += 1
+            log.info("🔑 Fresh login, session valid till %s",
+                     datetime.fromtimestamp(s.expires_at).strftime("%Y-%m-%d %H:%M"))
+            self._publish(s)
+            return s
+
+    def refresh(self) -> Session:
+        """Refresh token se naya session; fail ho to full login."""
+        with self._lock:
+            old = self.session
+            if self.refresh_fn is not None and old is not None and old.refresh_token:
+                try:
+                    s = self._fill_expiry(self.refresh_fn(old))
+                    self.refreshes += 1
+                    log.info("🔑 Session refreshed")
+                    self._publish(s)
+                    return s
+                except Exception as e:
+                    log.warning("Token refresh failed, falling back to login: %s", e)
+            return self.login()
+
+    def invalidate(self):
+        """Broker ne token reject kiya (401) → cache hatao, agla get() login karega."""
+        with self._lock:
+            self.session = None
+            self.store.clear()
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Background refresher
+    # -----------------------------------------------------------------
+
+    def start_refresher(self):
+        if self._refresher is not None:
+            return
+
+        def _loop():
+            while not self._stop.is_set():
+                s = self.session
+                wait = (s.seconds_left() - self.cfg.refresh_margin) if s else 0.0
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+                try:
+                    s = self.refresh()
+                    if s.seconds_left() <= self.cfg.refresh_margin:
+                        log.warning("New session expires in %.0fs (< refresh_margin)",
+                                    s.seconds_left())
+                except Exception as e:
+                    log.error("Session refresh failed: %s", e)
+                # Success ho ya fail, agla attempt kam se kam retry_delay baad —
+                # naya session bhi margin ke andar expire ho (04:30-05:00 start,
+                # short-lived JWT) to bina delay login loop nahi
+                self._stop.wait(self.cfg.retry_delay)
+
+        self._refresher = threading.Thread(target=_loop, name="session-refresh",
+                                           daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# ---------------------------------------------------------------------
+# STEP 6 — SmartAPI adapter (get_token.py / ltp_test.py)
+# ---------------------------------------------------------------------
+
+def _apply_smartapi(api, s: Session):
+    api.setAccessToken(s.access_token)
+    api.setRefreshToken(s.refresh_token)
+    api.setFeedToken(s.feed_token)
+
+
+def smartapi_session(api_key: str, client_code: str, pin: str, totp_secret: str,
+                     config: Optional[SessionConfig] = None):
+    """
+    Logged-in SmartConnect + uska SessionManager.
+    Valid cached session ho to generateSession call hi nahi hota.
+    """
+    from SmartApi import SmartConnect   # lazy (cold start)
+
+    api = SmartConnect(api_key=api_key)
+    api.setUserId(client_code)
+
+    def _login() -> Session:
+        import pyotp
+        data = api.generateSession(client_code, pin, pyotp.TOTP(totp_secret).now())["data"]
+        return Session(access_token=data["jwtToken"], feed_token=data["feedToken"],
+                       refresh_token=data["refreshToken"])
+
+    def _refresh(old: Session) -> Session:
+        data = api.generateToken(old.refresh_token)["data"]
+        return Session(access_token=data["jwtToken"], feed_token=data["feedToken"],
+                       refresh_token=data["refreshToken"])
+
+    mgr = SessionManager(_login, account=f"{api_key}:{client_code}",
+                         refresh_fn=_refresh, config=config)
+    mgr.on_refresh(lambda s: _apply_smartapi(api, s))
+    mgr.get()
+    return api, mgr
@@ -0,0 +1,286 @@
+"""
+shm_ring.py
+
+Lock-free single-producer / single-consumer ring buffer
+(multiprocessing.shared_memory) — fixed-layout records.
+
+Layout (ek SharedMemory block):
+    [0:8)     head  (u64) → producer ne kitne records likhe (monotonic)
+    [64:72)   tail  (u64) → consumer ne kitne padhe (monotonic)
+    [128: ]   capacity × record_size slots
+
+- Sirf producer head likhta hai, sirf consumer tail → koi lock nahi
+- Producer pehle slot likhta hai, phir head publish karta hai. head / tail
+  memoryview.cast("Q") se ek aligned 8-byte store me likhe jaate hain
+  (struct "<Q" byte-by-byte likhta hai → doosra process adhoora counter
+  padh sakta hai); x86 store order maintain karta hai → consumer ko
+  adhoora record nahi dikhta
+- head / tail alag cache lines par (false sharing nahi)
+- capacity power of 2 → slot = counter & mask
+
+Records struct.Struct format se define hote hain (TICK_RECORD, ORDER_RECORD ...),
+isliye har message fixed size ka hai, pickle / allocation nahi.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+_HEAD = 0           # u64 index (byte offset 0)
+_TAIL = 8           # u64 index (byte offset 64)
+_HEADER = 128
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Record layouts
+# ---------------------------------------------------------------------
+
+# Symbol field: sabse lamba NFO option symbol (MIDCPNIFTY30DEC2512500CE = 24
+# bytes, Angel / mStock format) + headroom. pack_str lambe symbol ko truncate
+# nahi karta (do strikes ek symbol ban kar galat route hote) → ValueError.
+SYMBOL_LEN = 32
+ID_LEN = 24             # local / broker order id, symboltoken
+
+# feed → strategy: symbol, ltp, volume, oi, exchange_ts, exchange_seq, recv_ns, seq
+# (exchange_seq -1 → frame me nahi; seq = ring transport ka apna counter)
+TICK_RECORD = struct.Struct(f"<{SYMBOL_LEN}sdddqqQQ")
+
+# strategy → execution: kind, symbol, local_id, ref_id, qty, price, ns
+ORDER_RECORD = struct.Struct(f"<B{SYMBOL_LEN}s{ID_LEN}s{ID_LEN}sidQ")
+
+# execution → strategy: kind, symbol, local_id, broker_id, ok, ns
+ACK_RECORD = struct.Struct(f"<B{SYMBOL_LEN}s{ID_LEN}s{ID_LEN}s?Q")
+
+# strategy → feed: kind, exchange, symbol
+CONTROL_RECORD = struct.Struct(f"<B8s{SYMBOL_LEN}s")
+
+KIND_ENTRY = 1
+KIND_EXIT = 2
+KIND_SL_MODIFY = 3
+KIND_CANCEL = 4
+KIND_PRICE = 5          # paper venue ke liye option LTP
+KIND_SUBSCRIBE = 10
+KIND_UNSUBSCRIBE = 11
+KIND_STOP = 255
+
+_NAN = float("nan")
+
+
+def pack_str(s: Optional[str], size: int = SYMBOL_LEN) -> bytes:
+    """
+    str → record field bytes. struct "Ns" chup-chaap truncate karta hai,
+    isliye field se lamba → ValueError (caller drop + count kare).
+    """
+    b = (s or "").encode("utf-8")
+    if len(b) > size:
+        raise ValueError(f"{s!r} is {len(b)} bytes, record field holds {size}")
+    return b
+
+
+def unpack_str(b: bytes) -> str:
+    return b.rstrip(b"\x00").decode("utf-8")
+
+
+def pack_opt(v) -> float:
+    """Optional number (tick volume / OI) → double; None → NaN."""
+    return _NAN if v is None else float(v)
+
+
+def unpack_opt(x: float) -> Optional[float]:
+    return None if x != x else x
+
+
+def pack_seq(v) -> int:
+    """Optional exchange sequence → int64; None → -1."""
+    return -1 if v is None else int(v)
+
+
+def unpack_seq(x: int) -> Optional[int]:
+    return None if x < 0 else x
+
+
+def _open_shm(name: Optional[str], create: bool, size: int,
+              foreign: bool = False) -> shared_memory.SharedMemory:
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        # 3.13+: attach karne wala track na kare (unlink sirf creator karega)
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        # <3.13: multiprocessing children parent ka hi resource_tracker
+        # share karte hain → duplicate register harmless hai
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        if foreign:
+            # Alag process tree (tick_bus subscriber) ka apna tracker hai →
+            # exit par wo creator ka block unlink kar dega, isliye hatao
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — SpscRing
+# ---------------------------------------------------------------------
+
+class SpscRing:
+
+    def __init__(self, record: struct.Struct, capacity: int,
+                 name: Optional[str] = None, create: bool = True,
+                 foreign: bool = False):
+        """
+        create=True  → naya block (parent process)
+        create=False → existing `name` se attach (child process)
+        foreign=True → attacher creator ka child nahi (tick_bus subscriber)
+        """
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of 2")
+        self.record = record
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.rsize = record.size
+        size = _HEADER + capacity * record.size
+        self.shm = _open_shm(name, create, size, foreign)
+        self.buf = self.shm.buf
+        self._hdr = self.buf[:_HEADER]
+        self._ctr = self._hdr.cast("Q")              # [head, ..., tail, ...]
+        if create:
+            self._ctr[_HEAD] = 0
+            self._ctr[_TAIL] = 0
+        # Local caches: apna counter kabhi dobara padhna nahi padta
+        self._head = self._ctr[_HEAD]
+        self._tail = self._ctr[_TAIL]
+        self.full_events = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def spec(self) -> Tuple[str, int]:
+        """Child process ko attach karne ke liye (name, capacity)."""
+        return self.shm.name, self.capacity
+
+    # -----------------------------------------------------------------
+    # Producer side
+    # -----------------------------------------------------------------
+
+    def push(self, *fields) -> bool:
+        """Non-blocking. Ring full → False (caller decide kare: drop / wait)."""
+        head = self._head
+        tail = self._ctr[_TAIL]
+        if head - tail >= self.capacity:
+            self.full_events += 1
+            return False
+        self.record.pack_into(self.buf, _HEADER + (head & self.mask) * self.rsize, *fields)
+        head += 1
+        self._ctr[_HEAD] = head                        # publish
+        self._head = head
+        return True
+
+    def push_wait(self, *fields, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        spins = 0
+        while not self.push(*fields):
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            spins += 1
+            time.sleep(0 if spins < 100 else 0.0005)
+        return True
+
+    # -----------------------------------------------------------------
+    # Consumer side
+    # -----------------------------------------------------------------
+
+    def pop(self) -> Optional[tuple]:
+        tail = self._tail
+        head = self._ctr[_HEAD]
+        if tail == head:
+            return None
+        rec = self.record.unpack_from(self.buf, _HEADER + (tail & self.mask) * self.rsize)
+        tail += 1
+        self._ctr[_TAIL] = tail                        # slot free
+        self._tail = tail
+        return rec
+
+    def pop_wait(self, timeout: Optional[float] = None) -> Optional[tuple]:
+        """Spin → yield → short sleep backoff (idle par CPU nahi jalata)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        spins = 0
+        while True:
+            rec = self.pop()
+            if rec is not None:
+                return rec
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            spins += 1
+            if spins < 64:
+                continue
+            time.sleep(0 if spins < 256 else 0.0005)
+
+    def depth(self) -> int:
+        return self._ctr[_HEAD] - self._ctr[_TAIL]
+
+    # -----------------------------------------------------------------
+    # Cleanup
+    # -----------------------------------------------------------------
+
+    def close(self):
+        self._ctr.release()
+        self._hdr.release()
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        """Sirf creator (parent) call kare."""
+        self.shm.unlink()
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Tick reader (consumer side decode)
+# ---------------------------------------------------------------------
+
+class TickReader:
+    """
+    TICK_RECORD ring → tick dict (ws_decoder jaisa format, reused dict).
+    multiproc strategy aur tick_bus subscriber dono yahi use karte hain.
+
+    - seq gap → gaps / missed count (producer drop par bhi seq badhata hai)
+    - seq=0 → end of feed → self.closed
+    """
+
+    def __init__(self, ring: SpscRing):
+        self.ring = ring
+        self._tick = {"symbol": None, "token": None, "last_traded_price": 0.0,
+                      "volume": 0, "oi": 0, "exchange_timestamp": 0,
+                      "timestamp": 0, "seq": None}
+        self.last_seq = 0
+        self.last_recv_ns = 0
+        self.gaps = 0
+        self.missed = 0
+        self.received = 0
+        self.closed = False
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Agla tick (reused dict) ya None (timeout / feed band → self.closed)."""
+        rec = self.ring.pop_wait(timeout)
+        if rec is None:
+            return None
+        symbol, ltp, volume, oi, ts, xseq, recv_ns, seq = rec
+        if seq == 0:
+            self.closed = True
+            return None
+        if seq != self.last_seq + 1:
+            self.gaps += 1
+            self.missed += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.last_recv_ns = recv_ns
+        self.received += 1
+        tick = self._tick
+        tick["symbol"] = tick["token"] = unpack_str(symbol)
+        tick["last_traded_price"] = ltp
+        tick["volume"] = unpack_opt(volume)
+        tick["oi"] = unpack_opt(oi)
+        tick["exchange_timestamp"] = tick["timestamp"] = ts
+        tick["seq"] = unpack_seq(xseq)
+        return tick
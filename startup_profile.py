@@ -0,0 +1,119 @@
+"""
+startup_profile.py
+
+Cold start profile — morning crash ke baad bot kitni jaldi subscribe-ready hota hai.
+
+Kya report hota hai:
+- Fresh interpreter me `import bot_core` ka wall time
+- `python -X importtime` se sabse mehenge modules (cumulative µs)
+- Heavy broker / UI libs (SmartApi, websocket, pyotp, rich) import time par
+  load hue ya nahi — ye lazy rehne chahiye
+- OptionBot(...) construct time (journal recover + metrics) → "READY"
+
+Usage:
+    python startup_profile.py             # report
+    python startup_profile.py --top 25    # zyada modules dikhao
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ("SmartApi", "websocket", "pyotp", "rich", "http.server")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Fresh interpreter runs
+# ---------------------------------------------------------------------
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=_HERE,
+                          capture_output=True, text=True)
+
+
+def import_wall_ms(module: str = "bot_core", runs: int = 5) -> float:
+    """Fresh process me import ka best-of-N wall time (ms)."""
+    code = ("import time; t=time.perf_counter(); import {m}; "
+            "print((time.perf_counter()-t)*1000)").format(m=module)
+    best = float("inf")
+    for _ in range(runs):
+        res = _run(code)
+        if res.returncode != 0:
+            raise RuntimeError(res.stderr.strip().splitlines()[-1])
+        best = min(best, float(res.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def import_times(module: str = "bot_core") -> List[Tuple[int, int, str]]:
+    """`-X importtime` output parse → [(self_us, cumulative_us, name)]."""
+    res = _run(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cum_us), name.rstrip()))
+    return rows
+
+
+def loaded_heavy(module: str = "bot_core") -> Dict[str, bool]:
+    """Import ke baad kaun se heavy modules sys.modules me aa gaye."""
+    code = ("import sys, {m}; print(','.join(sorted(sys.modules)))").format(m=module)
+    res = _run(code)
+    mods = set(res.stdout.strip().split(","))
+    return {h: any(m == h or m.startswith(h + ".") for m in mods)
+            for h in HEAVY_MODULES}
+
+
+def ready_ms() -> float:
+    """Paper mode OptionBot construct time (temp dir me, asli state nahi chhedta)."""
+    code = (
+        "import os, sys, time; sys.path.insert(0, {here!r}); os.chdir({tmp!r}); "
+        "import logging; logging.disable(logging.INFO); "
+        "from bot_core import OptionBot, BotConfig; "
+        "t=time.perf_counter(); OptionBot(None, BotConfig()); "
+        "print((time.perf_counter()-t)*1000)"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        res = _run(code.format(here=_HERE, tmp=tmp))
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1])
+    return float(res.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Report
+# ---------------------------------------------------------------------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Cold start profile for bot_core")
+    ap.add_argument("--module", default="bot_core")
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args(argv)
+
+    print(f"import {args.module}: {import_wall_ms(args.module):.1f} ms (best of 5)")
+    if args.module == "bot_core":
+        print(f"OptionBot ready   : {ready_ms():.1f} ms")
+
+    print("\nHeavy deps loaded at import:")
+    heavy = loaded_heavy(args.module)
+    for name, loaded in heavy.items():
+        print(f"  {name:<12} {'YES ⚠️' if loaded else 'no'}")
+
+    rows = sorted(import_times(args.module), key=lambda r: r[1], reverse=True)
+    print(f"\n{'cumulative µs':>14}{'self µs':>10}  module")
+    for self_us, cum_us, name in rows[:args.top]:
+        print(f"{cum_us:>14,}{self_us:>10,}  {name}")
+
+    return 1 if any(heavy.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+state_journal.py
+
+Write-ahead journal for risk state.
+
+Problem:
+- RiskManager.daily_realized aur open PositionState sirf memory me hain.
+- Crash / restart hua toh daily loss limit reset ho jaati hai aur
+  open position ka SL bhi bhool jaate hain.
+
+Solution:
+- Har position / PnL event ek append-only file me likho (1 line JSON)
+- fsync batch me hota hai (har N events ya T seconds), taaki
+  har tick par disk wait na ho; quiet period me bhi T seconds ke andar
+  flush timer last event (e.g. SL ratchet) sync kar deta hai
+- Har K events ke baad compact snapshot likho aur journal truncate karo
+- Restart par: snapshot load + uske baad ke events replay →
+  exact same RiskManager state, first tick se pehle
+
+Files (default):
+    state/YYYY-MM-DD/journal.log
+    state/YYYY-MM-DD/snapshot.json
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from risk_manager import PositionState
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Journal Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class JournalConfig:
+    """
+    base_dir       = state files ka root folder (per-day subfolder banega)
+    fsync_every    = itne events ke baad fsync
+    fsync_interval = ya itne seconds ke baad (jo pehle ho)
+    sync_on_close  = position close (PnL) par turant fsync — daily limit safe rahe
+    snapshot_every = itne events ke baad snapshot + journal compact
+    """
+
+    base_dir: str = "state"
+    fsync_every: int = 32
+    fsync_interval: float = 0.5
+    sync_on_close: bool = True
+    snapshot_every: int = 500
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Position <-> dict helpers
+# ---------------------------------------------------------------------
+
+def _position_to_dict(p: PositionState) -> Dict:
+    return {
+        "symbol": p.symbol,
+        "direction": p.direction,
+        "entry_price": p.entry_price,
+        "qty": p.qty,
+        "sl_price": p.sl_price,
+        "target_price": p.target_price,
+        "open_time": p.open_time.isoformat(),
+        "is_open": p.is_open,
+    }
+
+
+def _position_from_dict(d: Dict) -> PositionState:
+    return PositionState(
+        symbol=d["symbol"],
+        direction=d["direction"],
+        entry_price=d["entry_price"],
+        qty=d["qty"],
+        sl_price=d["sl_price"],
+        target_price=d["target_price"],
+        open_time=datetime.fromisoformat(d["open_time"]),
+        is_open=d["is_open"],
+    )
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — StateJournal
+# ---------------------------------------------------------------------
+
+class StateJournal:
+
+    def __init__(self, config: Optional[JournalConfig] = None,
+                 session_day: Optional[date] = None):
+        self.cfg = config or JournalConfig()
+        day = session_day or date.today()
+
+        self.dir = os.path.join(self.cfg.base_dir, day.isoformat())
+        os.makedirs(self.dir, exist_ok=True)
+        self.journal_path = os.path.join(self.dir, "journal.log")
+        self.snapshot_path = os.path.join(self.dir, "snapshot.json")
+
+        # In-memory mirror of journaled state (snapshot isi se banta hai)
+        self.seq = 0
+        self.daily_realized = 0.0
+        self.position: Optional[Dict] = None
+
+        self._fh = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+        # Append / sync / timer flush teeno isi lock me (timer alag thread)
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Recovery (bot start par, first tick se pehle)
+    # -----------------------------------------------------------------
+
+    def recover(self, risk_manager=None) -> int:
+        """
+        Snapshot + journal replay karke state rebuild karta hai.
+        risk_manager diya ho toh uska daily_realized aur position set hota hai.
+
+        Returns: kitne journal events replay hue
+        """
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            self.seq = snap["seq"]
+            self.daily_realized = snap["daily_realized"]
+            self.position = snap["position"]
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            good_offset = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        # Crash ke time adhi likhi last line → yahin tak valid
+                        break
+                    good_offset += len(line)
+                    if ev["seq"] <= self.seq:
+                        continue
+                    self._apply(ev)
+                    replayed += 1
+            # Partial tail hata do taaki naye events clean line se start hon
+            if good_offset < os.path.getsize(self.journal_path):
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_offset)
+
+        if risk_manager is not None:
+            risk_manager.daily_realized = self.daily_realized
+            risk_manager.position = (
+                _position_from_dict(self.position) if self.position else None
+            )
+
+        self._open()
+        log.info("Recovered seq=%s replayed=%s daily_realized=%s open_position=%s",
+                 self.seq, replayed, self.daily_realized,
+                 "YES" if self.position else "NO")
+        return replayed
+
+    def _apply(self, ev: Dict):
+        kind = ev["t"]
+        if kind == "OPEN":
+            self.position = ev["position"]
+        elif kind == "SL" and self.position:
+            self.position["sl_price"] = ev["sl_price"]
+        elif kind == "CLOSE":
+            self.daily_realized = ev["daily_realized"]
+            if self.position:
+                self.position["is_open"] = False
+            self.position = None
+        self.seq = ev["seq"]
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Event append (RiskManager yahi call karta hai)
+    # -----------------------------------------------------------------
+
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+
+    def _append(self, ev: Dict, force_sync: bool = False):
+        with self._lock:
+            self._open()
+            self.seq += 1
+            ev["seq"] = self.seq
+            self._apply(ev)
+
+            self._fh.write(json.dumps(ev, separators=(",", ":")) + "\n")
+            self._unsynced += 1
+            self._since_snapshot += 1
+
+            now = time.monotonic()
+            if (force_sync or self._unsynced >= self.cfg.fsync_every
+                    or now - self._last_sync >= self.cfg.fsync_interval):
+                self.sync()
+            else:
+                # Agla event aaye ya na aaye, fsync_interval ke andar durable
+                self._arm_flush()
+
+            if self._since_snapshot >= self.cfg.snapshot_every:
+                self.snapshot()
+
+    def record_open(self, position: PositionState):
+        self._append({"t": "OPEN", "position": _position_to_dict(position)},
+                     force_sync=True)
+
+    def record_sl(self, sl_price: float):
+        self._append({"t": "SL", "sl_price": sl_price})
+
+    def record_close(self, exit_price: float, pnl: float, daily_realized: float):
+        self._append({"t": "CLOSE", "exit_price": exit_price, "pnl": pnl,
+                      "daily_realized": daily_realized},
+                     force_sync=self.cfg.sync_on_close)
+
+    # -----------------------------------------------------------------
+    # STEP 6 — fsync + snapshot/compaction
+    # -----------------------------------------------------------------
+
+    def sync(self):
+        """Buffered events disk par durable karo."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._fh is None or self._unsynced == 0:
+                return
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _arm_flush(self):
+        """Pending events ke liye ek-baar ka timer (already armed → kuch nahi)."""
+        if self._timer is not None:
+            return
+        t = threading.Timer(self.cfg.fsync_interval, self.sync)
+        t.daemon = True
+        self._timer = t
+        t.start()
+
+    def snapshot(self):
+        """
+        Current state ka compact snapshot likho (tmp + atomic rename),
+        phir journal truncate karo. Crash beech me hua toh bhi seq filter
+        ki wajah se double-apply nahi hoga.
+        """
+        with self._lock:
+            self.sync()
+            snap = {
+                "seq": self.seq,
+                "daily_realized": self.daily_realized,
+                "position": self.position,
+            }
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snap, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+
+            if self._fh is not None:
+                self._fh.close()
+            self._fh = open(self.journal_path, "w", encoding="utf-8")
+            self._since_snapshot = 0
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
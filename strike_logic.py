@@ -2,37 +2,85 @@
 # Strike selection logic (ATM / OTM)
 # --------------------------------------------
 # strike_logic.py
+#
+# - Har index ka apna strike step (NIFTY 50, BANKNIFTY 100, ...)
+# - Weekly / monthly expiry calendar (holiday par pichhla trading day)
+# - Broker trading symbol expiry ke saath: NIFTY09DEC2525900CE
+#   (Angel scrip master format: NAME + DDMONYY + STRIKE + CE/PE)
+# - Token lookup memoized (scrip master file / searchScrip ek hi baar)
+#
+# StrikeResolver din me ek baar expiry + symbols precompute karta hai,
+# isliye entry ke time sirf dict lookup hota hai (koi string building /
+# searching hot path par nahi).
 
-STEP = 50      # NIFTY strike gap (50 points)
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """
+    step           = strike gap
+    expiry_weekday = expiry ka din (0=Mon ... 3=Thu)
+    weekly         = True → har hafte expiry, False → sirf monthly (last weekday)
+    """
+    step: int
+    expiry_weekday: int
+    weekly: bool
+
+
+# NSE: Sep 2025 se expiry Tuesday; BANKNIFTY / FINNIFTY / MIDCPNIFTY sirf monthly.
+# BSE SENSEX weekly Thursday.
+INDEX_SPECS: Dict[str, IndexSpec] = {
+    "NIFTY": IndexSpec(step=50, expiry_weekday=1, weekly=True),
+    "BANKNIFTY": IndexSpec(step=100, expiry_weekday=1, weekly=False),
+    "FINNIFTY": IndexSpec(step=50, expiry_weekday=1, weekly=False),
+    "MIDCPNIFTY": IndexSpec(step=25, expiry_weekday=1, weekly=False),
+    "SENSEX": IndexSpec(step=100, expiry_weekday=3, weekly=True),
+}
+
+STEP = INDEX_SPECS["NIFTY"].step      # purana constant (NIFTY strike gap)
 MAX_OTM_STEPS = 1   # default: ATM ya 1 step OTM
 
+_MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN",
+           "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+
 
-def round_to_strike(spot_price: float) -> int:
+def round_to_strike(spot_price: float, step: int = STEP) -> int:
     """
-    NIFTY spot ko nearest 50 point strike par round karta hai.
-    Example: 25915 -> 25900, 25926 -> 25950
+    Spot ko nearest strike par round karta hai.
+    Example (NIFTY, 50): 25915 -> 25900, 25926 -> 25950
     """
-    return int(round(spot_price / STEP) * STEP)
+    return int(round(spot_price / step) * step)
 
 
-def choose_call_put_strike(spot_price: float, trend: str = "normal") -> dict:
+def choose_call_put_strike(spot_price: float, trend: str = "normal",
+                           step: int = STEP) -> dict:
     """
     Trend ke hisab se ATM / OTM strike choose karta hai.
 
     trend:
       - "normal"       -> ATM
-      - "strong_up"    -> CE = ATM + 50
-      - "strong_down"  -> PE = ATM - 50
+      - "strong_up"    -> CE = ATM + step
+      - "strong_down"  -> PE = ATM - step
     """
-    atm = round_to_strike(spot_price)
+    atm = round_to_strike(spot_price, step)
 
     ce = atm
     pe = atm
 
     if trend == "strong_up":
-        ce = atm + STEP
+        ce = atm + step
     elif trend == "strong_down":
-        pe = atm - STEP
+        pe = atm - step
 
     return {
         "atm": atm,
@@ -41,23 +89,173 @@ def choose_call_put_strike(spot_price: float, trend: str = "normal") -> dict:
     }
 
 
+# --------------------------------------------
+# Expiry calendar
+# --------------------------------------------
+
+def _shift_for_holidays(d: date, holidays: frozenset) -> date:
+    """Expiry holiday / weekend par pade to pichhla trading day."""
+    while d.weekday() >= 5 or d in holidays:
+        d -= timedelta(days=1)
+    return d
+
+
+def _monthly_expiry(year: int, month: int, weekday: int, holidays: frozenset) -> date:
+    """Month ka last `weekday` (holiday shift ke saath)."""
+    nxt = date(year + month // 12, month % 12 + 1, 1)
+    d = nxt - timedelta(days=1)
+    d -= timedelta(days=(d.weekday() - weekday) % 7)
+    return _shift_for_holidays(d, holidays)
+
+
+@lru_cache(maxsize=256)
+def expiry_for(index_name: str, today: date, holidays: frozenset = frozenset()) -> date:
+    """today ya uske baad ki nearest expiry (memoized per day)."""
+    spec = INDEX_SPECS[index_name]
+    if spec.weekly:
+        d = today + timedelta(days=(spec.expiry_weekday - today.weekday()) % 7)
+        exp = _shift_for_holidays(d, holidays)
+        if exp < today:
+            # Holiday shift ne expiry aaj se pehle kar di → agla hafta
+            exp = _shift_for_holidays(d + timedelta(days=7), holidays)
+        return exp
+
+    exp = _monthly_expiry(today.year, today.month, spec.expiry_weekday, holidays)
+    if exp < today:
+        y, m = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+        exp = _monthly_expiry(y, m, spec.expiry_weekday, holidays)
+    return exp
+
+
+def expiry_code(expiry: date) -> str:
+    """date(2025, 12, 9) -> '09DEC25'"""
+    return f"{expiry.day:02d}{_MONTHS[expiry.month - 1]}{expiry.year % 100:02d}"
+
+
+def build_symbol(index_name: str, expiry: date, strike: int, side: str) -> str:
+    return f"{index_name}{expiry_code(expiry)}{strike}{side}"
+
+
+# --------------------------------------------
+# Token lookup (memoized)
+# --------------------------------------------
+
+class TokenBook:
+    """
+    Trading symbol → broker token.
+
+    - load_scrip_master(path): Angel OpenAPIScripMaster.json se ek hi baar
+      (sirf is index ke NFO options)
+    - api_lookup: fallback fn(symbol) -> token (e.g. searchScrip), result cache
+    """
+
+    def __init__(self, index_name: str,
+                 api_lookup: Optional[Callable[[str], Optional[str]]] = None):
+        self.index_name = index_name
+        self.api_lookup = api_lookup
+        self.tokens: Dict[str, str] = {}
+
+    def load_scrip_master(self, path: str) -> int:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        for r in rows:
+            if (r.get("name") == self.index_name and r.get("exch_seg") in ("NFO", "BFO")
+                    and r.get("instrumenttype") == "OPTIDX"):
+                self.tokens[r["symbol"]] = r["token"]
+        log.info("Scrip master: %s %s option tokens", len(self.tokens), self.index_name)
+        return len(self.tokens)
+
+    def token(self, symbol: str) -> Optional[str]:
+        tok = self.tokens.get(symbol)
+        if tok is None and self.api_lookup is not None:
+            try:
+                tok = self.api_lookup(symbol)
+            except Exception as e:
+                log.warning("Token lookup failed for %s: %s", symbol, e)
+                return None
+            if tok is not None:
+                self.tokens[symbol] = tok
+        return tok
+
+
+# --------------------------------------------
+# StrikeResolver (hot path: sirf dict lookup)
+# --------------------------------------------
+
+class StrikeResolver:
+
+    def __init__(self, index_name: str = "NIFTY", today: Optional[date] = None,
+                 holidays: Iterable[date] = (), tokens: Optional[TokenBook] = None,
+                 strikes_each_side: int = 20):
+        self.index_name = index_name
+        self.spec = INDEX_SPECS[index_name]
+        self.step = self.spec.step
+        self.holidays = frozenset(holidays)
+        self.tokens = tokens or TokenBook(index_name)
+        self.strikes_each_side = strikes_each_side
+
+        # (strike, "CE"/"PE") → (symbol, token)
+        self._cache: Dict[Tuple[int, str], Tuple[str, Optional[str]]] = {}
+        self.roll(today or date.today())
+
+    def roll(self, today: date):
+        """Naya din → expiry dubara nikaalo, cache clear."""
+        self.today = today
+        self.expiry = expiry_for(self.index_name, today, self.holidays)
+        self._code = expiry_code(self.expiry)
+        self._cache.clear()
+        log.info("%s expiry: %s", self.index_name, self.expiry)
+
+    def is_expiry_day(self) -> bool:
+        return self.today == self.expiry
+
+    def prewarm(self, spot: float):
+        """ATM ± strikes_each_side ke symbols + tokens pehle se cache karo."""
+        atm = round_to_strike(spot, self.step)
+        n = self.strikes_each_side
+        for k in range(atm - n * self.step, atm + (n + 1) * self.step, self.step):
+            self.lookup(k, "CE")
+            self.lookup(k, "PE")
+
+    def lookup(self, strike: int, side: str) -> Tuple[str, Optional[str]]:
+        key = (strike, side)
+        hit = self._cache.get(key)
+        if hit is None:
+            symbol = f"{self.index_name}{self._code}{strike}{side}"
+            hit = (symbol, self.tokens.token(symbol))
+            self._cache[key] = hit
+        return hit
+
+    def symbol(self, strike: int, side: str) -> str:
+        return self.lookup(strike, side)[0]
+
+    def resolve(self, direction: str, spot: float,
+                trend: str = "normal") -> Tuple[str, Optional[str]]:
+        """direction + spot → (trading symbol, token)."""
+        step = self.step
+        atm = int(round(spot / step) * step)
+        if direction == "CE":
+            return self.lookup(atm + step if trend == "strong_up" else atm, "CE")
+        return self.lookup(atm - step if trend == "strong_down" else atm, "PE")
+
+
+_resolvers: Dict[str, StrikeResolver] = {}
+
+
 # -------------------------------------------------------
 # NEW FUNCTION (Required by bot_core.py)
 # -------------------------------------------------------
-def get_option_symbol(direction: str, spot_price: float, trend: str = "normal") -> str:
+def get_option_symbol(direction: str, underlying_price: float, trend: str = "normal",
+                      index_name: str = "NIFTY") -> str:
     """
-    Final tradingsymbol text return karta hai.
-    Example: CE -> NIFTY25900CE
-             PE -> NIFTY25950PE
+    Final tradingsymbol text return karta hai (nearest expiry ke saath).
+    Example: CE -> NIFTY09DEC2525900CE
+             PE -> NIFTY09DEC2525950PE
     """
-    strikes = choose_call_put_strike(spot_price, trend)
-
-    if direction.upper() == "CE":
-        strike = strikes["ce_strike"]
-        return f"NIFTY{strike}CE"
-    else:
-        strike = strikes["pe_strike"]
-        return f"NIFTY{strike}PE"
+    resolver = _resolvers.get(index_name)
+    if resolver is None or resolver.today != date.today():
+        resolver = _resolvers[index_name] = StrikeResolver(index_name)
+    return resolver.resolve(direction.upper(), underlying_price, trend)[0]
 
 
 # -------------------------------------------------------
@@ -72,3 +270,4 @@ if __name__ == "__main__":
 
     print("CE Symbol:", get_option_symbol("CE", test_price))
     print("PE Symbol:", get_option_symbol("PE", test_price))
+    print("BANKNIFTY CE:", get_option_symbol("CE", 58120, index_name="BANKNIFTY"))
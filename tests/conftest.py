@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules repo root par flat rakhe hain (package nahi) → tests ke liye path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+import bench_suite
+from bench_suite import bench_rules_evaluate, compare, measure, noisy_ticks, warm_handler
+from tick_sanitizer import TickSanitizer
+
+
+def test_measure_builds_fresh_state_per_repeat():
+    made = []
+
+    def setup():
+        state = []
+        made.append(state)
+        return state.append
+
+    r = measure(None, ops=10, repeat=3, setup=setup)
+    # 3 timed repeats + 1 tracemalloc run, har ek apne state par
+    assert len(made) == 4 and all(len(s) == 10 for s in made)
+    assert r["ops"] == 10 and r["ns_per_op"] >= r["min_ns_per_op"] > 0
+
+
+def test_noisy_ticks_exercise_sanitizer_drops():
+    san = TickSanitizer()
+    ticks = noisy_ticks(2000)
+    kept = sum(1 for t in ticks if san.check(t))
+    assert 0 < kept < len(ticks)
+
+
+def test_rules_bench_leaves_handler_candles_alone(monkeypatch):
+    dh = warm_handler(n_ticks=20 * 300)
+    before = [(c.h, c.l, c.c) for c in dh.candles]
+    monkeypatch.setattr(bench_suite, "warm_handler", lambda: dh)
+    monkeypatch.setattr(bench_suite, "measure", lambda fn, ops: fn(0) or {})
+    bench_rules_evaluate()
+    assert [(c.h, c.l, c.c) for c in dh.candles] == before
+
+
+def test_compare_flags_only_regressions_over_threshold():
+    base = {"a": {"ns_per_op": 100.0}, "b": {"ns_per_op": 100.0}}
+    now = {"a": {"ns_per_op": 130.0}, "b": {"ns_per_op": 105.0}, "c": {"ns_per_op": 1.0}}
+    out = compare(now, base, 0.2)
+    assert out == ["a"] and now["b"]["vs_baseline"] == 1.05
@@ -0,0 +1,34 @@
+import logging
+import queue
+from datetime import date
+
+from bot_logger import _DeferredQueueHandler, setup_logging, stop_logging
+
+
+def test_record_is_queued_unformatted():
+    q = queue.SimpleQueue()
+    h = _DeferredQueueHandler(q)
+    rec = logging.LogRecord("risk_manager", logging.INFO, __file__, 1,
+                            "SL=%s", (100.0,), None)
+    h.emit(rec)
+    queued = q.get_nowait()
+    # Format listener thread par hota hai, caller par nahi
+    assert queued.msg == "SL=%s" and queued.args == (100.0,)
+
+
+def test_setup_logging_writes_dated_file(tmp_path):
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        setup_logging(base_dir=str(tmp_path), filename="t.log", console=False,
+                      levels={"noisy": "WARNING"})
+        logging.getLogger("risk_manager").info("Trail SL → %s", 120.0)
+        logging.getLogger("noisy").info("filtered")
+        stop_logging()
+        text = (tmp_path / date.today().isoformat() / "t.log").read_text()
+        assert "Trail SL → 120.0" in text and "filtered" not in text
+    finally:
+        stop_logging()
+        logging.getLogger("noisy").setLevel(logging.NOTSET)
+        root.handlers[:], level = saved
+        root.setLevel(level)
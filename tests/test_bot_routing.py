@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from bot_core import BotConfig, OptionBot
+from market_calendar import ist_date
+from ws_decoder import TickDecoder
+
+
+class _Api:
+    def get_option_ltp(self, symbol):
+        return 0.0
+
+
+@pytest.fixture
+def bot(tmp_path):
+    cfg = BotConfig()
+    cfg.state_dir = str(tmp_path)
+    b = OptionBot(_Api(), cfg)
+    b.unsubscribed = []
+    b.on_chain_unsubscribe = b.unsubscribed.extend
+    yield b
+    if b.greeks is not None:
+        b.greeks.stop()
+
+
+def _tick(symbol, ltp, **kw):
+    t = {"symbol": symbol, "token": symbol, "last_traded_price": ltp,
+         "exchange_timestamp": int(time.time()), "volume": 10}
+    t.update(kw)
+    return t
+
+
+def test_option_ticks_never_reach_index_candles(bot):
+    bot.update_feed(_tick("NIFTY", 25900.0))
+    processed = bot.data_handler.ticks_processed
+    ce = bot.strikes.symbol(25900, "CE")
+
+    bot.update_feed(_tick(ce, 120.0, oi=5000))
+    bot.update_feed(_tick("NIFTY99JAN3030000CE", 3.0))      # anjaan NFO symbol
+    assert bot.data_handler.ticks_processed == processed
+    assert bot.chain.ticks == 1
+    assert bot.m_option_dropped.value == 1
+
+
+def test_recenter_unsubscribes_old_window(bot):
+    bot.update_feed(_tick("NIFTY", 25900.0))
+    old = set(bot.chain.symbols())
+    bot.update_feed(_tick("NIFTY", 26400.0, exchange_timestamp=int(time.time()) + 1))
+    assert bot.chain.recenters == 1
+    assert bot.unsubscribed
+    assert set(bot.unsubscribed) == old - set(bot.chain.symbols())
+
+
+def test_ltp_frame_keeps_strike_oi(bot):
+    bot.update_feed(_tick("NIFTY", 25900.0))
+    ce = bot.strikes.symbol(25900, "CE")
+    decode = TickDecoder(copy=True)
+    bot.update_feed(decode(json.dumps({"symbol": ce, "ltp": 120.0, "oi": 5000})))
+    tick = decode(json.dumps({"symbol": ce, "ltp": 121.0}))
+    assert tick["oi"] is None
+    bot.update_feed(tick)
+    assert bot.chain.total_oi[0] == 5000
+
+
+def test_new_session_rolls_expiry_and_rebuilds_chain(bot):
+    now = int(time.time())
+    bot.update_feed(_tick("NIFTY", 25900.0, exchange_timestamp=now))
+    chain = bot.chain
+    assert bot.strikes._cache                      # chain build par prewarm
+    later = now + 14 * 86400
+    bot.update_feed(_tick("NIFTY", 25900.0, exchange_timestamp=later))
+    assert bot.strikes.today == ist_date(later)
+    assert bot.chain is not chain
+    assert set(chain.symbols()) <= set(bot.unsubscribed)
+
+
+def test_jsonl_replay_symbols_match_chain(bot, tmp_path):
+    from market_simulator import MarketSimulator, SimConfig, read_jsonl
+    path = str(tmp_path / "ticks.jsonl")
+    MarketSimulator(SimConfig(ticks_per_sec=1.0)).write_jsonl(path, 60)
+    for t in read_jsonl(path):
+        bot.update_feed(t)
+    assert bot.chain.ticks > 0
+    assert bot.m_option_dropped.value == 0
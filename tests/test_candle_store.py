@@ -0,0 +1,59 @@
+import os
+import time
+from datetime import date
+
+import pytest
+
+from candle_store import CandleSeries, CandleStore
+from market_calendar import day_epoch, ist_datetime
+from rules_engine import Candle
+
+OPEN = day_epoch(date(2025, 12, 8)) + 9 * 3600 + 15 * 60      # 09:15 IST
+
+
+@pytest.fixture
+def foreign_tz():
+    """Host TZ IST nahi → store ka IST conversion check."""
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+def _candle(ts, price):
+    return Candle(ts=ist_datetime(ts), o=price, h=price + 1, l=price - 1, c=price, v=10)
+
+
+def test_append_range_and_grow_round_trip(tmp_path, foreign_tz):
+    path = str(tmp_path / "5m.cols")
+    s = CandleSeries(path, writable=True, initial_capacity=4)
+    for k in range(10):                                      # 4 → 8 → 16 grow
+        assert s.append_candle(_candle(OPEN + k * 300, 100.0 + k), 1000 + k, 2000 + k)
+    assert not s.append_candle(_candle(OPEN, 1.0))         # purana → ignore
+    assert s.capacity == 16 and len(s) == 10
+
+    i, j = s.range(OPEN + 300, OPEN + 900)
+    assert (i, j) == (1, 3)
+    got = s.candles(OPEN + 300, OPEN + 900)
+    assert [c.ts.strftime("%H:%M") for c in got] == ["09:20", "09:25"]
+    assert [c.c for c in got] == [101.0, 102.0]
+    assert s.oi(OPEN, OPEN + 600) == ([1000, 1001], [2000, 2001])
+    s.close()
+
+    r = CandleSeries(path)
+    assert r.candles()[-1].ts == ist_datetime(OPEN + 9 * 300)
+    r.close()
+
+
+def test_store_fetch_uses_ist_wall_clock(tmp_path, foreign_tz):
+    store = CandleStore(str(tmp_path))
+    store.series("NIFTY", 5).append_candle(_candle(OPEN, 100.0))
+    got = store.fetch_candles("NIFTY", ist_datetime(OPEN), ist_datetime(OPEN + 300), 5)
+    assert len(got) == 1 and got[0].ts.hour == 9 and got[0].ts.minute == 15
+    assert store.is_fresh("NIFTY", 5, ist_datetime(OPEN))
+    store.close()
@@ -0,0 +1,57 @@
+import threading
+import time
+from datetime import date
+
+from candle_timer import CandleTimer
+from data_feed_handler import DataFeedHandler
+from market_calendar import day_epoch
+
+OPEN = day_epoch(date(2025, 12, 8)) + 9 * 3600 + 15 * 60      # 09:15 IST
+
+
+def _feed(dh, ts, ltp):
+    dh.on_tick({"last_traded_price": ltp, "volume": 1, "exchange_timestamp": ts})
+
+
+def test_timer_close_then_next_tick_starts_new_candle():
+    dh = DataFeedHandler(5, close_grace=0.25)
+    _feed(dh, OPEN + 10, 100.0)
+    assert dh.close_if_due(OPEN + 301)
+    assert dh.close_deadline() is None and not dh.close_if_due(OPEN + 302)
+    assert dh._last_ts == OPEN + 300                 # market time boundary tak
+    _feed(dh, OPEN + 305, 101.0)                      # 09:20 candle, late nahi
+    assert dh.late_ticks == 0 and dh.current_candle_start is not None
+    _feed(dh, OPEN + 600, 102.0)                      # tick-driven close bhi chalta hai
+    assert [c.c for c in dh.candles] == [100.0, 101.0] and dh.timer_closes == 1
+
+
+class _Handler:
+    """close_deadline / close_if_due ka wall-clock stub."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def close_deadline(self):
+        return self.deadline
+
+    def close_if_due(self, now):
+        if self.deadline is None or now < self.deadline:
+            return False
+        self.deadline = None
+        return True
+
+
+def test_candle_timer_fires_once_under_the_tick_lock():
+    lock = threading.Lock()
+    held = []
+    dh = _Handler(time.time() + 0.05)
+    timer = CandleTimer(dh, lambda: held.append(lock.locked()), lock, max_sleep=0.02)
+    timer.start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while not held and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+    finally:
+        timer.stop()
+    assert held == [True] and timer.fired == 1
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("rich")
+
+from dashboard import BotDashboard  # noqa: E402
+
+
+def test_only_changed_panels_are_rebuilt(monkeypatch):
+    dash = BotDashboard()
+    built = []
+    real = dash._build_panel
+    monkeypatch.setattr(dash, "_build_panel", lambda name: built.append(name) or real(name))
+
+    assert dash._refresh_changed()                   # pehla frame: saare panels
+    built.clear()
+    assert not dash._refresh_changed()               # kuch nahi badla → render skip
+
+    dash.update_many(ltp=101.5, pnl=75)
+    dash.update("unknown_key", 1)                    # kisi panel me nahi
+    assert dash._refresh_changed()
+    assert built == ["trade"]
+    assert dash.data["ltp"] == 101.5
@@ -0,0 +1,104 @@
+from datetime import date
+
+from data_feed_handler import DataFeedHandler
+from market_calendar import day_epoch, ist_datetime
+from option_chain import OptionChain
+from rules_engine import Candle
+
+OPEN = day_epoch(date(2025, 12, 8)) + 9 * 3600 + 15 * 60      # 09:15 IST
+
+
+def _feed(dh, ts, ltp, vol=1):
+    dh.on_tick({"last_traded_price": ltp, "volume": vol, "exchange_timestamp": ts})
+
+
+def _candle(ts, price):
+    return Candle(ts=ist_datetime(ts), o=price, h=price + 1, l=price - 1,
+                  c=price, v=100)
+
+
+def test_ticks_bucket_on_session_grid():
+    dh = DataFeedHandler(5)
+    _feed(dh, OPEN + 67, 100.0)            # 09:16:07 → 09:15 candle
+    _feed(dh, OPEN + 299, 101.0)
+    _feed(dh, OPEN + 300, 102.0)           # 09:20 → pehli candle close
+    assert len(dh.candles) == 1
+    c = dh.candles[0]
+    assert c.ts == ist_datetime(OPEN)
+    assert (c.o, c.h, c.c, c.v) == (100.0, 101.0, 101.0, 2)
+
+
+def test_empty_backfill_keeps_running_candle():
+    dh = DataFeedHandler(5)
+    _feed(dh, OPEN + 10, 100.0)
+    _feed(dh, OPEN + 20, 105.0)
+    now = ist_datetime(OPEN + 120)
+    assert dh.backfill_candles([], now) == 0
+    _feed(dh, OPEN + 300, 101.0)
+    assert len(dh.candles) == 1 and dh.candles[0].h == 105.0
+
+
+def test_backfill_replaces_running_candle_in_order():
+    dh = DataFeedHandler(5)
+    _feed(dh, OPEN + 10, 100.0)            # 09:15 adhoori
+    now = ist_datetime(OPEN + 700)
+    hist = [_candle(OPEN, 200.0), _candle(OPEN + 300, 201.0), _candle(OPEN + 600, 202.0)]
+    assert dh.backfill_candles(hist, now) == 2
+    assert [c.c for c in dh.candles] == [200.0, 201.0]
+    assert dh.current_candle_start == ist_datetime(OPEN + 600)
+    _feed(dh, OPEN + 900, 203.0)
+    assert [c.c for c in dh.candles] == [200.0, 201.0, 202.0]
+
+
+def test_backfill_closes_older_running_candle_first():
+    dh = DataFeedHandler(5)
+    _feed(dh, OPEN + 10, 100.0)
+    now = ist_datetime(OPEN + 900)
+    dh.backfill_candles([_candle(OPEN + 300, 201.0), _candle(OPEN + 600, 202.0)], now)
+    assert [c.ts for c in dh.candles] == sorted(c.ts for c in dh.candles)
+    assert [c.c for c in dh.candles] == [100.0, 201.0, 202.0]
+
+
+def test_backfill_keeps_chain_oi_aligned():
+    dh = DataFeedHandler(5)
+    dh.attach_chain(OptionChain("NIFTY", 25900))
+    _feed(dh, OPEN + 10, 25900.0)
+    _feed(dh, OPEN + 300, 25901.0)
+    now = ist_datetime(OPEN + 1000)
+    dh.backfill_candles([_candle(OPEN + 300, 25910.0), _candle(OPEN + 600, 25920.0)], now)
+    assert len(dh.ce_oi) == len(dh.pe_oi) == len(dh.candles) == 3
+    # Backfilled bars par chain ka abhi wala OI nahi (fake flat OI)
+    assert dh.ce_oi[1:] == dh.pe_oi[1:] == [None, None]
+
+
+def test_backfill_uses_historical_oi():
+    dh = DataFeedHandler(5)
+    dh.attach_chain(OptionChain("NIFTY", 25900))
+    _feed(dh, OPEN + 10, 25900.0)
+    now = ist_datetime(OPEN + 1000)
+    hist = [_candle(OPEN + 600, 25920.0), _candle(OPEN + 300, 25910.0)]
+    dh.backfill_candles(hist, now, ce_oi=[700, 500], pe_oi=[800, 600])
+    assert [c.c for c in dh.candles] == [25900.0, 25910.0, 25920.0]
+    assert dh.ce_oi[1:] == [500, 700] and dh.pe_oi[1:] == [600, 800]
+
+
+def test_late_tick_after_timer_close_is_dropped():
+    dh = DataFeedHandler(5, close_grace=0.25)
+    _feed(dh, OPEN + 10, 100.0)
+    assert dh.close_deadline() == OPEN + 300.25
+    assert not dh.close_if_due(OPEN + 300.1)
+    assert dh.close_if_due(OPEN + 300.3)
+    _feed(dh, OPEN + 299, 99.0)
+    assert dh.late_ticks == 1 and len(dh.candles) == 1
+
+
+def test_late_tick_from_previous_bucket_is_dropped():
+    dh = DataFeedHandler(5)
+    _feed(dh, OPEN + 298, 100.0)
+    _feed(dh, OPEN + 301, 105.0)           # 09:20 candle start
+    _feed(dh, OPEN + 299, 90.0)            # reorder window ke andar, par 09:15 ka
+    assert dh.late_ticks == 1
+    assert (dh.curr_open, dh.curr_low, dh.curr_close) == (105.0, 105.0, 105.0)
+    assert dh._last_ts == OPEN + 301
+    assert dh.underlying_prices == [100.0, 105.0]
+    assert dh.candles[0].c == 100.0
@@ -0,0 +1,35 @@
+from latency_tracer import NULL_TRACE, TOTAL_TICK, LatencyHistogram, LatencyTracer
+
+
+def test_histogram_percentiles_within_bucket_resolution():
+    h = LatencyHistogram()
+    for us in range(1, 1001):
+        h.record(us * 1000)
+    # Bucket upper bound → ~20% resolution, max kabhi cross nahi
+    assert 500_000 <= h.percentile(50) <= 600_000
+    assert 990_000 <= h.percentile(99) <= 1_000_000
+    assert h.percentile(100) == h.max == 1_000_000
+    assert h.mean() == 500_500
+    h.reset()
+    assert h.count == 0 and h.percentile(50) == 0
+
+
+def test_trace_marks_stages_and_end_records_total():
+    tracer = LatencyTracer()
+    trace = tracer.begin()
+    trace.mark("decode")
+    trace.mark("candle")
+    tracer.end()
+    assert tracer.current is NULL_TRACE
+    snap = tracer.snapshot()
+    assert snap["decode"]["count"] == snap["candle"]["count"] == 1
+    assert snap[TOTAL_TICK]["count"] == 1
+    assert snap["evaluate"]["count"] == 0
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = LatencyTracer(enabled=False)
+    assert tracer.begin() is NULL_TRACE
+    tracer.current.mark("decode")
+    tracer.end()
+    assert all(s["count"] == 0 for s in tracer.snapshot().values())
@@ -0,0 +1,43 @@
+from datetime import date, datetime, time as dtime
+
+from market_calendar import CandleClock, SessionCalendar, day_epoch, ist_date
+from warm_start import previous_trading_days
+
+MON = date(2025, 12, 8)
+BASE = day_epoch(MON)
+
+
+def _at(hh, mm, ss=0):
+    return BASE + hh * 3600 + mm * 60 + ss
+
+
+def test_bucket_aligned_to_0915():
+    clock = CandleClock(1800)
+    assert clock.bucket(_at(9, 16, 7)) == (_at(9, 15), _at(9, 45))
+    assert clock.bucket(_at(9, 45)) == (_at(9, 45), _at(10, 15))
+
+
+def test_pre_open_and_post_close_clamped():
+    clock = CandleClock(300)
+    assert clock.bucket(_at(9, 7, 30))[0] == _at(9, 15)
+    assert clock.bucket(_at(15, 40)) == (_at(15, 25), _at(15, 30))
+
+
+def test_last_candle_cut_at_close():
+    # 60m candles: 15:15 wali candle 15:30 par khatam
+    assert CandleClock(3600).bucket(_at(15, 20)) == (_at(15, 15), _at(15, 30))
+
+
+def test_special_session_on_holiday():
+    cal = SessionCalendar(holidays=frozenset({MON}),
+                          special_sessions={date(2025, 12, 6): (dtime(13, 45), dtime(14, 45))})
+    assert not cal.is_trading_day(MON)
+    assert cal.session_bounds(date(2025, 12, 6))[0] == day_epoch(date(2025, 12, 6)) + 13 * 3600 + 45 * 60
+    assert ist_date(BASE + 3600) == MON
+
+
+def test_previous_trading_day_skips_holidays():
+    tue = datetime(2025, 12, 9, 9, 0)
+    assert previous_trading_days(tue, 1)[0].date() == MON
+    cal = SessionCalendar(holidays=frozenset({MON}))
+    assert previous_trading_days(tue, 1, cal)[0].date() == date(2025, 12, 5)
@@ -0,0 +1,30 @@
+from latency_tracer import LatencyTracer
+from metrics import MetricsRegistry, latency_collector
+from order_scheduler import OrderScheduler
+
+
+class _OM:
+    def place_buy_order(self, symbol, qty, token=None):
+        return "1"
+
+
+def test_latency_summary_has_sum_and_count():
+    tracer = LatencyTracer()
+    tracer.begin(0)
+    tracer.current.mark("decode")
+    tracer.end()
+    lines = latency_collector(tracer)()
+    assert any(line.startswith('bot_stage_latency_seconds_sum{stage="decode"}')
+               for line in lines)
+    assert 'bot_stage_latency_seconds_count{stage="decode"} 1' in lines
+
+
+def test_scheduler_observes_order_latency():
+    m = MetricsRegistry()
+    sch = OrderScheduler(_OM())
+    sch.latency = m.histogram("bot_order_latency_seconds", "test", ["kind"])
+    sch.submit_entry("NIFTY25900CE", 50)
+    sch.pump()
+    text = m.expose()
+    assert 'bot_order_latency_seconds_count{kind="ENTRY"} 1' in text
+    assert 'bot_order_latency_seconds_bucket{kind="ENTRY",le="+Inf"} 1' in text
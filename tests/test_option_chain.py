@@ -0,0 +1,31 @@
+from option_chain import CE, PE, OptionChain
+
+
+def test_totals_pcr_and_max_pain_incremental():
+    ch = OptionChain("NIFTY", 25900)
+    ch.update(25900, CE, 100.0, oi=1000)
+    ch.update(26000, CE, 60.0, oi=3000)
+    ch.update(26000, PE, 90.0, oi=5000)
+    assert ch.pcr() == 5000 / 4000
+    assert ch.oi_resistance() == (25900 * 1000 + 26000 * 3000) / 4000
+    # 26000 par writers ka loss: CE 100 * 1000 (baaki strikes par zyada)
+    assert ch.max_pain() == 26000
+
+
+def test_missing_oi_keeps_previous_value():
+    ch = OptionChain("NIFTY", 25900)
+    ch.update(25900, CE, 100.0, oi=1000)
+    ch.update(25900, CE, 101.0, oi=None)
+    assert ch.total_oi[CE] == 1000
+
+
+def test_recenter_keeps_overlap_and_publishes_grid_atomically():
+    ch = OptionChain("NIFTY", 25900)
+    ch.update(26000, CE, 60.0, oi=3000)
+    old_grid = ch.grid
+    ch.recenter(26100)
+    strikes, ltp = ch.grid
+    assert ch.grid is not old_grid and strikes is ch.strikes and ltp is ch.ltp
+    assert ltp[CE][strikes.index(26000)] == 60.0
+    assert ch.total_oi[CE] == 3000
+    assert ch.retired and all(s not in ch.symbols() for s in ch.retired)
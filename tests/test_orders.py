@@ -0,0 +1,98 @@
+from datetime import date
+
+from bot_core import BotConfig, OptionBot
+from order_scheduler import OrderScheduler
+from strike_logic import StrikeResolver
+
+
+class _RecordingOM:
+    def __init__(self):
+        self.calls = []
+        self.ltp = 0.0
+
+    def place_buy_order(self, symbol, qty, token=None):
+        self.calls.append(("BUY", symbol, token))
+        return "1"
+
+    def place_exit_order(self, symbol, qty, token=None):
+        self.calls.append(("SELL", symbol, token))
+        return "2"
+
+    def modify_sl_order(self, order_id, symbol, new_sl, qty, token=None):
+        self.calls.append(("SL", symbol, token))
+        self.sl = (order_id, new_sl)
+
+    def cancel_order(self, order_id):
+        self.calls.append(("CANCEL", order_id, None))
+        return True
+
+    def get_option_ltp(self, symbol):
+        return self.ltp
+
+
+def test_scheduler_passes_token_to_order_manager():
+    om = _RecordingOM()
+    sch = OrderScheduler(om)
+    sch.submit_entry("NIFTY25900CE", 50, token="43210")
+    sch.submit_exit("NIFTY25900CE", 50, token="43210")
+    sch.submit_sl_modify("1", "NIFTY25900CE", 90.0, 50, token="43210")
+    assert sch.pump() == 3
+    # Priority: EXIT > SL > ENTRY
+    assert om.calls == [("SELL", "NIFTY25900CE", "43210"), ("SL", "NIFTY25900CE", "43210"),
+                        ("BUY", "NIFTY25900CE", "43210")]
+
+
+def test_roll_moves_expiry_and_clears_cache():
+    r = StrikeResolver("NIFTY", today=date(2025, 12, 8))
+    before = r.symbol(25900, "CE")
+    r.roll(date(2025, 12, 17))
+    assert r.expiry > date(2025, 12, 9)
+    assert r.symbol(25900, "CE") != before
+
+
+def test_sl_modify_coalesces_and_cancel_drops_pending():
+    om = _RecordingOM()
+    sch = OrderScheduler(om)
+    sch.submit_sl_modify("SL1", "X", 100.0, 50)
+    sch.submit_sl_modify("SL1", "X", 120.0, 50)
+    assert sch.coalesced == 1
+    sch.pump()
+    assert om.sl == ("SL1", 120.0)
+
+    sch.submit_sl_modify("SL1", "X", 140.0, 50)
+    sch.submit_cancel("SL1")
+    assert sch.pump() == 1
+    assert om.calls[-1] == ("CANCEL", "SL1", None)
+
+
+class _Api:
+    def get_option_ltp(self, symbol):
+        return 0.0
+
+
+def test_trailing_sl_is_sent_through_scheduler(tmp_path):
+    cfg = BotConfig()
+    cfg.state_dir = str(tmp_path)
+    cfg.broker_sl = True
+    om = _RecordingOM()
+    bot = OptionBot(_Api(), cfg, order_manager=om)
+    bot.position = bot.risk_manager.create_position("X", "CE", 100.0, 50)
+    bot.sl_order_id = "SL1"
+    # Entry ack ke baad initial SL rest hota hai
+    bot._place_sl(bot.position, "SL1", None)(None, "1")
+
+    om.ltp = 145.0
+    bot._manage_position(None)
+    om.ltp = 165.0
+    bot._manage_position(None)
+    bot.order_scheduler.pump()
+    # Initial + do trail steps → ek hi modify, latest trigger ke saath
+    assert [c for c in om.calls if c[0] == "SL"] == [("SL", "X", None)]
+    assert om.sl == ("SL1", 140.0)
+
+    # SL hit → resting SL order SELL karega, bot doosra exit nahi bhejta
+    om.ltp = 130.0
+    bot._manage_position(None)
+    bot.order_scheduler.pump()
+    assert bot.position is None and bot.sl_order_id is None
+    assert not any(c[0] in ("SELL", "CANCEL") for c in om.calls)
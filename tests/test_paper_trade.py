@@ -0,0 +1,58 @@
+import threading
+
+from paper_trade import PaperConfig, PaperOrderManager
+
+SYM = "NIFTY25D0926000CE"
+T0 = 1765165500
+
+
+def test_market_fill_waits_for_latency_and_slips():
+    paper = PaperOrderManager(PaperConfig(latency_ms=1500, slippage_ticks=2))
+    paper.on_price(SYM, 100.0, ts=T0)
+    oid = paper.place_buy_order(SYM, 50)
+    assert paper.on_price(SYM, 101.0, ts=T0 + 1) == 0          # latency baaki
+    assert paper.on_price(SYM, 102.0, ts=T0 + 2) == 1
+    st = paper.get_order_status(oid)
+    assert st["status"] == "complete" and st["averageprice"] == 102.1
+
+
+def test_stop_loss_triggers_and_pnl():
+    paper = PaperOrderManager(PaperConfig(latency_ms=0, slippage_ticks=0))
+    paper.on_price(SYM, 100.0, ts=T0)
+    paper.place_buy_order(SYM, 50)
+    paper.on_price(SYM, 100.0, ts=T0 + 1)
+    paper.modify_sl_order("SL-1", SYM, 95.0, 50)
+    paper.on_price(SYM, 110.0, ts=T0 + 2)
+    assert paper.unrealized_pnl() == 500.0
+    paper.modify_sl_order("SL-1", SYM, 105.0, 50)              # trail
+    assert paper.on_price(SYM, 104.0, ts=T0 + 3) == 1
+    assert paper.get_order_status("SL-1")["averageprice"] == 104.0
+    assert paper.realized_pnl() == 200.0
+    assert paper.summary()["open_positions"] == 0
+
+
+def test_order_before_first_price_uses_replay_clock():
+    paper = PaperOrderManager(PaperConfig(latency_ms=50, slippage_ticks=0))
+    oid = paper.place_buy_order(SYM, 50)
+    assert paper.on_price(SYM, 100.0, ts=T0) == 0             # latency is tick se
+    assert paper.on_price(SYM, 100.5, ts=T0 + 1) == 1
+    assert paper.orders[oid].submitted_at == T0
+
+
+def test_concurrent_orders_and_prices():
+    paper = PaperOrderManager(PaperConfig(latency_ms=0, slippage_ticks=0))
+    paper.on_price(SYM, 100.0)
+    n = 2000
+
+    def orders():
+        for _ in range(n):
+            paper.place_buy_order(SYM, 1)
+
+    t = threading.Thread(target=orders)
+    t.start()
+    while t.is_alive():
+        paper.on_price(SYM, 100.0)
+    t.join()
+    paper.on_price(SYM, 100.0)
+    assert len(paper.fills) == n
+    assert paper.positions[SYM].qty == n
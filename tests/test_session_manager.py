@@ -0,0 +1,40 @@
+import time
+
+from session_manager import Session, SessionConfig, SessionManager
+
+
+def _manager(tmp_path, login_fn, **kw):
+    cfg = SessionConfig(base_dir=str(tmp_path), **kw)
+    return SessionManager(login_fn, account="test", config=cfg)
+
+
+def test_cached_session_reused_without_login(tmp_path):
+    calls = []
+
+    def login():
+        calls.append(1)
+        return Session(access_token="tok", expires_at=time.time() + 3600)
+
+    _manager(tmp_path, login).get()
+    again = _manager(tmp_path, login)
+    assert again.get().access_token == "tok"
+    assert len(calls) == 1
+
+
+def test_refresher_waits_when_new_session_is_short_lived(tmp_path):
+    # Har login ka session refresh_margin ke andar expire → pehle bina delay loop
+    m = _manager(tmp_path, lambda: Session(access_token="tok", expires_at=time.time() + 60),
+                 refresh_margin=600, retry_delay=0.2)
+    m.get()
+    m.start_refresher()
+    time.sleep(0.5)
+    m.stop()
+    assert m.logins <= 5
+
+
+def test_failing_listener_does_not_break_get(tmp_path):
+    m = _manager(tmp_path, lambda: Session(access_token="tok", expires_at=time.time() + 3600))
+    m.get()
+    m2 = _manager(tmp_path, lambda: None)
+    m2.on_refresh(lambda s: 1 / 0)
+    assert m2.get().access_token == "tok"
@@ -0,0 +1,7 @@
+from startup_profile import import_wall_ms, loaded_heavy
+
+
+def test_bot_core_import_keeps_heavy_deps_lazy():
+    assert import_wall_ms("bot_core", runs=1) > 0      # import fail → RuntimeError
+    heavy = loaded_heavy("bot_core")
+    assert not any(heavy.values()), heavy
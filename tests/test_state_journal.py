@@ -0,0 +1,53 @@
+import time
+from datetime import date
+
+from risk_manager import RiskManager, RiskManagerConfig
+from state_journal import JournalConfig, StateJournal
+
+
+def _journal(tmp_path, **kw):
+    cfg = JournalConfig(base_dir=str(tmp_path), **kw)
+    return StateJournal(cfg, session_day=date(2025, 12, 8))
+
+
+def test_replay_restores_position_and_pnl(tmp_path):
+    j = _journal(tmp_path)
+    rm = RiskManager(RiskManagerConfig(), journal=j)
+    j.recover(rm)
+    rm.create_position(symbol="NIFTY25900CE", direction="CE", entry_price=100.0, qty=50)
+    j.record_sl(97.5)
+    j.close()
+
+    rm2 = RiskManager(RiskManagerConfig())
+    j2 = _journal(tmp_path)
+    assert j2.recover(rm2) == 2
+    assert rm2.position.symbol == "NIFTY25900CE"
+    assert rm2.position.sl_price == 97.5
+    j2.close()
+
+
+def test_partial_tail_line_is_ignored(tmp_path):
+    j = _journal(tmp_path)
+    j.recover()
+    j.record_close(110.0, 500.0, 500.0)
+    j.close()
+    with open(j.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"t":"SL","sl_pr')
+
+    j2 = _journal(tmp_path)
+    assert j2.recover() == 1
+    assert j2.daily_realized == 500.0
+    j2.close()
+
+
+def test_last_sl_update_synced_without_next_event(tmp_path):
+    j = _journal(tmp_path, fsync_interval=0.2)
+    j.recover()
+    j.sync()
+    j.record_sl(95.0)            # batch me → turant fsync nahi
+    assert j._unsynced == 1
+    deadline = time.monotonic() + 2.0
+    while j._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert j._unsynced == 0
+    j.close()
@@ -0,0 +1,35 @@
+from tick_bus import BusConfig, TickBus
+
+
+def test_disconnect_releases_broker_subscriptions():
+    events = []
+    bus = TickBus(BusConfig(ring_capacity=8),
+                  on_subscribe=lambda ex, s: events.append(("sub", ex, s)),
+                  on_unsubscribe=lambda ex, s: events.append(("unsub", ex, s)))
+    a = bus._add("a")
+    b = bus._add("b")
+    bus._subscribe(a, [["NFO", "X"], ["NFO", "Y"]])
+    bus._subscribe(b, [["NFO", "Y"]])
+    bus._remove(a)
+    # Y abhi b ke paas hai → sirf X release
+    assert events[-1] == ("unsub", "NFO", "X")
+    assert ("unsub", "NFO", "Y") not in events
+
+    c = bus._add("c")
+    bus._subscribe(c, [["NFO", "X"]])              # dobara maanga → broker subscribe
+    assert events[-1] == ("sub", "NFO", "X")
+
+    bus._remove(b)
+    bus._remove(c)
+    assert {e[2] for e in events if e[0] == "unsub"} == {"X", "Y"}
+    bus._reap()
+
+
+def test_overlong_symbol_is_dropped_not_truncated():
+    bus = TickBus(BusConfig(ring_capacity=8))
+    a = bus._add("a")
+    bus._subscribe(a, [["", "*"]])
+    assert bus.publish({"symbol": "X" * 40, "last_traded_price": 1.0}) == 0
+    assert bus.too_long == 1 and a.ring.depth() == 0
+    bus._remove(a)
+    bus._reap()
@@ -0,0 +1,37 @@
+from datetime import date
+
+from market_calendar import CandleClock, day_epoch
+from tick_conflator import TickConflator
+
+DAY = day_epoch(date(2025, 12, 8))          # Monday, IST midnight
+T0945 = DAY + 9 * 3600 + 45 * 60            # 30m candle boundary (09:15 grid)
+
+
+def _tick(ts, ltp, vol=10):
+    return {"token": "NIFTY", "last_traded_price": ltp, "volume": vol,
+            "exchange_timestamp": ts}
+
+
+def _clock_conflator(tf):
+    bucket = CandleClock(tf).bucket
+    return TickConflator(tf, lambda ts: bucket(ts)[0])
+
+
+def test_merge_keeps_extremes_and_sums_volume():
+    c = _clock_conflator(300)
+    c.push(_tick(T0945 + 1, 100.0))
+    assert c.push(_tick(T0945 + 2, 103.0))
+    assert c.push(_tick(T0945 + 3, 99.0))
+    _, t = c.pop()
+    assert (t["open"], t["high"], t["low"], t["last_traded_price"]) == (100.0, 103.0, 99.0, 99.0)
+    assert t["volume"] == 30 and t["conflated"] == 3
+
+
+def test_no_merge_across_session_aligned_boundary():
+    # 09:44 aur 09:46 epoch-grid (:30 / :00 IST) par same bucket me hain,
+    # lekin 09:15 aligned 30m candles me alag
+    assert (T0945 - 60) // 1800 == (T0945 + 60) // 1800
+    c = _clock_conflator(1800)
+    c.push(_tick(T0945 - 60, 100.0))
+    assert not c.push(_tick(T0945 + 60, 101.0))
+    assert len(c) == 2
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date
+
+from market_calendar import day_epoch
+from tick_pipeline import (POLICY_BLOCK, POLICY_DROP_NEWEST, POLICY_DROP_OLDEST,
+                           BoundedStage, ConflatingStage)
+
+OPEN = day_epoch(date(2025, 12, 8)) + 9 * 3600 + 15 * 60      # 09:15 IST
+
+
+def _drain(stage):
+    out = []
+    while not stage.q.empty():
+        out.append(stage.q.get_nowait())
+    return out
+
+
+def test_drop_oldest_keeps_latest_items():
+    stage = BoundedStage("raw", 2, POLICY_DROP_OLDEST)
+    for i in range(4):
+        assert stage.put_nowait(i)
+    assert _drain(stage) == [2, 3]
+    assert (stage.dropped, stage.enqueued, stage.max_depth) == (2, 4, 2)
+
+
+def test_drop_newest_keeps_first_items():
+    stage = BoundedStage("ctx", 2, POLICY_DROP_NEWEST)
+    for i in range(4):
+        assert stage.put_nowait(i)
+    assert _drain(stage) == [0, 1]
+    assert stage.dropped == 2 and stage.enqueued == 2
+
+
+def test_block_policy_waits_for_consumer():
+    async def _run():
+        stage = BoundedStage("tick", 1, POLICY_BLOCK)
+        await stage.put("a")
+        assert not stage.put_nowait("b")             # full → caller await kare
+        producer = asyncio.ensure_future(stage.put("b"))
+        await asyncio.sleep(0)
+        assert not producer.done()
+        assert await stage.get() == "a"
+        await producer
+        assert await stage.get() == "b"
+        return stage
+
+    stage = asyncio.run(_run())
+    assert stage.dropped == 0 and stage.enqueued == 2
+
+
+def _tick(token, ts, ltp, vol=10):
+    return {"token": token, "last_traded_price": ltp, "volume": vol,
+            "exchange_timestamp": ts}
+
+
+def test_conflating_stage_merges_backlog_per_token():
+    async def _run():
+        stage = ConflatingStage("tick", 300)
+        stage.put_nowait(("t1", _tick("NIFTY", OPEN + 1, 100.0)))
+        stage.put_nowait(("t2", _tick("CE", OPEN + 1, 50.0)))
+        stage.put_nowait(("t3", _tick("NIFTY", OPEN + 2, 104.0)))
+        stage.put_nowait(("t4", _tick("NIFTY", OPEN + 3, 98.0)))
+        assert stage.stats()["depth"] == 2           # tokens × buckets, ticks nahi
+        return [await stage.get(), await stage.get()], stage
+
+    (first, second), stage = asyncio.run(_run())
+    trace, tick = first
+    # Sabse purane tick ka trace (latency wahi se naapi jaati hai)
+    assert trace == "t1"
+    assert (tick["high"], tick["low"], tick["last_traded_price"]) == (104.0, 98.0, 98.0)
+    assert tick["volume"] == 30 and tick["conflated"] == 3
+    assert second == ("t2", _tick("CE", OPEN + 1, 50.0))
+    s = stage.stats()
+    assert (s["enqueued"], s["conflated"], s["emitted"], s["max_depth"]) == (4, 2, 2, 2)
+
+
+def test_conflating_stage_get_waits_for_producer():
+    async def _run():
+        stage = ConflatingStage("tick", 300)
+        getter = asyncio.ensure_future(stage.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        stage.put_nowait(("t1", _tick("NIFTY", OPEN + 1, 100.0)))
+        return await asyncio.wait_for(getter, 1.0)
+
+    assert asyncio.run(_run())[0] == "t1"
@@ -0,0 +1,61 @@
+from datetime import date
+
+from data_feed_handler import DataFeedHandler
+from market_calendar import day_epoch
+from tick_sanitizer import SanitizerConfig, TickSanitizer
+
+OPEN = day_epoch(date(2025, 12, 8)) + 9 * 3600 + 15 * 60      # 09:15 IST
+
+
+def _tick(ts, ltp, vol=1, oi=None, seq=None, token="NIFTY"):
+    t = {"token": token, "last_traded_price": ltp, "volume": vol, "oi": oi,
+         "exchange_timestamp": ts}
+    if seq is not None:
+        t["seq"] = seq
+    return t
+
+
+def test_reject_reasons():
+    san = TickSanitizer()
+    assert san.check(_tick(OPEN, 100.0))
+    assert not san.check(_tick(OPEN + 1, 0.0))                 # missing_price
+    assert not san.check({"token": "NIFTY", "last_traded_price": 100.0})
+    assert not san.check(_tick(OPEN, 100.0))                   # duplicate
+    assert san.check(_tick(OPEN + 10, 100.5))
+    assert not san.check(_tick(OPEN + 5, 100.4))               # stale
+    assert san.check(_tick(OPEN + 9, 100.4))                   # reordered
+    assert not san.check(_tick(OPEN + 11, 150.0))              # outlier
+    r = san.rejected
+    assert (r["missing_price"], r["missing_ts"], r["duplicate"], r["stale"],
+            r["outlier"]) == (1, 1, 1, 1, 1)
+    assert san.reordered == 1 and san.accepted == 3
+
+
+def test_seq_duplicate_and_receive_ts_fill():
+    san = TickSanitizer()
+    assert san.check(_tick(OPEN, 100.0, seq=5))
+    assert not san.check(_tick(OPEN + 1, 100.1, seq=5))
+    t = {"token": "NIFTY", "last_traded_price": 100.2, "timestamp": OPEN + 2, "seq": 6}
+    assert san.check(t) and t["exchange_timestamp"] == OPEN + 2
+    assert san.ts_filled == 1
+
+
+def test_outlier_streak_rebases_to_new_level():
+    san = TickSanitizer(SanitizerConfig(outlier_reset=3))
+    assert san.check(_tick(OPEN, 100.0))
+    results = [san.check(_tick(OPEN + i, 130.0 + i / 10)) for i in range(1, 4)]
+    assert results == [False, False, True]
+    assert san.rebased == 1
+
+
+def test_reordered_tick_across_bucket_does_not_touch_running_candle():
+    san = TickSanitizer()
+    dh = DataFeedHandler(5)
+    for ts, ltp in ((OPEN + 298, 100.0), (OPEN + 301, 101.0), (OPEN + 299, 100.5)):
+        t = _tick(ts, ltp)
+        if san.check(t):
+            dh.on_tick(t)
+    assert san.reordered == 1
+    assert dh.late_ticks == 1
+    assert dh.curr_low == dh.curr_close == 101.0
+    assert dh.candles[0].c == 100.0
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from shm_ring import (SYMBOL_LEN, TICK_RECORD, SpscRing, TickReader, pack_opt, pack_seq,
+                      pack_str, unpack_opt, unpack_seq)
+from ws_decoder import TickDecoder
+
+
+def test_decoder_keeps_missing_volume_and_oi_as_none():
+    dec = TickDecoder()
+    tick = dec.decode(json.dumps({"symbol": "NIFTY25DEC26000CE", "ltp": 101.5}))
+    assert tick["last_traded_price"] == 101.5
+    assert tick["volume"] is None and tick["oi"] is None
+
+    tick = dec.decode(json.dumps({"symbol": "NIFTY25DEC26000CE", "ltp": 102.0,
+                                  "volume": 0, "oi": 7500}))
+    assert tick["volume"] == 0 and tick["oi"] == 7500
+
+
+def test_ring_round_trips_optional_fields():
+    ring = SpscRing(TICK_RECORD, 8)
+    try:
+        ring.push(pack_str("NIFTY25DEC26000CE"), 101.5, pack_opt(None), pack_opt(0),
+                  0, pack_seq(None), 0, 1)
+        ring.push(pack_str("NIFTY25DEC26000CE"), 101.5, 0.0, 0.0, 0, pack_seq(0), 0, 2)
+        _, _, volume, oi, _, xseq, _, _ = ring.pop()
+        # None (frame me nahi) aur 0 alag rehne chahiye
+        assert unpack_opt(volume) is None
+        assert unpack_opt(oi) == 0
+        assert unpack_seq(xseq) is None
+        assert unpack_seq(ring.pop()[5]) == 0
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_decoder_reads_exchange_time_and_sequence():
+    dec = TickDecoder()
+    tick = dec.decode(json.dumps({"symbol": "NIFTY", "ltp": 25900.0,
+                                  "exchange_timestamp": 1765165500123,
+                                  "sequence_number": 42}))
+    assert tick["exchange_timestamp"] == 1765165500      # ms → s
+    assert tick["seq"] == 42
+    tick = dec.decode(json.dumps({"symbol": "NIFTY", "ltp": 25901.0}))
+    assert tick["seq"] is None and dec.local_ts == 1
+
+
+def test_pack_str_rejects_symbol_longer_than_field():
+    assert len(pack_str("MIDCPNIFTY30DEC2512500CE")) == 24     # fits
+    with pytest.raises(ValueError):
+        pack_str("X" * (SYMBOL_LEN + 1))
+
+
+def test_tick_reader_decodes_and_counts_gaps():
+    ring = SpscRing(TICK_RECORD, 8)
+    try:
+        reader = TickReader(ring)
+        ring.push(pack_str("NIFTY"), 25900.0, 1.0, pack_opt(None), 10, 5, 99, 1)
+        ring.push(pack_str("NIFTY"), 25901.0, 1.0, pack_opt(None), 11, -1, 100, 4)
+        ring.push(b"", 0.0, 0.0, 0.0, 0, -1, 0, 0)
+        tick = reader.pop()
+        assert tick["symbol"] == "NIFTY" and tick["oi"] is None and tick["seq"] == 5
+        assert reader.last_recv_ns == 99
+        reader.pop()
+        assert reader.gaps == 1 and reader.missed == 2
+        assert reader.pop() is None and reader.closed
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_decoder_skips_non_price_and_counts_bad_frames():
+    dec = TickDecoder()
+    assert dec.decode('{"type": "heartbeat"}') is None
+    assert dec.decode(b'{"ltp": "abc"}') is None
+    assert dec.decode('{"ltp": 1.0') is None                 # adhoora JSON
+    assert (dec.skipped, dec.errors, dec.decoded) == (1, 2, 0)
+    assert dec.decode(b'{"symbol": "NIFTY", "ltp": 25900}')["last_traded_price"] == 25900.0
+
+
+def test_decoder_reuses_dict_unless_copy():
+    frame = json.dumps({"symbol": "NIFTY", "ltp": 1.0})
+    dec = TickDecoder()
+    assert dec(frame) is dec(frame)
+    dec = TickDecoder(copy=True)
+    assert dec(frame) is not dec(frame)
@@ -0,0 +1,16 @@
+from datetime import date, time as dtime
+
+from market_calendar import SessionCalendar, day_epoch
+from ws_supervisor import in_market_hours
+
+DAY0 = day_epoch(date(2025, 12, 8))                           # Monday
+
+
+def test_market_hours_follow_session_calendar():
+    cal = SessionCalendar(holidays=frozenset({date(2025, 12, 9)}),
+                          special_sessions={date(2025, 12, 13): (dtime(18, 0), dtime(19, 15))})
+    assert in_market_hours(DAY0 + 9 * 3600 + 15 * 60, cal)
+    assert not in_market_hours(DAY0 + 9 * 3600, cal)
+    assert not in_market_hours(DAY0 + 86400 + 11 * 3600, cal)           # holiday
+    assert in_market_hours(DAY0 + 5 * 86400 + 18 * 3600 + 30 * 60, cal)  # Sat special
+    assert not in_market_hours(DAY0 + 5 * 86400 + 11 * 3600, cal)
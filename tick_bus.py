@@ -0,0 +1,483 @@
+"""
+tick_bus.py
+
+Local tick bus — ek market-data process (ek broker login / WebSocket),
+kai strategy processes (alag RuleConfig, Daksh vs Sanjay, ...).
+
+    ┌─────────────┐   ring A (sirf A ke symbols)   ┌──────────────┐
+    │   hub       │ ─────────────────────────────▶ │ strategy A   │
+    │ (WS decode) │   ring B                       ├──────────────┤
+    │             │ ─────────────────────────────▶ │ strategy B   │
+    └─────────────┘                                └──────────────┘
+          ▲  unix socket (control: hello / subscribe, JSON lines)
+
+- Har subscriber ka apna SPSC ring (shm_ring.py) → hub ke liye fan-out
+  sirf N × struct pack_into, koi pickle / socket write per tick nahi
+- Subscribe symbol / token se: routing table symbol → subscribers,
+  copy-on-write (publish thread bina lock ke padhta hai)
+- Per-subscriber seq: drop hone par bhi badhta hai → subscriber gap
+  count kar sakta hai. seq=0 → bus band (end of feed)
+- Slow subscriber ka ring full → sirf usi ke ticks drop + count,
+  hub aur baaki subscribers par koi asar nahi
+- Naya symbol pehli baar maanga gaya → on_subscribe callback
+  (hub broker WebSocket par subscribe karta hai)
+- Subscriber disconnect (socket EOF) → route hat jaata hai, ring
+  publish thread hi close / unlink karta hai (push ke beech nahi)
+
+Usage:
+    python tick_bus.py hub                        # live (mStock WS)
+    python tick_bus.py hub --sim 900 --wait 2     # simulator, 2 subscribers ka wait
+    python tick_bus.py strategy --name daksh --engine Daksh
+    python tick_bus.py strategy --name sanjay --engine Sanjay
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from shm_ring import TICK_RECORD, SpscRing, TickReader, pack_opt, pack_seq, pack_str
+
+log = logging.getLogger(__name__)
+
+ALL = "*"           # wildcard subscription (har tick)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class BusConfig:
+    """
+    socket_path     = control channel (unix domain socket)
+    ring_capacity   = har subscriber ke ring ke slots (power of 2)
+    max_subscribers = isse zyada hello → reject
+    """
+
+    socket_path: str = "state/tickbus.sock"
+    ring_capacity: int = 1 << 14
+    max_subscribers: int = 16
+
+
+def _send(conn: socket.socket, msg: Dict):
+    conn.sendall(json.dumps(msg).encode("utf-8") + b"\n")
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Hub side
+# ---------------------------------------------------------------------
+
+class _Subscriber:
+    __slots__ = ("name", "ring", "keys", "seq", "dropped")
+
+    def __init__(self, name: str, ring: SpscRing):
+        self.name = name
+        self.ring = ring
+        self.keys: set = set()
+        self.seq = 0
+        self.dropped = 0
+
+
+class TickBus:
+
+    def __init__(self, config: Optional[BusConfig] = None,
+                 on_subscribe: Optional[Callable[[str, str], None]] = None,
+                 on_unsubscribe: Optional[Callable[[str, str], None]] = None,
+                 live: bool = True):
+        """
+        on_subscribe   → (exchange, symbol) jab koi symbol pehli baar maanga jaye
+        on_unsubscribe → (exchange, symbol) jab aakhri subscriber ne bhi chhod diya
+        live           → False = sim replay (subscribers wall-clock candle timer band rakhein)
+        """
+        self.cfg = config or BusConfig()
+        self.live = live
+        self.on_subscribe = on_subscribe
+        self.on_unsubscribe = on_unsubscribe
+
+        self._subs: List[_Subscriber] = []
+        # symbol → subscribers (wildcard wale bhi shamil); immutable, swap hota hai
+        self._routes: Dict[str, Tuple[_Subscriber, ...]] = {}
+        self._wild: Tuple[_Subscriber, ...] = ()
+        self._retired: List[_Subscriber] = []
+        self._known: Dict[str, str] = {}            # broker par subscribed symbol → exchange
+        self._lock = threading.Lock()               # sirf control path
+        self._server: Optional[socket.socket] = None
+        self._stop = threading.Event()
+
+        self.published = 0
+        self.unrouted = 0
+        self.too_long = 0           # symbol TICK_RECORD field se lamba → drop
+
+    # -----------------------------------------------------------------
+    # Control path (unix socket threads)
+    # -----------------------------------------------------------------
+
+    def start(self):
+        path = self.cfg.socket_path
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)                         # pichhle run ka stale socket
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        srv.bind(path)
+        os.chmod(path, 0o600)
+        srv.listen()
+        self._server = srv
+        threading.Thread(target=self._accept_loop, name="tickbus-accept",
+                         daemon=True).start()
+        log.info("Tick bus listening on %s", path)
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return                              # stop() ne socket band kiya
+            threading.Thread(target=self._serve, args=(conn,), name="tickbus-conn",
+                             daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        sub = None
+        try:
+            with conn, conn.makefile("r", encoding="utf-8") as f:
+                for line in f:
+                    msg = json.loads(line)
+                    if sub is None:
+                        if msg.get("op") != "hello":
+                            _send(conn, {"error": "hello expected"})
+                            return
+                        sub = self._add(msg.get("name") or "anon")
+                        if sub is None:
+                            _send(conn, {"error": "too many subscribers"})
+                            return
+                        name, capacity = sub.ring.spec()
+                        _send(conn, {"ring": name, "capacity": capacity,
+                                     "live": self.live})
+                    self._subscribe(sub, msg.get("subscribe") or ())
+                    self._unsubscribe(sub, msg.get("unsubscribe") or ())
+        except (OSError, ValueError) as e:
+            log.warning("Tick bus connection error: %s", e)
+        finally:
+            if sub is not None:
+                self._remove(sub)
+
+    def _add(self, name: str) -> Optional[_Subscriber]:
+        with self._lock:
+            if len(self._subs) >= self.cfg.max_subscribers:
+                return None
+            sub = _Subscriber(name, SpscRing(TICK_RECORD, self.cfg.ring_capacity))
+            self._subs.append(sub)
+        log.info("Tick bus: subscriber %s connected", name)
+        return sub
+
+    def _subscribe(self, sub: _Subscriber, items: Iterable[Sequence[str]]):
+        new = []
+        with self._lock:
+            for exchange, symbol in items:
+                sub.keys.add(symbol)
+                if symbol != ALL and symbol not in self._known:
+                    self._known[symbol] = exchange
+                    new.append((exchange, symbol))
+            self._rebuild()
+        if self.on_subscribe is not None:
+            for exchange, symbol in new:
+                self.on_subscribe(exchange, symbol)
+
+    def _unsubscribe(self, sub: _Subscriber, items: Iterable[Sequence[str]]):
+        with self._lock:
+            for _, symbol in items:
+                sub.keys.discard(symbol)
+            gone = self._release([symbol for _, symbol in items])
+            self._rebuild()
+        self._notify_gone(gone)
+
+    def _release(self, symbols: Iterable[str]) -> List[Tuple[str, str]]:
+        """Jin symbols ko ab koi subscriber nahi chahta → _known se bahar (lock ke andar)."""
+        gone = []
+        for symbol in symbols:
+            if symbol in self._known and not any(symbol in s.keys for s in self._subs):
+                gone.append((self._known.pop(symbol), symbol))
+        return gone
+
+    def _notify_gone(self, gone: List[Tuple[str, str]]):
+        if self.on_unsubscribe is not None:
+            for exchange, symbol in gone:
+                self.on_unsubscribe(exchange, symbol)
+
+    def _remove(self, sub: _Subscriber):
+        with self._lock:
+            if sub not in self._subs:
+                return                              # stop() pehle hi retire kar chuka
+            self._subs.remove(sub)
+            # Subscriber gaya → uske symbols bhi release (broker subscription leak nahi,
+            # baad me koi aur maange toh on_subscribe dobara chale)
+            gone = self._release(sub.keys)
+            self._rebuild()
+            self._retired.append(sub)
+        self._notify_gone(gone)
+        log.info("Tick bus: subscriber %s left (seq=%s, dropped=%s)",
+                 sub.name, sub.seq, sub.dropped)
+
+    def _rebuild(self):
+        """Routing table dobara banao (lock ke andar) aur ek ref swap."""
+        wild = tuple(s for s in self._subs if ALL in s.keys)
+        routes: Dict[str, Tuple[_Subscriber, ...]] = {}
+        for s in self._subs:
+            for k in s.keys:
+                if k != ALL:
+                    routes[k] = ()
+        for k in routes:
+            routes[k] = tuple(s for s in self._subs if k in s.keys or ALL in s.keys)
+        self._routes = routes
+        self._wild = wild
+
+    # -----------------------------------------------------------------
+    # Hot path (feed thread)
+    # -----------------------------------------------------------------
+
+    def publish(self, tick: Dict, recv_ns: int = 0) -> int:
+        """Tick ko uske symbol ke subscribers tak. Returns: kitne rings me gaya."""
+        if self._retired:
+            self._reap()
+        key = tick.get("symbol")
+        subs = self._routes.get(key, self._wild)
+        if not subs:
+            self.unrouted += 1
+            return 0
+        try:
+            sym = pack_str(key)
+        except ValueError as e:
+            # Truncate karke bhejte to doosre strike ka symbol ban sakta tha
+            self.too_long += 1
+            if self.too_long == 1:
+                log.warning("Tick dropped: %s", e)
+            return 0
+        self.published += 1
+        ltp = tick["last_traded_price"]
+        vol = pack_opt(tick.get("volume"))
+        oi = pack_opt(tick.get("oi"))
+        ts = int(tick.get("exchange_timestamp") or 0)
+        xseq = pack_seq(tick.get("seq"))
+        sent = 0
+        for s in subs:
+            s.seq += 1
+            if s.ring.push(sym, ltp, vol, oi, ts, xseq, recv_ns, s.seq):
+                sent += 1
+            else:
+                s.dropped += 1
+        return sent
+
+    def _reap(self):
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for s in retired:
+            s.ring.close()
+            s.ring.unlink()
+
+    def backlog(self) -> int:
+        """Sabse slow subscriber ke ring me kitne ticks pending."""
+        return max((s.ring.depth() for s in self._subs), default=0)
+
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {s.name: {"seq": s.seq, "dropped": s.dropped, "depth": s.ring.depth()}
+                for s in list(self._subs)}
+
+    def stop(self):
+        """Har subscriber ko seq=0 (end of feed), phir socket + rings band."""
+        self._stop.set()
+        for s in list(self._subs):
+            s.ring.push_wait(b"", 0.0, 0.0, 0.0, 0, -1, 0, 0, timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            try:
+                os.unlink(self.cfg.socket_path)
+            except FileNotFoundError:
+                pass
+        # Subscribers ke disconnect ka thoda wait, phir jo bache unhe bhi retire
+        deadline = time.monotonic() + 5.0
+        while self._subs and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with self._lock:
+            self._retired.extend(self._subs)
+            self._subs = []
+            self._rebuild()
+        self._reap()
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — Subscriber side
+# ---------------------------------------------------------------------
+
+class TickBusClient:
+
+    def __init__(self, name: str, subscriptions: Iterable[Sequence[str]] = (),
+                 config: Optional[BusConfig] = None):
+        """
+        subscriptions → [(exchange, symbol), ...]; ("", "*") → saare ticks
+        """
+        self.cfg = config or BusConfig()
+        self.name = name
+        self._conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._conn.connect(self.cfg.socket_path)
+        self._file = self._conn.makefile("r", encoding="utf-8")
+        _send(self._conn, {"op": "hello", "name": name,
+                           "subscribe": [list(s) for s in subscriptions]})
+        reply = json.loads(self._file.readline() or "{}")
+        if "ring" not in reply:
+            self._conn.close()
+            raise ConnectionError(f"Tick bus rejected {name}: {reply.get('error')}")
+        self.ring = SpscRing(TICK_RECORD, reply["capacity"], reply["ring"],
+                             create=False, foreign=True)
+        self.live = reply.get("live", True)
+
+        self.reader = TickReader(self.ring)
+
+    # Reader ke counters (gap / missed / end of feed) seedhe client par
+    closed = property(lambda self: self.reader.closed)
+    gaps = property(lambda self: self.reader.gaps)
+    missed = property(lambda self: self.reader.missed)
+    received = property(lambda self: self.reader.received)
+    last_recv_ns = property(lambda self: self.reader.last_recv_ns)
+
+    def subscribe(self, symbols: Iterable[str], exchange: str = "NFO"):
+        _send(self._conn, {"op": "subscribe",
+                           "subscribe": [[exchange, s] for s in symbols]})
+
+    def unsubscribe(self, symbols: Iterable[str], exchange: str = "NFO"):
+        _send(self._conn, {"op": "unsubscribe",
+                           "unsubscribe": [[exchange, s] for s in symbols]})
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Agla tick (reused dict) ya None (timeout / bus band → self.closed)."""
+        return self.reader.pop(timeout)
+
+    def close(self):
+        self.ring.close()
+        try:
+            self._file.close()
+            self._conn.close()
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------
+# STEP 4 — Process entry points
+# ---------------------------------------------------------------------
+
+def hub_main(cfg: Optional[BusConfig] = None, sim_seconds: Optional[float] = None,
+             wait_for: int = 1):
+    from bot_logger import setup_logging
+    setup_logging(filename="tickbus.log")
+    cfg = cfg or BusConfig()
+
+    if sim_seconds is not None:
+        from market_simulator import MarketSimulator
+        bus = TickBus(cfg, live=False)
+        bus.start()
+        while bus.subscribers() < wait_for:
+            time.sleep(0.1)
+        sim = MarketSimulator()
+        cap = cfg.ring_capacity
+        t0 = time.perf_counter()
+        for tick in sim.ticks(sim_seconds):
+            # Sim me drop nahi: sabse slow subscriber ke saath pace karo
+            while bus.backlog() >= cap:
+                time.sleep(0.0005)
+            bus.publish(tick, time.perf_counter_ns())
+        log.info("Sim hub done: %s ticks in %.1fs, %s", bus.published,
+                 time.perf_counter() - t0, bus.stats())
+        bus.stop()
+        return
+
+    from bot_core import (CLIENT_ID, MSTOCK_API_KEY, PASSWORD, TOTP_SECRET,
+                          BotConfig, MStockClient)
+    from market_calendar import SessionCalendar
+    from ws_decoder import TickDecoder
+    from ws_supervisor import ConnectionSupervisor, SupervisorConfig
+
+    api = MStockClient(MSTOCK_API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
+    api.login()
+    decoder = TickDecoder()
+
+    def on_message(ws, message):
+        recv_ns = time.perf_counter_ns()
+        tick = decoder(message)
+        if tick is not None:
+            bus.publish(tick, recv_ns)
+
+    calendar_file = BotConfig().calendar_file
+    calendar = SessionCalendar.from_file(calendar_file) if calendar_file else SessionCalendar()
+    supervisor = ConnectionSupervisor(url_factory=api.ws_url, on_message=on_message,
+                                      config=SupervisorConfig(calendar=calendar))
+    bus = TickBus(cfg, on_subscribe=supervisor.add_subscription,
+                  on_unsubscribe=supervisor.remove_subscription)
+    bus.start()
+    try:
+        supervisor.run_forever()
+    finally:
+        log.info("Hub stopped: %s", bus.stats())
+        bus.stop()
+
+
+def strategy_main(name: str, engine_mode: str = "Sanjay",
+                  cfg: Optional[BusConfig] = None):
+    from bot_logger import setup_logging
+    setup_logging(filename=f"strategy_{name}.log")
+    from bot_core import (CLIENT_ID, MSTOCK_API_KEY, PASSWORD, TOTP_SECRET,
+                          BotConfig, MStockClient, OptionBot)
+    from multiproc import strategy_loop
+    from warm_start import warm_start
+
+    bot_cfg = BotConfig()
+    bot_cfg.engine_mode = engine_mode
+    bot_cfg.state_dir = os.path.join("state", name)
+    bot_cfg.metrics_port = None
+    # REST sirf warm start candles ke liye (WebSocket hub ke paas hai)
+    api = MStockClient(MSTOCK_API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
+    bot = OptionBot(api, bot_cfg)
+    warm_start(bot.data_handler, api, bot_cfg.index_symbol)
+
+    client = TickBusClient(name, [("NSE", bot_cfg.index_symbol)], cfg)
+    bot.on_chain_symbols = client.subscribe
+    bot.on_chain_unsubscribe = client.unsubscribe
+
+    try:
+        # Sim hub ke purane timestamps par wall-clock candle close nahi chalta
+        strategy_loop(bot, client.reader, candle_timer=client.live)
+    finally:
+        log.info("Strategy %s done: %s ticks, %s gaps (%s missed), orders=%s\n%s",
+                 name, client.received, client.gaps, client.missed,
+                 bot.order_scheduler.sent, bot.tracer.report())
+        client.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local tick bus (one feed, many strategies)")
+    sub = ap.add_subparsers(dest="role", required=True)
+    h = sub.add_parser("hub", help="market-data process (broker WebSocket)")
+    h.add_argument("--sim", type=float, default=None,
+                   help="live feed ki jagah market_simulator ke itne seconds")
+    h.add_argument("--wait", type=int, default=1,
+                   help="sim start se pehle itne subscribers ka wait")
+    s = sub.add_parser("strategy", help="OptionBot instance jo bus se ticks le")
+    s.add_argument("--name", required=True)
+    s.add_argument("--engine", default="Sanjay", choices=("Daksh", "Sanjay"))
+    s.add_argument("--socket", default=BusConfig.socket_path)
+    h.add_argument("--socket", default=BusConfig.socket_path)
+    args = ap.parse_args()
+
+    bus_cfg = BusConfig(socket_path=args.socket)
+    if args.role == "hub":
+        hub_main(bus_cfg, args.sim, args.wait)
+    else:
+        strategy_main(args.name, args.engine, bus_cfg)
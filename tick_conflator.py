@@ -0,0 +1,122 @@
+"""
+tick_conflator.py
+
+Per-instrument tick conflation (load ke time).
+
+Market open / news par ticks itni tezi se aate hain ki
+OptionBot.on_tick peeche reh jaata hai. Har purane tick ko ek-ek karke
+process karne ka koi fayda nahi — sirf latest state chahiye.
+
+Ye class WebSocket aur DataFeedHandler ke beech baithti hai:
+- Backlog nahi hai → tick jaisa hai waisa nikal jaata hai
+- Backlog hai aur same token ka tick already queue me pada hai →
+  dono merge ho jaate hain:
+    last_traded_price  = latest LTP
+    volume             = sum (candle volume sahi rahe)
+    high / low         = merged ticks ka max / min (candle extremes na khoyein)
+    open               = merge ka pehla LTP (agar is tick se nayi candle bane)
+    exchange_timestamp = latest
+
+Candle boundary ke paar merge nahi hota taaki ek candle ka data doosri
+me na chala jaye. Bucket wahi hona chahiye jo DataFeedHandler use karta
+hai (09:15 IST aligned CandleClock) — isliye bucket_fn inject karo;
+bina uske raw epoch grid (ts // bucket_seconds) par fallback, jo
+10 / 30 / 60 min candles se match nahi karta.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TickConflator:
+
+    def __init__(self, bucket_seconds: int = 300,
+                 bucket_fn: Optional[Callable[[int], int]] = None):
+        """
+        bucket_seconds → candle TF seconds me (5 min = 300).
+        bucket_fn      → epoch → candle start (e.g. CandleClock.bucket(ts)[0]);
+                         None → ts // bucket_seconds
+        Same token + same bucket ke ticks hi merge honge.
+        """
+        self.bucket_seconds = max(int(bucket_seconds), 1)
+        self.bucket_fn = bucket_fn
+
+        # (token, bucket) → [payload, merged_tick]
+        self._pending: "OrderedDict[Tuple, list]" = OrderedDict()
+
+        # Counters
+        self.received = 0
+        self.conflated = 0
+        self.emitted = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _key(self, tick: Dict) -> Tuple:
+        ts = int(tick.get("exchange_timestamp") or 0)
+        if self.bucket_fn is not None:
+            return (tick.get("token", ""), self.bucket_fn(ts))
+        return (tick.get("token", ""), ts // self.bucket_seconds)
+
+    def push(self, tick: Dict, payload=None) -> bool:
+        """
+        Tick queue me daalo. Same key pehle se pending hai toh merge.
+        payload → saath me rakhna ho toh (e.g. latency trace); pehla wala hi rehta hai
+                  taaki latency sabse purane tick se naapi jaye.
+
+        Returns: True agar merge hua
+        """
+        self.received += 1
+        key = self._key(tick)
+        slot = self._pending.get(key)
+
+        if slot is None:
+            self._pending[key] = [payload, tick]
+            return False
+
+        merged = slot[1]
+        if "high" not in merged:
+            # Pehli baar merge ho raha hai → original tick ko copy karo
+            ltp0 = merged.get("last_traded_price")
+            merged = dict(merged)
+            merged["open"] = ltp0
+            merged["high"] = ltp0
+            merged["low"] = ltp0
+            merged["conflated"] = 1
+            slot[1] = merged
+
+        ltp = tick.get("last_traded_price")
+        hi = tick.get("high", ltp)
+        lo = tick.get("low", ltp)
+        if hi is not None and hi > merged["high"]:
+            merged["high"] = hi
+        if lo is not None and lo < merged["low"]:
+            merged["low"] = lo
+
+        merged["last_traded_price"] = ltp
+        merged["volume"] = (merged.get("volume") or 0) + (tick.get("volume") or 0)
+        merged["exchange_timestamp"] = tick.get("exchange_timestamp")
+        if tick.get("oi") is not None:
+            merged["oi"] = tick["oi"]
+        if "timestamp" in tick:
+            merged["timestamp"] = tick["timestamp"]
+        merged["conflated"] += 1 + tick.get("conflated", 0)
+
+        self.conflated += 1
+        return True
+
+    def pop(self) -> Tuple[Optional[object], Dict]:
+        """Sabse purana pending (payload, tick) nikaalo."""
+        payload, tick = self._pending.popitem(last=False)[1]
+        self.emitted += 1
+        return payload, tick
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "conflated": self.conflated,
+            "emitted": self.emitted,
+        }
@@ -0,0 +1,452 @@
+"""
+tick_pipeline.py
+
+Asyncio tick pipeline (bounded queues + backpressure).
+
+Problem:
+- ws_on_message ke andar hi bot.on_tick synchronously chalta tha.
+- Strategy / order code slow hua toh socket read ruk jaata hai
+  aur broker connection drop kar deta hai
+  ("max retry attempts reached" logs me).
+
+Solution — socket reader sirf raw frame queue me daalta hai,
+baaki kaam alag asyncio stages karte hain:
+
+    WS thread ──feed()──▶ [raw q] ─decode─▶ [tick q] ─aggregate─▶ [ctx q]
+                                                          │
+                               execute ◀── scheduler ◀── evaluate
+
+- decode    : raw frame → tick dict → TickSanitizer (duplicate / stale / bad print drop)
+- aggregate : DataFeedHandler update + MarketContext build
+- evaluate  : OptionBot.on_context (rules / risk / order submit)
+- execute   : OrderScheduler.pump() thread executor me (REST loop ko block na kare)
+- candle timer (optional): candle boundary + grace par candle band karke
+  context seedha evaluate stage ko (thin market me agle tick ka wait nahi)
+
+Tick queue (decode → aggregate) default me conflating hai: backlog bane toh
+same token ke ticks merge ho jaate hain (tick_conflator.py), isliye latency
+bounded rehti hai aur candle ka high/low/volume nahi khota.
+
+Har queue bounded hai aur uski apni backpressure policy hai:
+- "block"       → producer wait karega (sirf jab data loss bilkul nahi chahiye)
+- "drop_oldest" → sabse purana item hata ke naya daalo (latest data important)
+- "drop_newest" → naya item hi drop karo
+
+Queue depth / drops ke counters stats() me milte hain.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from latency_tracer import NULL_TRACE
+from market_calendar import CandleClock
+from tick_conflator import TickConflator
+
+log = logging.getLogger(__name__)
+
+
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Pipeline Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class PipelineConfig:
+    """
+    *_maxsize = queue ka max size
+    *_policy  = queue full hone par kya karna hai (upar dekho)
+
+    NOTE:
+    - ctx queue me drop_oldest safe hai: naya MarketContext
+      purane ke saare candles already contain karta hai.
+    """
+
+    raw_maxsize: int = 10000
+    raw_policy: str = POLICY_DROP_OLDEST
+    tick_maxsize: int = 10000
+    tick_policy: str = POLICY_BLOCK
+    conflate_ticks: bool = True    # tick queue ko ConflatingStage banao
+    conflate_bucket_seconds: int = 300
+    ctx_maxsize: int = 64
+    ctx_policy: str = POLICY_DROP_OLDEST
+    stats_interval: float = 60.0   # 0 → stats log nahi honge
+    # True → candle boundary (+ DataFeedHandler.close_grace) par wall-clock
+    # timer candle band karke context evaluate karata hai (agle tick ka wait nahi)
+    candle_timer: bool = False
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Bounded queue with policy + metrics
+# ---------------------------------------------------------------------
+
+class BoundedStage:
+    """
+    asyncio.Queue ke upar chhota wrapper:
+    - policy ke hisaab se put
+    - enqueued / dropped / max_depth counters
+    """
+
+    def __init__(self, name: str, maxsize: int, policy: str):
+        self.name = name
+        self.policy = policy
+        self.q: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put_nowait(self, item) -> bool:
+        """Non-blocking put. block policy me full queue → False (caller await kare)."""
+        q = self.q
+        if q.full():
+            if self.policy == POLICY_DROP_OLDEST:
+                q.get_nowait()
+                q.task_done()
+                self.dropped += 1
+            elif self.policy == POLICY_DROP_NEWEST:
+                self.dropped += 1
+                return True
+            else:
+                return False
+        q.put_nowait(item)
+        self._count()
+        return True
+
+    async def put(self, item):
+        if not self.put_nowait(item):
+            await self.q.put(item)
+            self._count()
+
+    def _count(self):
+        self.enqueued += 1
+        depth = self.q.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def get(self):
+        return await self.q.get()
+
+    def task_done(self):
+        self.q.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            "depth": self.q.qsize(),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "policy": self.policy,
+        }
+
+
+class ConflatingStage:
+    """
+    (trace, tick) ke liye queue jo backlog me same-token ticks merge kar deti hai.
+    Depth kabhi (tokens × open buckets) se zyada nahi jaati, isliye
+    isme drop / block policy ki zarurat nahi.
+    """
+
+    def __init__(self, name: str, bucket_seconds: int,
+                 bucket_fn: Optional[Callable[[int], int]] = None):
+        self.name = name
+        self.conflator = TickConflator(bucket_seconds, bucket_fn)
+        self._event = asyncio.Event()
+        self.max_depth = 0
+
+    def put_nowait(self, item) -> bool:
+        trace, tick = item
+        self.conflator.push(tick, trace)
+        depth = len(self.conflator)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self._event.set()
+        return True
+
+    async def put(self, item):
+        self.put_nowait(item)
+
+    async def get(self):
+        while not len(self.conflator):
+            self._event.clear()
+            await self._event.wait()
+        return self.conflator.pop()
+
+    def task_done(self):
+        pass
+
+    def stats(self) -> Dict:
+        s = self.conflator.stats()
+        return {
+            "depth": s["pending"],
+            "max_depth": self.max_depth,
+            "enqueued": s["received"],
+            "conflated": s["conflated"],
+            "emitted": s["emitted"],
+            "policy": "conflate",
+        }
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — TickPipeline
+# ---------------------------------------------------------------------
+
+class TickPipeline:
+
+    def __init__(self, bot, decode: Callable[[str], Optional[Dict]],
+                 config: Optional[PipelineConfig] = None):
+        """
+        bot    → OptionBot (update_feed / on_context / order_scheduler / tracer)
+        decode → raw WS message → tick dict (ya None agar price update nahi)
+        """
+        self.bot = bot
+        self.decode = decode
+        self.cfg = config or PipelineConfig()
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._exec_wake: Optional[asyncio.Event] = None
+        # REST calls ke liye ek hi worker → order sequence same rahe
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix="pipeline-exec")
+
+        self.raw: Optional[BoundedStage] = None
+        self.ticks: Optional[BoundedStage] = None
+        self.contexts: Optional[BoundedStage] = None
+
+        self.decode_errors = 0
+        self.stage_errors = 0
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Socket side (WS thread se call hota hai)
+    # -----------------------------------------------------------------
+
+    def feed(self, message):
+        """
+        ws_on_message yahi call kare. Sirf receive stamp + enqueue,
+        koi parsing ya strategy kaam nahi.
+        """
+        item = (time.perf_counter_ns(), message)
+        if self.raw.policy == POLICY_BLOCK:
+            fut = asyncio.run_coroutine_threadsafe(self.raw.put(item), self.loop)
+            fut.result()
+        else:
+            self.loop.call_soon_threadsafe(self.raw.put_nowait, item)
+
+    def call_soon(self, fn: Callable):
+        """
+        Koi bhi function pipeline ke event loop par chalao (thread-safe).
+        Stages ke saath serialize hota hai — e.g. reconnect backfill.
+        """
+        self.loop.call_soon_threadsafe(fn)
+
+    def offload(self, fn: Callable, then: Optional[Callable] = None):
+        """
+        Blocking kaam (e.g. REST history fetch) default executor me chalao,
+        result then(result) event loop par — stages ke saath serialize, lekin
+        fetch ke round trip me decode / aggregate / execute nahi rukte.
+        Thread-safe.
+        """
+        async def _run():
+            try:
+                result = await self.loop.run_in_executor(None, fn)
+            except Exception as e:
+                log.warning("Offloaded call failed: %s", e)
+                return
+            if then is not None:
+                try:
+                    then(result)
+                except Exception as e:
+                    self.stage_errors += 1
+                    log.exception("Offload callback error: %s", e)
+
+        asyncio.run_coroutine_threadsafe(_run(), self.loop)
+
+    # -----------------------------------------------------------------
+    # STEP 5 — Stages
+    # -----------------------------------------------------------------
+
+    async def _decode_stage(self):
+        tracer = self.bot.tracer
+        sanitize = self.bot.sanitizer.check
+        while True:
+            t0, message = await self.raw.get()
+            try:
+                trace = tracer.begin(t0)
+                tick = self.decode(message)
+                trace.mark("decode")
+                tracer.current = NULL_TRACE
+                # Sanitize conflation se pehle → bad print merged high / low me na jaye
+                if tick is not None and sanitize(tick):
+                    await self.ticks.put((trace, tick))
+            except Exception as e:
+                self.decode_errors += 1
+                log.warning("Decode error: %s", e)
+            finally:
+                self.raw.task_done()
+
+    async def _aggregate_stage(self):
+        tracer = self.bot.tracer
+        while True:
+            trace, tick = await self.ticks.get()
+            try:
+                tracer.current = trace
+                context = self.bot.update_feed(tick, checked=True)
+                if context is None:
+                    tracer.end()
+                else:
+                    tracer.current = NULL_TRACE
+                    await self.contexts.put((trace, context))
+            except Exception as e:
+                self.stage_errors += 1
+                log.exception("Aggregate error: %s", e)
+            finally:
+                self.ticks.task_done()
+
+    async def _evaluate_stage(self):
+        tracer = self.bot.tracer
+        scheduler = self.bot.order_scheduler
+        while True:
+            trace, context = await self.contexts.get()
+            try:
+                tracer.current = trace
+                self.bot.on_context(context)
+                tracer.end()
+                if scheduler.pending():
+                    self._exec_wake.set()
+            except Exception as e:
+                self.stage_errors += 1
+                log.exception("Evaluate error: %s", e)
+            finally:
+                self.contexts.task_done()
+
+    async def _execute_stage(self):
+        scheduler = self.bot.order_scheduler
+        while True:
+            await self._exec_wake.wait()
+            self._exec_wake.clear()
+            while scheduler.pending():
+                sent = await self.loop.run_in_executor(self._executor, scheduler.pump)
+                if sent == 0:
+                    await asyncio.sleep(max(scheduler.next_wait(), 0.001))
+
+    async def _candle_timer_stage(self):
+        """
+        Aggregate stage ke hi event loop par → DataFeedHandler ke saath
+        serialize, koi lock nahi. Deadline tak sleep (max 1s, beech me tick
+        ne candle band kar di ho to naya deadline).
+        """
+        bot = self.bot
+        dh = bot.data_handler
+        while True:
+            deadline = dh.close_deadline()
+            now = time.time()
+            if deadline is None or now < deadline:
+                await asyncio.sleep(1.0 if deadline is None else min(deadline - now, 1.0))
+                continue
+            if not dh.close_if_due(now):
+                continue
+            try:
+                trace = bot.tracer.begin()
+                context = dh.build_market_context(symbol=bot.cfg.index_symbol)
+                bot.tracer.current = NULL_TRACE
+                if context is not None:
+                    await self.contexts.put((trace, context))
+            except Exception as e:
+                self.stage_errors += 1
+                log.exception("Candle timer error: %s", e)
+
+    async def _stats_stage(self):
+        while True:
+            await asyncio.sleep(self.cfg.stats_interval)
+            log.info("Stats: %s", self.stats())
+
+    # -----------------------------------------------------------------
+    # STEP 6 — Lifecycle
+    # -----------------------------------------------------------------
+
+    def _candle_bucket_fn(self) -> Callable[[int], int]:
+        """
+        Conflation key = DataFeedHandler wali candle start (09:15 IST grid +
+        session clamp) — epoch grid par 10 / 30 / 60 min ticks galat candle
+        me merge ho jaate. Apna CandleClock (same tf + calendar) taaki day
+        cache aggregate stage ke saath share na ho.
+        """
+        dh_clock = self.bot.data_handler.clock
+        bucket = CandleClock(dh_clock.tf, dh_clock.calendar).bucket
+        return lambda ts: bucket(ts)[0]
+
+    async def _main(self):
+        self.raw = BoundedStage("raw", self.cfg.raw_maxsize, self.cfg.raw_policy)
+        if self.cfg.conflate_ticks:
+            self.ticks = ConflatingStage("tick", self.cfg.conflate_bucket_seconds,
+                                         self._candle_bucket_fn())
+        else:
+            self.ticks = BoundedStage("tick", self.cfg.tick_maxsize, self.cfg.tick_policy)
+        self.contexts = BoundedStage("ctx", self.cfg.ctx_maxsize, self.cfg.ctx_policy)
+        self._exec_wake = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(self._decode_stage()),
+            asyncio.create_task(self._aggregate_stage()),
+            asyncio.create_task(self._evaluate_stage()),
+            asyncio.create_task(self._execute_stage()),
+        ]
+        if self.cfg.stats_interval > 0:
+            tasks.append(asyncio.create_task(self._stats_stage()))
+        if self.cfg.candle_timer:
+            tasks.append(asyncio.create_task(self._candle_timer_stage()))
+
+        self._ready.set()
+        await asyncio.gather(*tasks)
+
+    def start(self):
+        """Event loop alag thread me chalega; WS run_forever main thread me."""
+        if self._thread is not None:
+            return
+
+        def _run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self._main())
+            except asyncio.CancelledError:
+                pass
+
+        self._thread = threading.Thread(target=_run, name="tick-pipeline", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        log.info("Started")
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        def _cancel():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+
+        self.loop.call_soon_threadsafe(_cancel)
+        self._thread.join(timeout=2.0)
+        self._executor.shutdown(wait=False)
+        self._thread = None
+
+    def stats(self) -> Dict:
+        """Queue depth metrics (dashboard / metrics ke liye)."""
+        return {
+            "raw": self.raw.stats() if self.raw else {},
+            "tick": self.ticks.stats() if self.ticks else {},
+            "ctx": self.contexts.stats() if self.contexts else {},
+            "decode_errors": self.decode_errors,
+            "stage_errors": self.stage_errors,
+        }
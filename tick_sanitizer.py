@@ -0,0 +1,195 @@
+"""
+tick_sanitizer.py
+
+Tick sanitation — candles / RSI / chain tak sirf saaf ticks.
+
+Pehle:
+    DataFeedHandler.on_tick sab kuch le leta tha:
+    - reconnect ke baad wahi ticks dobara (duplicate volume)
+    - purane exchange timestamps (out-of-order)
+    - bad prints (0, 10x) → candle high / low aur RSI kharab
+    - exchange_timestamp missing → datetime.fromtimestamp(None) crash
+
+Ab har token ka chhota state (last seq / ts / price / volume / OI +
+price band) aur har tick par O(1) checks:
+
+    missing_price → LTP None / <= 0 / nan
+    missing_ts    → exchange_timestamp nahi (receive "timestamp" ho to
+                    wahi bhar dete hain → ts_filled)
+    duplicate     → seq <= last seq, ya (ts, LTP, volume, OI) last jaisa
+    stale         → ts last se reorder_window se zyada purana
+    reordered     → window ke andar purana → accept, last ts peeche nahi
+                    jaata. Running candle ke andar wala tick usi me jaata
+                    hai; pichhle bucket ka tick DataFeedHandler drop karta
+                    hai (late_ticks) — band candle dobara nahi khulti
+    outlier       → |LTP - last| > max(band_k × EWMA|Δ|, band_pct × last, band_abs)
+                    lagatar outlier_reset outliers → naya level maan kar
+                    band re-anchor (rebased) — gap ke baad feed atakta nahi
+
+Live mode: ws_decoder frame se exchange time + sequence nikalta hai.
+Sequence ho toh duplicate (reconnect replay) seq se pakda jaata hai;
+stale / reordered exchange time par chalte hain. Agar broker frame me
+exchange time na bheje toh decoder receive time bharta hai
+(TickDecoder.local_ts) — tab sirf missing_price, seq duplicate aur
+outlier checks kaam ke hain, stale / reordered kabhi trigger nahi hote.
+
+Counters stats() me (metrics: bot_ticks_rejected_total{reason=...}).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+REASONS = ("missing_price", "missing_ts", "duplicate", "stale", "outlier")
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class SanitizerConfig:
+    """
+    reorder_window = itne seconds purana tick abhi bhi accept (out-of-order)
+    band_k         = EWMA |Δprice| ke kitne guna tak move normal hai
+    band_pct       = band ki min width (last price ka fraction)
+    band_abs       = band ki min width (points) — sasti options ke liye
+    band_alpha     = EWMA smoothing
+    outlier_reset  = itne lagatar outliers → naya price level accept
+    """
+
+    reorder_window: int = 2
+    band_k: float = 12.0
+    band_pct: float = 0.03
+    band_abs: float = 2.0
+    band_alpha: float = 0.05
+    outlier_reset: int = 5
+
+
+class _TokenState:
+    __slots__ = ("ts", "seq", "price", "volume", "oi", "dev", "streak")
+
+    def __init__(self, ts: int, price: float, volume, oi):
+        self.ts = ts
+        self.seq = -1
+        self.price = price
+        self.volume = volume
+        self.oi = oi
+        self.dev = 0.0              # EWMA |Δprice|
+        self.streak = 0             # lagatar outliers
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — TickSanitizer
+# ---------------------------------------------------------------------
+
+class TickSanitizer:
+
+    def __init__(self, config: Optional[SanitizerConfig] = None):
+        self.cfg = config or SanitizerConfig()
+        self._state: Dict[str, _TokenState] = {}
+
+        self.accepted = 0
+        self.rejected = dict.fromkeys(REASONS, 0)
+        self.reordered = 0
+        self.rebased = 0
+        self.ts_filled = 0
+
+    def _reject(self, reason: str) -> bool:
+        self.rejected[reason] += 1
+        return False
+
+    def check(self, tick: Dict) -> bool:
+        """True → tick aage jaye. False → drop (reason counter badh gaya)."""
+        price = tick.get("last_traded_price")
+        if not price or price <= 0 or price != price:
+            return self._reject("missing_price")
+
+        ts = tick.get("exchange_timestamp")
+        if not ts:
+            ts = tick.get("timestamp")
+            if not ts:
+                return self._reject("missing_ts")
+            tick["exchange_timestamp"] = ts
+            self.ts_filled += 1
+
+        key = tick.get("token") or tick.get("symbol")
+        st = self._state.get(key)
+        if st is None:
+            st = self._state[key] = _TokenState(ts, price, tick.get("volume"),
+                                                tick.get("oi"))
+            seq = tick.get("seq")
+            if seq is not None:
+                st.seq = seq
+            self.accepted += 1
+            return True
+
+        # 1) Duplicate
+        seq = tick.get("seq")
+        if seq is not None:
+            if seq <= st.seq:
+                return self._reject("duplicate")
+        elif (ts == st.ts and price == st.price and tick.get("volume") == st.volume
+              and tick.get("oi") == st.oi):
+            return self._reject("duplicate")
+
+        # 2) Out-of-order
+        cfg = self.cfg
+        if ts < st.ts:
+            if st.ts - ts > cfg.reorder_window:
+                return self._reject("stale")
+            self.reordered += 1
+
+        # 3) Price band
+        move = price - st.price
+        if move < 0:
+            move = -move
+        last = st.price
+        half = cfg.band_k * st.dev
+        if half < cfg.band_pct * last:
+            half = cfg.band_pct * last
+        if half < cfg.band_abs:
+            half = cfg.band_abs
+        if move > half:
+            st.streak += 1
+            if st.streak < cfg.outlier_reset:
+                return self._reject("outlier")
+            # Lagatar naya level → bad print nahi, asli gap (reconnect / circuit)
+            log.warning("%s: price level %s → %s accepted after %s outliers",
+                        key, last, price, st.streak)
+            self.rebased += 1
+            st.dev = 0.0
+        else:
+            st.dev += cfg.band_alpha * (move - st.dev)
+        st.streak = 0
+
+        # Accept → state update (ts kabhi peeche nahi jaata)
+        if ts > st.ts:
+            st.ts = ts
+        if seq is not None:
+            st.seq = seq
+        st.price = price
+        st.volume = tick.get("volume")
+        st.oi = tick.get("oi")
+        self.accepted += 1
+        return True
+
+    def reset(self, key: Optional[str] = None):
+        """Token (ya sab) ka state bhool jao — e.g. naye din par."""
+        if key is None:
+            self._state.clear()
+        else:
+            self._state.pop(key, None)
+
+    def stats(self) -> Dict:
+        return {
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+            "reordered": self.reordered,
+            "rebased": self.rebased,
+            "ts_filled": self.ts_filled,
+        }
@@ -1,5 +1,9 @@
 # token_helper.py
-from SmartApi import SmartConnect
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from SmartApi import SmartConnect
 
 def get_latest_future_token(api: SmartConnect, symbol="NIFTY"):
     all_data = api.searchScrip(exchange="NFO", searchtext=symbol)
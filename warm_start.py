@@ -0,0 +1,93 @@
+"""
+warm_start.py
+
+Historical candle warm start — 9:15 ke pehle tick se signals live.
+
+Problem:
+    build_market_context ko 3 candles chahiye, _rule_volume_spike aur
+    _rule_breakout_retest ko 21-22. 5m TF par iska matlab ~2 ghante tak
+    A-SET aadha andha rehta hai.
+
+Ye loader:
+- Pichhle trading sessions ke candles (aur OI, agar source de sake)
+  ek bulk fetch me laata hai
+- Aaj ke session ke ab tak ke candles bhi (morning crash restart)
+- DataFeedHandler.warm_start() se ek hi call me buffers bhar deta hai
+
+Source: ws_supervisor wale CandleSource (LocalCandleStub, SmartApiCandleSource)
+ya MStockClient — jisme fetch_candles(symbol, start, end, tf) ho.
+fetch_oi(symbol, start, end, tf) → (ce_oi, pe_oi) optional hai.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime, time as dtime, timedelta
+from typing import List, Optional
+
+from market_calendar import SessionCalendar, ist_now
+
+log = logging.getLogger(__name__)
+
+SESSION_OPEN = dtime(9, 15)
+SESSION_MINUTES = 375                 # 09:15 → 15:30
+
+
+def session_start(day: datetime) -> datetime:
+    return datetime.combine(day.date(), SESSION_OPEN)
+
+
+def previous_trading_days(now: datetime, n: int,
+                          calendar: Optional[SessionCalendar] = None) -> List[datetime]:
+    """
+    Aaj se pehle ke n trading days (latest pehle). calendar (market_calendar)
+    diya ho to holidays / special sessions bhi, warna sirf weekends skip.
+    """
+    calendar = calendar or SessionCalendar()
+    return [datetime.combine(d, now.time())
+            for d in calendar.previous_trading_days(now.date(), n)]
+
+
+def sessions_needed(max_candles: int, timeframe_minutes: int) -> int:
+    """max_candles bharne ke liye kitne full sessions chahiye."""
+    per_session = SESSION_MINUTES // timeframe_minutes
+    return max(1, math.ceil(max_candles / per_session))
+
+
+def warm_start(data_handler, source, symbol: str,
+               sessions: Optional[int] = None,
+               now: Optional[datetime] = None,
+               calendar: Optional[SessionCalendar] = None) -> int:
+    """
+    Pichhle `sessions` trading days + aaj ke closed candles fetch karke
+    data_handler me load karo. sessions=None → max_candles jitne.
+    calendar → holidays skip (None → data_handler ka calendar)
+
+    Returns: kitne candles load hue (fetch fail → 0, bot cold chalega)
+    """
+    now = now or ist_now()
+    tf = data_handler.timeframe_minutes
+    if sessions is None:
+        sessions = sessions_needed(data_handler.max_candles, tf)
+
+    calendar = calendar or data_handler.clock.calendar
+    start = session_start(previous_trading_days(now, sessions, calendar)[-1])
+    # Sirf closed candles: running candle live ticks se banegi
+    end = now - timedelta(minutes=tf)
+
+    try:
+        candles = source.fetch_candles(symbol, start, end, tf)
+    except Exception as e:
+        log.warning("Warm start fetch failed: %s", e)
+        return 0
+
+    ce_oi = pe_oi = None
+    fetch_oi = getattr(source, "fetch_oi", None)
+    if fetch_oi is not None:
+        try:
+            ce_oi, pe_oi = fetch_oi(symbol, start, end, tf)
+        except Exception as e:
+            log.warning("Warm start OI fetch failed: %s", e)
+
+    return data_handler.warm_start(candles, ce_oi, pe_oi)
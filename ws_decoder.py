@@ -0,0 +1,168 @@
+"""
+ws_decoder.py
+
+Fast-path decoding for WebSocket price frames.
+
+Pehle ws_on_message har frame par:
+- json.loads (pure parse)
+- naya tick dict
+- time.time() do baar
+karta tha.
+
+Ab:
+- orjson installed hai toh wahi use hoga (stdlib json se kaafi fast),
+  warna stdlib json
+- Jo frame price update nahi hai (ack, heartbeat, subscribe reply)
+  unhe bina parse kiye skip kar dete hain ("ltp" key substring check)
+- Ek hi preallocated tick record reuse hota hai; time ek hi baar liya jaata hai
+- Exchange time / sequence frame se padhte hain ("exchange_timestamp" ya
+  "ltt", seconds ya ms; "sequence_number" ya "seq") — TickSanitizer ke
+  duplicate / stale / reorder checks inhi par chalte hain. Frame me time
+  na ho toh receive time bharta hai (local_ts counter)
+
+NOTE:
+- volume / oi frame me na hon toh None (consumers `or 0` / `is not None`
+  se handle karte hain)
+- Returned tick dict REUSE hota hai — agar downstream ko tick store
+  karna hai (queue / journal) toh copy=True do.
+
+Benchmark:
+    python ws_decoder.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Dict, Optional
+
+try:
+    import orjson as _fastjson      # optional: pip install orjson
+    _loads = _fastjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:                 # pragma: no cover - depends on env
+    _fastjson = None
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+
+_LTP_STR = '"ltp"'
+_LTP_BYTES = b'"ltp"'
+
+
+class TickDecoder:
+    """
+    Raw WS message → tick dict (ya None agar price frame nahi hai).
+
+    copy=False → har call par same dict object (zero alloc per tick).
+    copy=True  → har call par naya dict (queue me rakhna ho toh).
+    """
+
+    __slots__ = ("copy", "_tick", "decoded", "skipped", "errors", "local_ts")
+
+    def __init__(self, copy: bool = False):
+        self.copy = copy
+        self._tick: Dict = {
+            "last_traded_price": 0.0,
+            "timestamp": 0,
+            "exchange_timestamp": 0,
+            "symbol": None,          # option chain routing + conflation key
+            "token": None,
+            "volume": None,          # frame me nahi → None (0 nahi)
+            "oi": None,
+            "seq": None,             # exchange sequence (frame me ho toh)
+        }
+        self.decoded = 0
+        self.skipped = 0
+        self.errors = 0
+        self.local_ts = 0            # exchange time nahi mila → receive time
+
+    def decode(self, message) -> Optional[Dict]:
+        # 1) Cheap pre-filter: "ltp" key hi nahi hai toh parse mat karo
+        marker = _LTP_BYTES if isinstance(message, (bytes, bytearray)) else _LTP_STR
+        if marker not in message:
+            self.skipped += 1
+            return None
+
+        try:
+            data = _loads(message)
+            ltp = float(data["ltp"])
+        except (ValueError, KeyError, TypeError):
+            self.errors += 1
+            return None
+
+        now = int(time.time())
+        xts = data.get("exchange_timestamp") or data.get("ltt")
+        try:
+            xts = int(xts)
+            if xts > 10_000_000_000:            # ms → s
+                xts //= 1000
+        except (TypeError, ValueError):
+            xts = 0
+        if xts <= 0:
+            xts = now
+            self.local_ts += 1
+        seq = data.get("sequence_number", data.get("seq"))
+
+        tick = dict(self._tick) if self.copy else self._tick
+        symbol = data.get("symbol")
+        tick["last_traded_price"] = ltp
+        tick["timestamp"] = now
+        tick["exchange_timestamp"] = xts
+        tick["seq"] = int(seq) if seq is not None else None
+        tick["symbol"] = symbol
+        tick["token"] = symbol
+        # Missing field = "pata nahi", 0 nahi — LTP mode frame ka OI 0 maana
+        # toh OptionChain strike ka OI mita deta
+        tick["volume"] = data.get("volume")
+        tick["oi"] = data.get("oi")
+        self.decoded += 1
+        return tick
+
+    __call__ = decode
+
+
+# ---------------------------------------------------------------------
+# Benchmark (purana vs naya)
+# ---------------------------------------------------------------------
+
+def _legacy_decode(message) -> Optional[Dict]:
+    """Purana ws_on_message decode logic (comparison ke liye)."""
+    data = json.loads(message)
+    if "ltp" in data:
+        return {
+            "last_traded_price": float(data["ltp"]),
+            "timestamp": int(time.time()),
+            "exchange_timestamp": int(time.time())
+        }
+    return None
+
+
+def benchmark(n: int = 200000, non_price_ratio: float = 0.1) -> Dict[str, float]:
+    """
+    n frames decode karke messages/sec return karta hai.
+    non_price_ratio → kitne frames heartbeat/ack type ke hain.
+    """
+    price = json.dumps({"symbol": "NIFTY", "exchange": "NSE", "ltp": 25912.35,
+                        "change": 12.5, "volume": 125000})
+    other = json.dumps({"type": "heartbeat", "status": "ok", "ts": 1700000000})
+    every = int(1 / non_price_ratio) if non_price_ratio > 0 else n + 1
+    frames = [other if i % every == 0 else price for i in range(n)]
+
+    results = {}
+    for name, fn in (("legacy", _legacy_decode),
+                     ("fast", TickDecoder().decode),
+                     ("fast_copy", TickDecoder(copy=True).decode)):
+        t0 = time.perf_counter()
+        for f in frames:
+            fn(f)
+        results[name] = n / (time.perf_counter() - t0)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"JSON backend: {JSON_BACKEND}")
+    res = benchmark()
+    base = res["legacy"]
+    for name, rate in res.items():
+        print(f"{name:<10} {rate:>12,.0f} msg/sec   x{rate / base:.2f}")
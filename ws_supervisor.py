@@ -0,0 +1,354 @@
+"""
+ws_supervisor.py
+
+WebSocket connection supervisor (reconnect + resubscribe + gap backfill).
+
+Problem (logs/ me dikhta hai):
+    Attempting to resubscribe/reconnect...
+    Connection closed due to max retry attempts reached
+→ uske baad bot idle baitha rehta hai, aur gap ke across candles galat bante hain.
+
+Ye supervisor:
+- Connection girte hi jittered exponential backoff ke saath reconnect karta hai
+- Market hours (09:15–15:30) me retries unlimited, bahar limited
+- Har reconnect par saare subscribed tokens dubara subscribe karta hai
+- Reconnect ke baad gap ke missing candles historical API se laata hai
+  (CandleSource) aur DataFeedHandler me backfill karta hai
+
+CandleSource:
+- SmartApiCandleSource → Angel getCandleData
+- LocalCandleStub      → in-memory / JSON file (tests + offline)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from market_calendar import SessionCalendar, ist_date, ist_datetime, ist_now
+from rules_engine import Candle
+
+if TYPE_CHECKING:
+    from websocket import WebSocketApp
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------
+# STEP 1 — Supervisor Config
+# ---------------------------------------------------------------------
+
+@dataclass
+class SupervisorConfig:
+    """
+    base_delay / max_delay  = backoff range (seconds)
+    max_retries_off_hours   = market band hone par kitni baar try kare (None = unlimited)
+    calendar                = NSE sessions (holidays / special sessions, IST);
+                              None → SessionCalendar() (sirf weekends band)
+    ping_interval / timeout = WS keepalive (half-open connection detect karne ke liye)
+    """
+
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_retries_off_hours: Optional[int] = 5
+    calendar: Optional[SessionCalendar] = None
+    ping_interval: float = 20.0
+    ping_timeout: float = 10.0
+
+
+# Subscribe modes: LTP frame me OI nahi hota — option chain (NFO) ko OI chahiye
+MODE_LTP = "LTP"
+MODE_FULL = "FULL"
+
+
+def subscription_mode(exchange: str) -> str:
+    """NFO / BFO (option chain: PCR, max pain, OI series) → FULL, baaki LTP."""
+    return MODE_FULL if exchange in ("NFO", "BFO") else MODE_LTP
+
+
+def in_market_hours(now: float, calendar: SessionCalendar) -> bool:
+    """now (epoch) us IST din ke session ke andar? Host TZ se independent."""
+    bounds = calendar.session_bounds(ist_date(int(now)))
+    return bounds is not None and bounds[0] <= now <= bounds[1]
+
+
+def backoff_delay(attempt: int, cfg: SupervisorConfig,
+                  rng: Optional[random.Random] = None) -> float:
+    """
+    Exponential backoff with "equal jitter":
+        cap = min(max_delay, base * 2^attempt)
+        delay = cap/2 + random(0, cap/2)
+    Saare clients ek saath reconnect na karein isliye jitter.
+    """
+    rng = rng or random
+    cap = min(cfg.max_delay, cfg.base_delay * (2 ** min(attempt, 16)))
+    return cap / 2 + rng.random() * cap / 2
+
+
+# ---------------------------------------------------------------------
+# STEP 2 — Historical candle sources
+# ---------------------------------------------------------------------
+
+class LocalCandleStub:
+    """
+    Test / offline ke liye historical API stub.
+
+    candles dict: symbol → List[Candle]
+    oi dict     : symbol → [[iso_ts, ce_oi, pe_oi], ...] (warm start ke liye, optional)
+    ya JSON file: {"NIFTY": [[iso_ts, o, h, l, c, v], ...],
+                   "_oi": {"NIFTY": [[iso_ts, ce_oi, pe_oi], ...]}}
+    """
+
+    def __init__(self, candles: Optional[Dict[str, List[Candle]]] = None,
+                 path: Optional[str] = None,
+                 oi: Optional[Dict[str, List[list]]] = None):
+        self.candles: Dict[str, List[Candle]] = candles or {}
+        self.oi: Dict[str, List[Tuple[datetime, int, int]]] = {}
+        for sym, rows in (oi or {}).items():
+            self.oi[sym] = [(r[0], r[1], r[2]) for r in rows]
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            for sym, rows in raw.pop("_oi", {}).items():
+                self.oi[sym] = [(datetime.fromisoformat(r[0]), r[1], r[2]) for r in rows]
+            for sym, rows in raw.items():
+                self.candles[sym] = [
+                    Candle(ts=datetime.fromisoformat(r[0]), o=r[1], h=r[2],
+                           l=r[3], c=r[4], v=r[5])
+                    for r in rows
+                ]
+
+    def fetch_candles(self, symbol: str, start: datetime, end: datetime,
+                      timeframe_minutes: int) -> List[Candle]:
+        return [c for c in self.candles.get(symbol, []) if start <= c.ts < end]
+
+    def fetch_oi(self, symbol: str, start: datetime, end: datetime,
+                 timeframe_minutes: int) -> Tuple[List[int], List[int]]:
+        """(ce_oi, pe_oi) series, ts order me."""
+        rows = sorted(r for r in self.oi.get(symbol, []) if start <= r[0] < end)
+        return [r[1] for r in rows], [r[2] for r in rows]
+
+
+_ANGEL_INTERVALS = {
+    1: "ONE_MINUTE", 3: "THREE_MINUTE", 5: "FIVE_MINUTE",
+    10: "TEN_MINUTE", 15: "FIFTEEN_MINUTE", 30: "THIRTY_MINUTE",
+    60: "ONE_HOUR",
+}
+
+
+class SmartApiCandleSource:
+    """
+    Angel SmartAPI getCandleData wrapper.
+
+    tokens → symbol → (exchange, symboltoken), e.g. {"NIFTY": ("NSE", "26000")}
+    """
+
+    def __init__(self, api, tokens: Dict[str, tuple]):
+        self.api = api
+        self.tokens = tokens
+
+    def fetch_candles(self, symbol: str, start: datetime, end: datetime,
+                      timeframe_minutes: int) -> List[Candle]:
+        exchange, token = self.tokens[symbol]
+        params = {
+            "exchange": exchange,
+            "symboltoken": token,
+            "interval": _ANGEL_INTERVALS[timeframe_minutes],
+            "fromdate": start.strftime("%Y-%m-%d %H:%M"),
+            "todate": end.strftime("%Y-%m-%d %H:%M"),
+        }
+        resp = self.api.getCandleData(params)
+        out = []
+        for row in resp.get("data") or []:
+            ts = datetime.fromisoformat(row[0]).replace(tzinfo=None)
+            out.append(Candle(ts=ts, o=row[1], h=row[2], l=row[3], c=row[4], v=row[5]))
+        return out
+
+
+def fetch_gap(data_handler, source, symbol: str, gap_start: datetime,
+              now: Optional[datetime] = None) -> Tuple[List[Candle], datetime,
+                                                       Optional[List[int]],
+                                                       Optional[List[int]]]:
+    """
+    gap_start (last tick time) se now tak ke candles (+ OI, agar source
+    fetch_oi deta hai — warm_start jaisa) fetch karo — sirf REST, handler
+    ko touch nahi karta (executor thread me chal sakta hai).
+    Returns: (candles, now, ce_oi, pe_oi); fetch fail → ([], now, None, None)
+    """
+    now = now or ist_now()
+    tf = data_handler.timeframe_minutes
+    # Gap wali candle ki start se fetch (adhoori candle bhi replace ho jaye)
+    start = gap_start - timedelta(minutes=tf)
+    try:
+        candles = source.fetch_candles(symbol, start, now, tf)
+    except Exception as e:
+        log.warning("Backfill fetch failed: %s", e)
+        return [], now, None, None
+
+    ce_oi = pe_oi = None
+    fetch_oi = getattr(source, "fetch_oi", None)
+    if fetch_oi is not None:
+        try:
+            ce_oi, pe_oi = fetch_oi(symbol, start, now, tf)
+        except Exception as e:
+            log.warning("Backfill OI fetch failed: %s", e)
+    return candles, now, ce_oi, pe_oi
+
+
+def backfill_gap(data_handler, source, symbol: str, gap_start: datetime,
+                 now: Optional[datetime] = None) -> int:
+    """
+    gap_start (last tick time) se now tak ke candles fetch karke
+    DataFeedHandler me daal do (sync mode; pipeline me fetch_gap executor
+    me aur backfill_candles event loop par).
+    """
+    return data_handler.backfill_candles(*fetch_gap(data_handler, source, symbol,
+                                                    gap_start, now))
+
+
+# ---------------------------------------------------------------------
+# STEP 3 — ConnectionSupervisor
+# ---------------------------------------------------------------------
+
+class ConnectionSupervisor:
+
+    def __init__(self, url_factory: Callable[[], str],
+                 on_message: Callable,
+                 on_reconnect: Optional[Callable[[datetime], None]] = None,
+                 config: Optional[SupervisorConfig] = None):
+        """
+        url_factory  → har connect par fresh URL (token refresh ho sakta hai)
+        on_message   → (ws, message) callback
+        on_reconnect → (gap_start) callback, reconnect ke baad backfill ke liye
+        """
+        self.url_factory = url_factory
+        self.on_message = on_message
+        self.on_reconnect = on_reconnect
+        self.cfg = config or SupervisorConfig()
+        self.calendar = self.cfg.calendar or SessionCalendar()
+
+        # Resubscribe ke liye saare instruments
+        self.subscriptions: List[Dict] = []
+
+        self.ws: Optional[WebSocketApp] = None
+        self.connected = False
+        self.attempt = 0
+        self.reconnects = 0
+        self.last_message_at: Optional[float] = None     # epoch (har frame par sasta)
+        self._ever_connected = False
+        self._stop = threading.Event()
+
+    # -----------------------------------------------------------------
+    # STEP 4 — Subscriptions
+    # -----------------------------------------------------------------
+
+    def add_subscription(self, exchange: str, symbol: str, mode: Optional[str] = None):
+        """mode None → subscription_mode(exchange) (options FULL, index LTP)."""
+        inst = {"exchange": exchange, "symbol": symbol,
+                "mode": mode or subscription_mode(exchange)}
+        if inst in self.subscriptions:
+            return
+        self.subscriptions.append(inst)
+        if self.connected:
+            self._send_subscribe([inst])
+
+    def remove_subscription(self, exchange: str, symbol: str):
+        """Instrument hatao (e.g. chain window ke bahar gaye strikes)."""
+        gone = [i for i in self.subscriptions
+                if i["exchange"] == exchange and i["symbol"] == symbol]
+        if not gone:
+            return
+        self.subscriptions = [i for i in self.subscriptions if i not in gone]
+        if self.connected:
+            self._send_subscribe(gone, action="unsubscribe")
+
+    def _send_subscribe(self, instruments: List[Dict], action: str = "subscribe"):
+        by_mode: Dict[str, List[Dict]] = {}
+        for inst in instruments:
+            by_mode.setdefault(inst["mode"], []).append(
+                {"exchange": inst["exchange"], "symbol": inst["symbol"]})
+        for mode, insts in by_mode.items():
+            self.ws.send(json.dumps({"action": action, "mode": mode,
+                                     "instruments": insts}))
+        log.info("📡 %s %s instruments", action.capitalize(), len(instruments))
+
+    # -----------------------------------------------------------------
+    # STEP 5 — WS callbacks
+    # -----------------------------------------------------------------
+
+    def _on_open(self, ws):
+        self.connected = True
+        self.attempt = 0
+        log.info("🟢 WS CONNECTED%s", " (reconnect)" if self._ever_connected else "")
+
+        if self.subscriptions:
+            self._send_subscribe(self.subscriptions)
+
+        if self._ever_connected:
+            self.reconnects += 1
+            if self.on_reconnect is not None and self.last_message_at is not None:
+                try:
+                    # gap_start naive IST (Candle.ts jaisa), host TZ se independent
+                    self.on_reconnect(ist_datetime(self.last_message_at))
+                except Exception as e:
+                    log.exception("on_reconnect error: %s", e)
+        self._ever_connected = True
+
+    def _on_message(self, ws, message):
+        self.last_message_at = time.time()
+        self.on_message(ws, message)
+
+    def _on_error(self, ws, error):
+        log.error("❌ WS ERROR: %s", error)
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        self.connected = False
+        log.warning("🔴 WS CLOSED | code=%s msg=%s", close_status_code, close_msg)
+
+    # -----------------------------------------------------------------
+    # STEP 6 — Run loop
+    # -----------------------------------------------------------------
+
+    def run_forever(self):
+        """Blocking: connect → run → (closed) → backoff → reconnect."""
+        from websocket import WebSocketApp   # lazy: connect ke time hi chahiye
+
+        while not self._stop.is_set():
+            self.ws = WebSocketApp(
+                self.url_factory(),
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                self.ws.run_forever(ping_interval=self.cfg.ping_interval,
+                                    ping_timeout=self.cfg.ping_timeout)
+            except Exception as e:
+                log.exception("run_forever crashed: %s", e)
+            self.connected = False
+
+            if self._stop.is_set():
+                break
+
+            market = in_market_hours(time.time(), self.calendar)
+            limit = self.cfg.max_retries_off_hours
+            if not market and limit is not None and self.attempt >= limit:
+                log.warning("Market closed, retries exhausted → stopping")
+                break
+
+            delay = backoff_delay(self.attempt, self.cfg)
+            self.attempt += 1
+            log.info("Reconnect attempt %s in %.1fs", self.attempt, delay)
+            self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+        if self.ws is not None:
+            self.ws.close()